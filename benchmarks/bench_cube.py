@@ -0,0 +1,110 @@
+"""Benchmark: pivots over the raw rows vs roll-ups of the downtime cube.
+
+Run from the repository root:
+
+    python benchmarks/bench_cube.py                 # 10k, 100k, 1M rows
+    python benchmarks/bench_cube.py 50000
+
+For each size the cube is built once (as the dashboard does per loaded
+dataset), then the KPI 1 Date x Machine pivot, the KPI 8 Date x Hour
+heatmap, the shift downtime and the hourly pattern are answered both
+ways: unfiltered and for a machine + shift + date filter.  Every answer
+is checked against the pivot, and the full ``compute_kpis`` result from a
+cube slice against the one computed from the filtered rows.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_kpis import _close, make_log  # noqa: E402
+from maintenance.filters import NAT_DAY, to_day_number  # noqa: E402
+from maintenance.kpis import KPI_REPORT_COLUMNS, compute_kpis, kpi_cube  # noqa: E402
+
+
+def legacy_pivots(df):
+    timed = df[df["HourOfDay"] >= 0]
+    return {
+        "kpi1": pd.pivot_table(df, index="Date_Clean", columns="Machine No.", values="Consumed_Hours",
+                               aggfunc="sum", fill_value=0, observed=True).sort_index(),
+        "kpi3": df.groupby("Shift", observed=True)["Consumed_Hours"].sum().sort_values(ascending=False),
+        "kpi7": timed.groupby("HourOfDay")["Consumed_Hours"].sum().reindex(range(24), fill_value=0),
+        "kpi8": timed.pivot_table(index="Date_Clean", columns="HourOfDay", values="Consumed_Hours",
+                                  aggfunc="sum", fill_value=0).reindex(columns=range(24), fill_value=0).sort_index(),
+    }
+
+
+def cube_pivots(cube):
+    dated = cube.slice(day=slice(None, NAT_DAY - 1))
+    timed = cube.slice(hour=slice(0, None))
+    return {
+        "kpi1": dated.rollup("day", "machine").unstack(fill_value=0),
+        "kpi3": cube.rollup("shift").sort_values(ascending=False),
+        "kpi7": timed.rollup("hour").reindex(range(24), fill_value=0),
+        "kpi8": timed.slice(day=slice(None, NAT_DAY - 1)).rollup("day", "hour").unstack()
+                     .reindex(columns=range(24)).fillna(0),
+    }
+
+
+def check_pivots(a, b):
+    for k in a:
+        _close(a[k], b[k])
+
+
+def check_kpis(a, b):
+    for name in ["machine_hours", "shift_hours", "category_jobs", "category_hours", "hourly", "day_hours",
+                 "day_waiting", "day_complaints"]:
+        _close(getattr(a, name).sort_index(), getattr(b, name).sort_index())
+    for name in ["day_machine", "day_notification", "day_hour"]:
+        _close(getattr(a, name), getattr(b, name))
+    assert (a.total_jobs, a.distinct_days) == (b.total_jobs, b.distinct_days)
+    _close([a.total_hours, a.total_waiting_hours], [b.total_hours, b.total_waiting_hours])
+    _close(a.breakdown_machines().sort_index(), b.breakdown_machines().sort_index())
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+    return out, best
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'cells':>9} {'build s':>8} {'query':>10} {'pivots s':>9} {'cube s':>8} {'speedup':>8}")
+    for n in sizes:
+        df = make_log(n)
+        cube, t_build = timed(lambda: kpi_cube(df, KPI_REPORT_COLUMNS), repeat=1)
+
+        legacy, t_l = timed(lambda: legacy_pivots(df))
+        rolled, t_c = timed(lambda: cube_pivots(cube))
+        check_pivots(legacy, rolled)
+        print(f"{n:>10,} {len(cube):>9,} {t_build:>8.3f} {'all rows':>10} {t_l:>9.4f} {t_c:>8.4f} {t_l / t_c:>7.1f}x")
+
+        lo, hi = df["Date"].min() + pd.Timedelta(days=30), df["Date"].min() + pd.Timedelta(days=120)
+        machines, shifts = ["M1", "M5", "M15"], ["A", "C"]
+        mask = (df["Machine No."].isin(machines) & df["Shift"].isin(shifts)
+                & (df["Date"] >= lo) & (df["Date"] <= hi)).to_numpy()
+        sel = dict(machine=machines, shift=shifts, day=slice(to_day_number(lo), to_day_number(hi)))
+        legacy, t_l = timed(lambda: legacy_pivots(df[mask]))
+        rolled, t_c = timed(lambda: cube_pivots(cube.slice(**sel)))
+        check_pivots(legacy, rolled)
+        print(f"{n:>10,} {'':>9} {'':>8} {'filtered':>10} {t_l:>9.4f} {t_c:>8.4f} {t_l / t_c:>7.1f}x")
+
+        check_kpis(compute_kpis(df[mask], KPI_REPORT_COLUMNS, tech_credit="full"),
+                   compute_kpis(df[mask], KPI_REPORT_COLUMNS, tech_credit="full", cube=cube.slice(**sel)))
+        # drill-down: one machine's downtime by hour of day
+        _close(cube.drill_down("machine", "M15", "hour").drop(-1, errors="ignore"),
+               df[(df["Machine No."] == "M15") & (df["HourOfDay"] >= 0)]
+               .groupby("HourOfDay")["Consumed_Hours"].sum())
+        _close(cube.dense("shift", "category").sum(), np.nansum(df["Consumed_Hours"][df["Shift"].notna()]))
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,169 @@
+"""Micro-benchmark: per-cell to_hours / time_to_minutes / get_hour vs maintenance.durations.
+
+Run from the repository root:
+
+    python benchmarks/bench_durations.py            # 10k, 100k, 1M rows
+    python benchmarks/bench_durations.py 10000      # custom sizes
+
+Each size also checks that the vectorized results equal the per-cell ones.
+"""
+import datetime as dt
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance.durations import duration_hours, duration_minutes, hour_of_day  # noqa: E402
+
+
+# ------------------------------------------------------------------
+# Reference per-cell implementations (as they were in the pages)
+# ------------------------------------------------------------------
+def to_hours(series):
+    if pd.api.types.is_timedelta64_dtype(series):
+        return series.dt.total_seconds() / 3600
+
+    def conv(x):
+        if pd.isna(x):
+            return np.nan
+        if isinstance(x, pd.Timedelta):
+            return x.total_seconds() / 3600
+        if isinstance(x, pd.Timestamp):
+            return x.hour + x.minute / 60 + x.second / 3600
+        if isinstance(x, dt.time):
+            return x.hour + x.minute / 60 + x.second / 3600
+        if isinstance(x, dt.datetime):
+            return x.hour + x.minute / 60 + x.second / 3600
+        if isinstance(x, (int, float, np.integer, np.floating)):
+            if x <= 1.5:
+                return x * 24
+            return float(x)
+        if isinstance(x, str):
+            t = x.strip()
+            m = re.match(r"^(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$", t)
+            if m:
+                hh = int(m.group(1)); mm = int(m.group(2)); ss = int(m.group(3) or 0)
+                return hh + mm / 60 + ss / 3600
+        return np.nan
+
+    return series.apply(conv)
+
+
+def time_to_minutes(x, default=np.nan):
+    if pd.isna(x): return default
+    if isinstance(x, pd.Timedelta):
+        return x.total_seconds() / 60
+    if isinstance(x, pd.Timestamp):
+        return x.hour*60 + x.minute + x.second/60
+    if isinstance(x, dt.datetime):
+        return x.hour*60 + x.minute + x.second/60
+    if isinstance(x, dt.time):
+        return x.hour*60 + x.minute + x.second/60
+    if isinstance(x, (int, float, np.integer, np.floating)):
+        v = float(x)
+        if 0 <= v <= 1.5:
+            return v * 24 * 60
+        if v <= 48:
+            return v * 60
+        return v
+    if isinstance(x, str):
+        s = x.strip()
+        m = re.match(r"^(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$", s)
+        if m:
+            hh = int(m.group(1)); mm = int(m.group(2)); ss = int(m.group(3) or 0)
+            return hh*60 + mm + ss/60
+        try:
+            return time_to_minutes(float(s), default=default)
+        except:  # noqa: E722
+            return default
+    return default
+
+
+def get_hour(x):
+    if pd.isna(x):
+        return np.nan
+    if isinstance(x, pd.Timestamp):
+        return x.hour
+    if isinstance(x, dt.time):
+        return x.hour
+    if isinstance(x, dt.datetime):
+        return x.hour
+    if isinstance(x, str):
+        m = re.match(r"^(\d{1,2}):", x.strip())
+        if m:
+            return int(m.group(1))
+    return np.nan
+
+
+def hour_with_fallback(start, requested):
+    hour = start.apply(get_hour)
+    hour[hour.isna()] = requested[hour.isna()].apply(get_hour)
+    return hour
+
+
+# ------------------------------------------------------------------
+# Synthetic mixed column, shaped like a real "Time Consumed" export
+# ------------------------------------------------------------------
+def make_column(n, seed=0):
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(0, 24 * 60, n)
+    kind = rng.integers(0, 9, n)
+    vals = []
+    for m, k in zip(minutes.tolist(), kind.tolist()):
+        h, mi = divmod(m, 60)
+        if k == 0:
+            vals.append(dt.time(h, mi, m % 60, 999999 if m % 3 == 0 else 0))
+        elif k == 1:
+            vals.append(m / 1440)
+        elif k == 2:
+            vals.append(f" {h}:{mi:02d} ")
+        elif k == 3:
+            vals.append(f"{h:02d}:{mi:02d}:{m % 60:02d}")
+        elif k == 4:
+            vals.append(pd.Timedelta(minutes=m, seconds=0.5))
+        elif k == 5:
+            vals.append(pd.Timestamp(2026, 1, 1, h, mi))
+        elif k == 6:
+            vals.append(None)
+        elif k == 7:
+            vals.append(["n/a", "", "12.5", "90", "-3", "nan"][m % 6])
+        else:
+            vals.append([h, float(m), -0.5, 2, np.int64(m)][m % 5])
+    return pd.Series(vals, dtype=object)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'func':>16} {'per-cell s':>11} {'vector s':>9} {'speedup':>8}")
+    for n in sizes:
+        col = make_column(n)
+
+        ref, t_ref = timed(lambda: to_hours(col))
+        new, t_new = timed(lambda: duration_hours(col))
+        pd.testing.assert_series_equal(ref.astype(float), new, check_names=False)
+        print(f"{n:>10,} {'duration_hours':>16} {t_ref:>11.3f} {t_new:>9.3f} {t_ref / t_new:>7.1f}x")
+
+        ref, t_ref = timed(lambda: col.apply(lambda x: time_to_minutes(x, default=0.0)))
+        new, t_new = timed(lambda: duration_minutes(col, default=0.0))
+        pd.testing.assert_series_equal(ref.astype(float), new, check_names=False)
+        print(f"{n:>10,} {'duration_minutes':>16} {t_ref:>11.3f} {t_new:>9.3f} {t_ref / t_new:>7.1f}x")
+
+        requested = make_column(n, seed=1)
+        ref, t_ref = timed(lambda: hour_with_fallback(col, requested))
+        new, t_new = timed(lambda: hour_of_day(col, requested))
+        pd.testing.assert_series_equal(ref.fillna(-1).astype("int8"), new, check_names=False)
+        print(f"{n:>10,} {'hour_of_day':>16} {t_ref:>11.3f} {t_new:>9.3f} {t_ref / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,70 @@
+"""Benchmark: rendering the daily report charts vs serving them from FigureCache.
+
+Run from the repository root:
+
+    python benchmarks/bench_figures.py                 # 20 reruns
+    python benchmarks/bench_figures.py 50
+
+Each "rerun" asks for the six charts of the daily report (top machines,
+technicians, complaints trend, hourly pattern, 30-day heatmap, reasons)
+with unchanged data, as after a click on an unrelated widget.  The first
+rerun renders, the others are cache hits; a changed aggregate renders
+again.  Checks that no pyplot figure stays open.
+"""
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance.figures import FigureCache  # noqa: E402
+
+
+def make_charts(seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Index(pd.date_range("2025-01-01", periods=30).date, name="Date")
+    return [
+        ("bar", pd.Series(rng.random(10) * 100, index=[f"M{i}" for i in range(10)]),
+         dict(title="Top 10 Machines", xlabel="Machine", ylabel="Hours", rotate=True)),
+        ("bar", pd.Series(rng.random(10) * 50, index=[f"Tech {i}" for i in range(10)]),
+         dict(title="Top 10 Technicians", xlabel="Technician", ylabel="Hours (allocated)", rotate=True)),
+        ("line", pd.Series(rng.integers(0, 20, 30), index=dates),
+         dict(title="Complaints Received per Day", xlabel="Date", ylabel="Complaints (unique)", rotate=True)),
+        ("bar", pd.Series(rng.random(24) * 10, index=range(24)),
+         dict(title="Total Time Consumed by Hour of Day", xlabel="Hour (0–23)", ylabel="Hours", xticks=range(24))),
+        ("heatmap", pd.DataFrame(rng.random((30, 24)), index=dates, columns=range(24)),
+         dict(title="Date × Hour Heatmap", xlabel="Hour of day", ylabel="Date", colorbar="Hours")),
+        ("barh", pd.Series(rng.random(10) * 30, index=[f"reason {i}" for i in range(10)]),
+         dict(title="Top 10 Reasons by Total Time Consumed", xlabel="Hours")),
+    ]
+
+
+def rerun(cache, charts):
+    t0 = time.perf_counter()
+    for kind, data, style in charts:
+        cache.chart(kind, data, **style)
+    return time.perf_counter() - t0
+
+
+def main(reruns):
+    cache = FigureCache()
+    charts = make_charts()
+    first = rerun(cache, charts)
+    hits = [rerun(cache, charts) for _ in range(reruns - 1)]
+    assert cache.misses == len(charts) and cache.hits == len(charts) * (reruns - 1)
+    changed = rerun(cache, make_charts(seed=1))
+    assert not plt.get_fignums(), "figures left open"
+    print(f"{'charts':>7} {'render ms':>10} {'hit us/rerun':>13} {'changed ms':>11} {'cached':>7} {'KB':>7}")
+    print(f"{len(charts):>7} {first * 1000:>10.1f} {np.median(hits) * 1e6:>13.1f} {changed * 1000:>11.1f} "
+          f"{len(cache):>7} {cache.nbytes / 1024:>7.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,99 @@
+"""Benchmark: per-machine interval merging, Python loop vs sort-and-sweep.
+
+Run from the repository root:
+
+    python benchmarks/bench_intervals.py                 # 10k, 100k, 500k jobs
+    python benchmarks/bench_intervals.py 50000
+
+The log has concurrent crews on the same machine (about a third of the
+jobs start while another job on that machine is still open) and some
+jobs without a Start.  Each size checks union downtime, labor and
+episode counts of ``machine_downtime`` against the loop, and the
+per-day split of ``daily_downtime`` against the machine totals.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance.filters import sort_by_date  # noqa: E402
+from maintenance.intervals import MINUTES_PER_DAY, daily_downtime, job_intervals, machine_downtime  # noqa: E402
+
+
+def make_jobs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    machines = [f"M{i}" for i in range(1, 19)] + ["Crates Area/Line"]
+    start_min = rng.integers(0, MINUTES_PER_DAY, n)
+    # second crews: copy a neighbour's start so jobs overlap on the same machine
+    machine = rng.choice(machines, n)
+    day = rng.integers(0, 365, n)
+    crew = rng.random(n) < 0.35
+    src = np.maximum(np.arange(n) - 1, 0)
+    start_min[crew] = start_min[src[crew]] + rng.integers(0, 30, crew.sum())
+    machine[crew], day[crew] = machine[src[crew]], day[src[crew]]
+    start_min %= MINUTES_PER_DAY
+    length = rng.gamma(1.5, 60, n).round().astype(np.int64)
+    end_min = (start_min + length) % MINUTES_PER_DAY
+    start = pd.Series([f"{m // 60:02d}:{m % 60:02d}" for m in start_min], dtype=object)
+    start[rng.random(n) < 0.03] = None
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(day, "D"),
+        "Machine No.": pd.Categorical(machine, categories=machines),
+        "Start": start,
+        "End": [f"{m // 60:02d}:{m % 60:02d}" for m in end_min],
+    })
+    return sort_by_date(df)
+
+
+def loop_downtime(iv):
+    """Reference: one machine at a time, sorted, merged interval by interval."""
+    out = {}
+    for m, g in iv.groupby("machine", observed=True):
+        union, episodes = 0.0, 0
+        placed = g.dropna(subset=["start"]).sort_values("start")
+        cur_s = cur_e = None
+        for s, e in zip(placed["start"], placed["end"]):
+            if cur_e is None or s > cur_e:
+                if cur_e is not None:
+                    union += cur_e - cur_s
+                cur_s, cur_e = s, e
+                episodes += 1
+            else:
+                cur_e = max(cur_e, e)
+        if cur_e is not None:
+            union += cur_e - cur_s
+        lost = g[g["start"].isna()]
+        out[m] = (union + lost["length"].sum(), g["length"].sum(), episodes + len(lost))
+    return pd.DataFrame(out, index=["union", "labor", "episodes"]).T
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(sizes):
+    print(f"{'jobs':>10} {'intervals s':>12} {'loop s':>8} {'sweep s':>8} {'speedup':>8} {'overlap %':>10}")
+    for n in sizes:
+        df = make_jobs(n)
+        iv, t_iv = timed(lambda: job_intervals(df))
+        ref, t_loop = timed(lambda: loop_downtime(iv))
+        md, t_sweep = timed(lambda: machine_downtime(iv))
+        md = md.reindex(ref.index.astype(str))
+        assert np.allclose(md["Downtime_Hours"], ref["union"] / 60)
+        assert np.allclose(md["Labor_Hours"], ref["labor"] / 60)
+        assert (md["Episodes"].to_numpy() == ref["episodes"].to_numpy()).all()
+        per_day = daily_downtime(iv).groupby(level="Machine No.", observed=True).sum().reindex(md.index)
+        assert np.allclose(per_day["Downtime_Hours"], md["Downtime_Hours"])
+        assert (per_day["Episodes"].to_numpy() == md["Episodes"].to_numpy()).all()
+        overlap = md["Overlap_Hours"].sum() / md["Labor_Hours"].sum() * 100
+        print(f"{n:>10,} {t_iv:>12.3f} {t_loop:>8.3f} {t_sweep:>8.4f} {t_loop / t_sweep:>7.1f}x {overlap:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 500_000])
@@ -0,0 +1,85 @@
+"""Benchmark: a batch of KPI reports -- chart pool speed-up and compact vs full report size.
+
+Run from the repository root:
+
+    python benchmarks/bench_kpi_report.py                 # 4 monthly reports, 4 000 jobs
+    python benchmarks/bench_kpi_report.py 12 20000
+
+Builds a raw log like the workbook's Main Data sheet, cleans it once
+(``pipeline.clean_log`` + ``prepare_log``) and renders one report per month: ``workers=1``
+draws the 13 charts of every report one after the other, the default
+spreads all of them over one process per core.  Both runs must produce
+the same HTML apart from the raster bytes (matplotlib output is not
+byte-stable across processes), so the tables, KPI cards and SVG charts
+are compared.  A third run in full mode (every chart a 200-dpi PNG, the
+old output) gives the report size before / after.
+"""
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance.kpi_report import CHARTS, prepare_log, render_reports  # noqa: E402
+from maintenance.pipeline import clean_log, real_rows_only  # noqa: E402
+from maintenance.run_calendar import RunCalendar  # noqa: E402
+
+MACHINES = [f"M{i}" for i in range(1, 19)] + ["Crates Area/Line"]
+
+
+def make_workbook_rows(months, n, seed=0):
+    rng = np.random.default_rng(seed)
+    days = (pd.Timestamp("2025-01-01") + pd.DateOffset(months=months) - pd.Timestamp("2025-01-01")).days
+    start = rng.integers(0, 24 * 60, n)
+    minutes = rng.gamma(1.5, 60, n).astype(int)
+    clock = lambda m: [f"{(v // 60) % 24:02d}:{v % 60:02d}" for v in m]  # noqa: E731
+    return pd.DataFrame({
+        "Notification No.": np.where(rng.random(n) < 0.15, np.nan, rng.integers(100000, 200000, n)),
+        "Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, days, n), "D"),
+        "Shift": rng.choice(["A", "B", "C"], n),
+        "Area": rng.choice(["Filling", "Packing", "Crates"], n),
+        "Machine No.": rng.choice(MACHINES, n),
+        "Type": rng.choice(["Mechanical", "Electrical"], n),
+        "Job": rng.choice(["B/D", "Corrective", "PM"], n),
+        "Reported Problem": rng.choice([f"reason {i}" for i in range(60)], n),
+        "Performed By": rng.choice(["Dante", "Sameer/Ali", "Gilbert & Lito", "Husam"], n),
+        "Start": clock(start),
+        "End": clock(start + minutes),
+        "Waiting Time": clock(rng.integers(0, 30, n)),
+    })
+
+
+def strip_images(html):
+    return re.sub(r"data:image/[a-z]+;base64,[A-Za-z0-9+/=]+", "", html)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(months, n):
+    raw = make_workbook_rows(months, n)
+    df_real, t_prep = timed(lambda: prepare_log(clean_log(real_rows_only(raw))[0]))
+    start, end = df_real["Date_Clean"].min(), df_real["Date_Clean"].max()
+    calendar = RunCalendar()
+    serial, t_serial = timed(lambda: render_reports(df_real, start, end, by="month", calendar=calendar, workers=1))
+    pooled, t_pool = timed(lambda: render_reports(df_real, start, end, by="month", calendar=calendar))
+    full, t_full = timed(lambda: render_reports(df_real, start, end, by="month", calendar=calendar, compact=False))
+    assert [name for name, _ in serial] == [name for name, _ in pooled] == [name for name, _ in full]
+    assert all(strip_images(a) == strip_images(b) for (_, a), (_, b) in zip(serial, pooled))
+    mb = lambda reports: np.mean([len(h.encode("utf-8")) for _, h in reports]) / 1e6  # noqa: E731
+    print(f"{'reports':>8} {'charts':>7} {'jobs':>7} {'prepare s':>10} {'serial s':>9} {'pool s':>7} "
+          f"{'cores':>6} {'speedup':>8} {'full s':>7} {'MB full':>8} {'MB compact':>11} {'smaller':>8}")
+    print(f"{len(serial):>8} {len(serial) * len(CHARTS):>7} {n:>7,} {t_prep:>10.2f} {t_serial:>9.2f} "
+          f"{t_pool:>7.2f} {os.cpu_count():>6} {t_serial / t_pool:>7.1f}x {t_full:>7.2f} "
+          f"{mb(full):>8.2f} {mb(pooled):>11.2f} {mb(full) / mb(pooled):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4, int(sys.argv[2]) if len(sys.argv) > 2 else 4000)
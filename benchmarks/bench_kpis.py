@@ -0,0 +1,215 @@
+"""Benchmark: per-chart groupbys of the pages vs the single-pass KPI engine.
+
+Run from the repository root:
+
+    python benchmarks/bench_kpis.py                 # 10k, 100k, 1M rows
+    python benchmarks/bench_kpis.py 50000
+
+The legacy code below is what the daily report and the KPI script ran
+chart by chart; each size also checks the engine returns the same tables.
+"""
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance.filters import sort_by_date  # noqa: E402
+from maintenance.kpis import (  # noqa: E402
+    DAILY_REPORT_COLUMNS, KPI_REPORT_COLUMNS, compute_kpis, technician_hours, technician_log,
+)
+
+
+# ------------------------------------------------------------------
+# Reference per-cell splitters (previous page code)
+# ------------------------------------------------------------------
+def split_names(s):
+    """Split technician string 'A/B/C' or 'A & B' etc. into individual names."""
+    parts = re.split(r"[/,&]|\band\b", str(s), flags=re.IGNORECASE)
+    parts = [p.strip() for p in parts if p.strip() and p.strip().lower() != "nan"]
+    return parts if parts else ["Unknown"]
+
+
+def split_techs(performed_by):
+    """Split technician names by /, &, comma, 'and' etc. (full credit rule)."""
+    if pd.isna(performed_by):
+        return ["Unknown"]
+    s = str(performed_by).strip()
+    if s == "" or s.lower() == "nan":
+        return ["Unknown"]
+    s = s.replace("&", "/").replace(",", "/").replace(";", "/")
+    s = re.sub(r"\band\b", "/", s, flags=re.IGNORECASE)
+    parts = [p.strip() for p in s.split("/") if p.strip()]
+    return parts if parts else ["Unknown"]
+
+
+def make_log(n, seed=0):
+    rng = np.random.default_rng(seed)
+    machines = [f"M{i}" for i in range(1, 19)] + ["Crates Area/Line"]
+    techs = ["Dante", "Sameer/Ali", "Gilbert & Lito", "Husam and Amgad", "Nashwan, Moneef",
+             "Ali / ", "nan", "", None]
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, n), "D")
+    notif = rng.integers(100000, 100000 + n // 2, n).astype(float)
+    notif[rng.random(n) < 0.15] = np.nan
+    hours = rng.gamma(1.5, 1.2, n)
+    hours[rng.random(n) < 0.05] = np.nan
+    df = pd.DataFrame({
+        "Date": dates,
+        "Notification No.": notif,
+        "Machine No.": pd.Categorical(rng.choice(machines, n), categories=machines),
+        "Shift": pd.Categorical(rng.choice(["A", "B", "C"], n)),
+        "Type": pd.Categorical(rng.choice(["B/D", "Corrective", "PM"], n)),
+        "Performed By": rng.choice(np.array(techs, dtype=object), n),
+        "time_h": hours,
+        "wait_h": rng.gamma(0.5, 0.3, n),
+        "hour": rng.integers(-1, 24, n).astype(np.int8),
+        "reason": rng.choice([f"reason {i}" for i in range(60)], n),
+    })
+    df = sort_by_date(df)
+    # KPI-script flavour of the same log
+    df["Consumed_Hours"] = df["time_h"].fillna(0.0)
+    df["Waiting_Hours"] = df["wait_h"]
+    df["HourOfDay"] = df["hour"]
+    df["Date_Clean"] = df["Date"].dt.date
+    df["Job_Category"] = np.where(df["Type"] == "B/D", "Breakdown",
+                                  np.where(df["Type"] == "Corrective", "Corrective", "Other"))
+    df["Notification_Status"] = np.where(df["Notification No."].isna(), "Without Notification", "With Notification")
+    df["Reason_Clean"] = df["reason"]
+    return df
+
+
+# ------------------------------------------------------------------
+# Legacy per-chart code
+# ------------------------------------------------------------------
+def legacy_daily(df_f):
+    out = {}
+    out["top_m"] = df_f.groupby("Machine No.", observed=True)["time_h"].sum().sort_values(ascending=False).head(10)
+    rows = []
+    for who, h in zip(df_f["Performed By"].astype(object).fillna("Unknown"), df_f["time_h"]):
+        if pd.isna(h):
+            continue
+        names = split_names(who)
+        for nm in names:
+            rows.append((nm, h / len(names)))
+    out["tech"] = pd.DataFrame(rows, columns=["Technician", "hours"]).groupby("Technician")["hours"].sum()
+    dated = df_f.dropna(subset=["Date"]).copy()
+    dated["day"] = dated["Date"].dt.date
+    out["comp"] = dated.dropna(subset=["Notification No."]).groupby("day")["Notification No."].nunique()
+    out["hourly"] = df_f[df_f["hour"] >= 0].groupby("hour")["time_h"].sum().reindex(range(24), fill_value=0)
+    heat = df_f[df_f["hour"] >= 0].dropna(subset=["Date"]).copy()
+    heat["day"] = heat["Date"].dt.date
+    out["pivot"] = heat.pivot_table(index="day", columns="hour", values="time_h", aggfunc="sum").reindex(columns=range(24)).fillna(0)
+    out["reasons"] = df_f.groupby("reason")["time_h"].sum().sort_values(ascending=False).head(10)
+    return out
+
+
+def legacy_kpi(df_period):
+    out = {}
+    out["kpi1"] = pd.pivot_table(df_period, index="Date_Clean", columns="Machine No.", values="Consumed_Hours",
+                                 aggfunc="sum", fill_value=0, observed=True).sort_index()
+    out["kpi2"] = df_period.groupby(["Date_Clean", "Notification_Status"]).size().unstack(fill_value=0).sort_index()
+    out["kpi3"] = df_period.groupby("Shift", observed=True)["Consumed_Hours"].sum().sort_values(ascending=False)
+    out["kpi4_count"] = df_period.groupby("Job_Category").size()
+    out["kpi4_time"] = df_period.groupby("Job_Category")["Consumed_Hours"].sum()
+    out["kpi5"] = df_period.groupby("Date_Clean")["Waiting_Hours"].sum().sort_index()
+    df_bd = df_period[df_period["Job_Category"] == "Breakdown"]
+    out["kpi6"] = df_bd.groupby("Machine No.", observed=True).agg(
+        Breakdown_Events=("Consumed_Hours", "size"), Breakdown_Downtime_Hours=("Consumed_Hours", "sum"))
+    out["kpi7"] = df_period[df_period["HourOfDay"] >= 0].groupby("HourOfDay")["Consumed_Hours"].sum().reindex(range(24), fill_value=0)
+    out["kpi8"] = df_period[df_period["HourOfDay"] >= 0].pivot_table(
+        index="Date_Clean", columns="HourOfDay", values="Consumed_Hours", aggfunc="sum", fill_value=0
+    ).reindex(columns=range(24), fill_value=0).sort_index()
+    tech_log = []
+    for _, row in df_period.iterrows():
+        for t in split_techs(row["Performed By"]):
+            tech_log.append({"Technician": t, "Job_Category": row["Job_Category"], "Consumed_Hours": row["Consumed_Hours"]})
+    out["kpi9"] = pd.DataFrame(tech_log).pivot_table(index="Technician", columns="Job_Category",
+                                                     values="Consumed_Hours", aggfunc="sum", fill_value=0)
+    out["kpi10"] = df_bd.groupby("Reason_Clean").agg(Downtime_Hours=("Consumed_Hours", "sum"),
+                                                     Incidents=("Reason_Clean", "size"))
+    out["pareto"] = df_period.groupby("Machine No.", observed=True)["Consumed_Hours"].sum()
+    return out
+
+
+def _close(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    assert a.shape == b.shape and np.allclose(a, b), (a.shape, b.shape)
+
+
+def check(df, legacy_d, legacy_k, k_d, k_k):
+    _close(legacy_d["top_m"].values, k_d.top_machines(10).values)
+    _close(legacy_d["tech"].sort_index(), k_d.technicians.sum(axis=1).sort_index())
+    _close(legacy_d["comp"], k_d.day_complaints)
+    _close(legacy_d["hourly"], k_d.hourly)
+    _close(legacy_d["pivot"], k_d.day_hour)
+    _close(legacy_d["reasons"].values, k_d.top_reasons(10)["Downtime_Hours"].values)
+
+    _close(legacy_k["kpi1"], k_k.day_machine)
+    _close(legacy_k["kpi2"], k_k.day_notification)
+    _close(legacy_k["kpi3"].values, k_k.shift_hours.values)
+    _close(legacy_k["kpi4_count"].sort_index(), k_k.category_jobs.sort_index())
+    _close(legacy_k["kpi4_time"].sort_index(), k_k.category_hours.sort_index())
+    _close(legacy_k["kpi5"], k_k.day_waiting)
+    _close(legacy_k["kpi6"].sort_index(), k_k.breakdown_machines().sort_index())
+    _close(legacy_k["kpi7"], k_k.hourly)
+    _close(legacy_k["kpi8"], k_k.day_hour)
+    _close(legacy_k["kpi9"].sort_index(), k_k.technicians.sort_index())
+    _close(legacy_k["kpi10"].sort_index(), k_k.top_reasons(10_000, "Breakdown").sort_index())
+    _close(legacy_k["pareto"].sort_values(), k_k.machine_hours.sort_values())
+
+
+def legacy_tech_loops(df):
+    """Both technician rules as the pages ran them: a zip loop and iterrows."""
+    rows = []
+    for who, h in zip(df["Performed By"].astype(object).fillna("Unknown"), df["time_h"]):
+        if pd.isna(h):
+            continue
+        names = split_names(who)
+        for nm in names:
+            rows.append((nm, h / len(names)))
+    equal = pd.DataFrame(rows, columns=["Technician", "hours"]).groupby("Technician")["hours"].sum()
+    full = []
+    for _, row in df.iterrows():
+        for t in split_techs(row["Performed By"]):
+            full.append({"Technician": t, "Consumed_Hours": row["Consumed_Hours"]})
+    full = pd.DataFrame(full).groupby("Technician")["Consumed_Hours"].sum()
+    return equal, full
+
+
+def tech_explode(df):
+    log = technician_log(df, KPI_REPORT_COLUMNS, carry=["time_h", "Consumed_Hours"])
+    equal = technician_hours(log, DAILY_REPORT_COLUMNS, "equal").sum(axis=1)
+    full = technician_hours(log, KPI_REPORT_COLUMNS, "full").sum(axis=1)
+    return equal, full
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'pipeline':>14} {'per-chart s':>12} {'engine s':>9} {'speedup':>8}")
+    for n in sizes:
+        df = make_log(n)
+        legacy_d, t_ld = timed(lambda: legacy_daily(df))
+        k_d, t_kd = timed(lambda: compute_kpis(df, DAILY_REPORT_COLUMNS, tech_credit="equal"))
+        print(f"{n:>10,} {'daily report':>14} {t_ld:>12.3f} {t_kd:>9.3f} {t_ld / t_kd:>7.1f}x")
+        legacy_k, t_lk = timed(lambda: legacy_kpi(df))
+        k_k, t_kk = timed(lambda: compute_kpis(df, KPI_REPORT_COLUMNS, tech_credit="full"))
+        print(f"{n:>10,} {'KPI report':>14} {t_lk:>12.3f} {t_kk:>9.3f} {t_lk / t_kk:>7.1f}x")
+        check(df, legacy_d, legacy_k, k_d, k_k)
+        (eq0, full0), t_lt = timed(lambda: legacy_tech_loops(df))
+        (eq1, full1), t_te = timed(lambda: tech_explode(df))
+        print(f"{n:>10,} {'technicians':>14} {t_lt:>12.3f} {t_te:>9.3f} {t_lt / t_te:>7.1f}x")
+        _close(eq0.sort_index(), eq1.sort_index())
+        _close(full0.sort_index(), full1.sort_index())
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
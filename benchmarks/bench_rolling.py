@@ -0,0 +1,94 @@
+"""Benchmark: rolling 7/30/90-day reliability, pandas rolling vs running totals.
+
+Run from the repository root:
+
+    python benchmarks/bench_rolling.py                 # 1 / 3 / 10 years, 19 machines
+    python benchmarks/bench_rolling.py 5000
+
+The reference recomputes each window with ``DataFrame.rolling(...).sum()``
+per measure; ``RollingReliability`` takes the differences of its running
+totals.  Each size then appends one more day both ways: pandas recomputes
+the series, the running totals add one row.  MTBF, MTTR and availability
+are checked against the reference for every window, machines and areas.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance.filters import day_number_dates  # noqa: E402
+from maintenance.rolling import MEASURES, WINDOWS, RollingReliability  # noqa: E402
+
+MACHINES = [f"M{i}" for i in range(1, 19)] + ["Crates Area/Line"]
+AREAS = pd.Series(["Filling"] * 8 + ["Packing"] * 10 + ["Crates"], index=MACHINES)
+
+
+def make_daily(days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.Index(day_number_dates(np.arange(20000, 20000 + days)), name="Date")
+    shape = (days, len(MACHINES))
+    planned = np.where(rng.random(shape) < 0.1, 0.0, 24.0)
+    events = rng.poisson(0.4, shape).astype(float)
+    repair = events * rng.gamma(2.0, 1.0, shape)
+    downtime = np.minimum(repair + rng.gamma(1.0, 0.5, shape), planned)
+    return {m: pd.DataFrame(v, index=index, columns=MACHINES)
+            for m, v in zip(MEASURES, (planned, downtime, repair, events))}
+
+
+def pandas_metrics(daily, window):
+    s = {m: f.rolling(window, min_periods=1).sum() for m, f in daily.items()}
+    run = (s["planned"] - s["downtime"]).clip(lower=0)
+    events = s["events"].where(s["events"] > 0)
+    return {
+        "MTBF_Hrs": run / events,
+        "MTTR_Hrs": s["repair"] / events,
+        "Availability_%": run / s["planned"].where(s["planned"] > 0) * 100,
+    }
+
+
+def check(ref, rolling, window):
+    for metric, expected in ref.items():
+        got = rolling.series(metric, window)
+        assert np.allclose(got.to_numpy(), expected.to_numpy(), equal_nan=True), (metric, window)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(sizes):
+    print(f"{'days':>8} {'pandas s':>9} {'cumsum s':>9} {'speedup':>8} {'+1 day pandas s':>16} {'+1 day append ms':>17}")
+    for days in sizes:
+        daily = make_daily(days + 1)
+        head = {m: f.iloc[:days] for m, f in daily.items()}
+
+        ref, t_pandas = timed(lambda: {w: pandas_metrics(head, w) for w in WINDOWS})
+        roll, t_build = timed(lambda: RollingReliability.from_daily(*(head[m] for m in MEASURES)))
+        _, t_series = timed(lambda: {w: roll.series("Availability_%", w) for w in WINDOWS})
+        for w in WINDOWS:
+            check(ref[w], roll, w)
+        by_area = {m: f.T.groupby(AREAS).sum().T for m, f in head.items()}
+        check(pandas_metrics(by_area, 30), roll.group(AREAS), 30)
+
+        # one new day: pandas recomputes every window, the running totals add one row
+        ref, t_pandas_day = timed(lambda: {w: pandas_metrics(daily, w) for w in WINDOWS})
+        last = {m: f.iloc[-1] for m, f in daily.items()}
+        _, t_append = timed(lambda: roll.append_day(*(last[m] for m in MEASURES)))
+        for w in WINDOWS:
+            check(ref[w], roll, w)
+            latest = roll.latest(w)
+            assert np.allclose(latest["Availability_%"], ref[w]["Availability_%"].iloc[-1], equal_nan=True)
+
+        t_cum = t_build + t_series
+        print(f"{days:>8,} {t_pandas:>9.4f} {t_cum:>9.4f} {t_pandas / t_cum:>7.1f}x "
+              f"{t_pandas_day:>16.4f} {t_append * 1000:>17.3f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [365, 3 * 365, 10 * 365])
@@ -0,0 +1 @@
+"""Shared data helpers for the maintenance dashboard pages."""
@@ -0,0 +1,170 @@
+"""Parquet sidecar cache for workbooks saved in the data folder.
+
+The cleaned "Main Data" frame of ``app_files/<name>`` is stored as
+``app_files/.cache/<name>.parquet`` together with a small JSON fingerprint
+(size, mtime, sha1 of the content).  Reads are served from the sidecar for
+as long as the fingerprint still matches the workbook on disk.
+"""
+import datetime as dt
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIRNAME = ".cache"
+# bump when the cleaned frame changes shape so older sidecars are rebuilt
+# 2: log sorted by Date with an int64 day_no column
+# 3: precomputed "reason" label
+# 4: per-row fingerprint of the raw cells ("row_fp") for delta ingestion
+# 5: time-like cells normalized instead of stringified (parquet_safe)
+# 6: every column of the sheet, not only the dashboard columns
+# 7: label Categoricals keep the logged values (no alias merging)
+CACHE_VERSION = 7
+
+
+def sidecar_paths(path):
+    """Return (parquet_path, meta_path) of the sidecar for a workbook."""
+    path = Path(path)
+    cache_dir = path.parent / CACHE_DIRNAME
+    return cache_dir / f"{path.name}.parquet", cache_dir / f"{path.name}.json"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha1 of the file content, read in 1 MB blocks."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(path):
+    """Size + mtime + content hash of a workbook."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": file_hash(path)}
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _is_fresh(path, meta_path, meta):
+    """Cheap size/mtime check first; only hash the file when mtime moved."""
+    if not meta or meta.get("version") != CACHE_VERSION:
+        return False
+    stat = os.stat(path)
+    if stat.st_size != meta.get("size"):
+        return False
+    if stat.st_mtime_ns == meta.get("mtime_ns"):
+        return True
+    # touched / copied but maybe not changed -> compare content
+    if file_hash(path) != meta.get("sha1"):
+        return False
+    meta["mtime_ns"] = stat.st_mtime_ns
+    _write_meta(meta_path, meta)
+    return True
+
+
+def _clock_cell(v):
+    """A time-like cell in a form Parquet stores and the duration parser reads back unchanged.
+
+    Datetimes keep their wall clock (the parser only looks at hh:mm:ss), so
+    a column of time and datetime cells becomes a plain time column;
+    Timedeltas become "h:mm:ss" text, which parses to the same length.  A
+    bare ``datetime.timedelta`` is not read as a duration (see
+    ``durations._kind``), so it keeps a text form that is not read either.
+    """
+    if v is pd.NaT:
+        return None
+    if isinstance(v, (pd.Timestamp, dt.datetime)):
+        return v.time()
+    if isinstance(v, pd.Timedelta):
+        seconds = round(v.total_seconds())
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    if isinstance(v, dt.timedelta):
+        return str(pd.Timedelta(v))  # "0 days 03:10:00"
+    return v
+
+
+def parquet_safe(df):
+    """Excel object columns mix str/int/time values; store them as time or text.
+
+    Time-like cells are normalized first (``_clock_cell``), so Start/End and
+    duration columns parse to the same minutes on a cache hit as on a cold
+    load.  A column that is then all clock times stays a time column; any
+    other mix is stored as text.
+    """
+    out = df.copy()
+    for c in out.columns:
+        if out[c].dtype == object:
+            col = out[c].map(_clock_cell)
+            cells = col.dropna()
+            if len(cells) and cells.map(type).eq(dt.time).all():
+                out[c] = col
+            else:
+                out[c] = col.where(col.isna(), col.astype(str))
+    return out
+
+
+def invalidate(path):
+    """Drop the sidecar of a workbook (after save, overwrite, rename or delete)."""
+    for p in sidecar_paths(path):
+        Path(p).unlink(missing_ok=True)
+
+
+def read_sidecar(path):
+    """Cleaned frame of the sidecar even when stale (None if missing or from another version)."""
+    pq_path, meta_path = sidecar_paths(path)
+    meta = _read_meta(meta_path)
+    if not meta or meta.get("version") != CACHE_VERSION or not pq_path.exists():
+        return None
+    try:
+        return pd.read_parquet(pq_path)
+    except Exception:
+        return None
+
+
+def write_sidecar(path, df, info, fp):
+    """Store ``df`` as the sidecar of ``path``; ``fp`` is the fingerprint taken before reading."""
+    pq_path, meta_path = sidecar_paths(path)
+    try:
+        pq_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(pq_path, index=False)
+        _write_meta(meta_path, dict(fp, version=CACHE_VERSION, info=info))
+    except Exception:
+        # no parquet engine installed or unserialisable column: just skip caching
+        invalidate(path)
+
+
+def load_cached(path, loader):
+    """Return (df, info) for a saved workbook, using the sidecar when fresh.
+
+    ``loader(path)`` must return the cleaned frame and a JSON-serialisable
+    info dict (sheet name, raw row count, ...).  It is only called on a miss.
+    """
+    path = Path(path)
+    pq_path, meta_path = sidecar_paths(path)
+    meta = _read_meta(meta_path)
+
+    if pq_path.exists() and _is_fresh(path, meta_path, meta):
+        try:
+            return pd.read_parquet(pq_path), dict(meta.get("info", {}), cached=True)
+        except Exception:
+            invalidate(path)
+
+    fp = fingerprint(path)  # taken before parsing so a concurrent write is not masked
+    df, info = loader(path)
+    df = parquet_safe(df)  # same dtypes on a miss as on a later hit
+    write_sidecar(path, df, info, fp)
+    return df, dict(info, cached=False)
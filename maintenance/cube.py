@@ -0,0 +1,157 @@
+"""Pre-aggregated downtime cube of the cleaned log.
+
+Most charts are a sum of consumed hours grouped by some subset of day,
+hour, machine, shift, area and job category.  ``DowntimeCube`` groups the
+log once on all of those keys and keeps one row per non-empty cell
+(sparse COO: integer codes per dimension + the summed measures).  A chart
+is then a roll-up of the cells (``rollup``), a filter is a selection of
+cells (``slice``), and a drill-down is both (``drill_down``); none of them
+touch the raw rows again.
+
+Codes follow the order ``groupby`` uses (category order for Categoricals,
+sorted values otherwise), so roll-ups come out exactly like the per-chart
+``groupby(..., observed=True)`` they replace.  Blank keys get their own
+code after the last label: they count in totals but, as with ``groupby``,
+drop out of any roll-up on that dimension.
+"""
+import numpy as np
+import pandas as pd
+
+# roll-ups over more label combinations than this group the cells with pandas instead of one integer key
+MAX_DENSE_KEYS = 50_000_000
+
+
+def _encode(values):
+    """Series -> (int codes with blanks = len(labels), labels Index)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy().astype(np.int32)
+        labels = pd.CategoricalIndex(values.cat.categories, dtype=values.dtype)
+    else:
+        codes, uniques = pd.factorize(values, sort=True)
+        codes = codes.astype(np.int32)
+        labels = pd.Index(uniques)
+    codes[codes < 0] = len(labels)
+    return codes, labels
+
+
+class DowntimeCube:
+    """Sparse cube: one row of ``cells`` per observed key combination.
+
+    ``cells`` holds an int32 code column per dimension (into
+    ``labels[dim]``) and a float/int column per measure.
+    """
+
+    def __init__(self, dims, labels, cells, measures):
+        self.dims = tuple(dims)
+        self.labels = labels
+        self.cells = cells
+        self.measures = tuple(measures)
+
+    @classmethod
+    def from_frame(cls, frame, dims, measures):
+        """Group ``frame`` on ``dims`` and sum ``measures`` (NaN counts as 0)."""
+        labels, data = {}, {}
+        for d in dims:
+            data[d], labels[d] = _encode(frame[d])
+        for m in measures:
+            data[m] = frame[m].to_numpy()
+        cells = pd.DataFrame(data).groupby(list(dims), sort=True).sum().reset_index()
+        return cls(dims, labels, cells, measures)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def total(self, measure="hours"):
+        return self.cells[measure].sum()
+
+    def _label_codes(self, dim, selection):
+        """Codes of ``dim`` matching a list of labels or an inclusive ``slice(lo, hi)``."""
+        labels = self.labels[dim]
+        if isinstance(selection, slice):
+            values = np.asarray(labels)
+            ok = np.ones(len(labels), dtype=bool)
+            if selection.start is not None:
+                ok &= values >= selection.start
+            if selection.stop is not None:
+                ok &= values <= selection.stop
+            return np.flatnonzero(ok)
+        found = labels.get_indexer(pd.Index(list(selection), dtype=object))
+        return found[found >= 0]
+
+    def slice(self, **selections):
+        """Sub-cube of the cells whose labels match, e.g. ``slice(machine=["M15"], day=slice(lo, hi))``.
+
+        ``None`` or an empty list leaves a dimension unfiltered.
+        """
+        keep = np.ones(len(self.cells), dtype=bool)
+        for dim, sel in selections.items():
+            if sel is None or (not isinstance(sel, slice) and len(sel) == 0):
+                continue
+            keep &= np.isin(self.cells[dim].to_numpy(), self._label_codes(dim, sel))
+        return DowntimeCube(self.dims, self.labels, self.cells[keep], self.measures)
+
+    def _keys(self, dims):
+        """Group the cells on ``dims``.
+
+        Returns (kept cell mask, group number per kept cell, codes of each
+        group as one array per dim); groups come in label order.
+        """
+        shape = tuple(len(self.labels[d]) for d in dims)
+        codes = [self.cells[d].to_numpy() for d in dims]
+        keep = np.ones(len(self.cells), dtype=bool)
+        for c, size in zip(codes, shape):
+            keep &= c < size
+        codes = [c[keep] for c in codes]
+        if np.prod(shape, dtype=float) <= MAX_DENSE_KEYS:
+            flat, uniques = pd.factorize(np.ravel_multi_index(codes, shape), sort=True)
+            return keep, flat, np.unravel_index(uniques, shape)
+        # too many label combinations for one integer key: let pandas group the code columns
+        grouped = pd.DataFrame(dict(zip(dims, codes))).groupby(list(dims), sort=True)
+        first = grouped.ngroup().to_numpy()
+        keys = grouped.size().index
+        return keep, first, [keys.get_level_values(d).to_numpy() for d in dims]
+
+    def rollup(self, *dims, measure="hours"):
+        """Sum ``measure`` (a name or a list) over every dimension not in ``dims``.
+
+        Returns a Series (one measure) or DataFrame indexed by the labels
+        of ``dims``; cells with a blank key on one of ``dims`` drop out.
+        """
+        keep, flat, group_codes = self._keys(dims)
+        n = len(group_codes[0])
+        measures = [measure] if isinstance(measure, str) else list(measure)
+        data = {}
+        for m in measures:
+            col = self.cells[m].to_numpy()[keep]
+            summed = np.bincount(flat, weights=np.nan_to_num(col.astype(float)), minlength=n)
+            data[m] = summed.astype(col.dtype) if col.dtype.kind in "iu" else summed
+
+        if len(dims) == 1:
+            index = self.labels[dims[0]].take(group_codes[0]).rename(dims[0])
+        else:
+            # levels hold only the labels present, in label order: pandas drops unused
+            # Categorical levels on unstack by order of appearance instead
+            levels, codes = [], []
+            for d, c in zip(dims, group_codes):
+                used, inverse = np.unique(c, return_inverse=True)
+                levels.append(self.labels[d].take(used))
+                codes.append(inverse)
+            index = pd.MultiIndex(levels=levels, codes=codes, names=list(dims))
+        if isinstance(measure, str):
+            return pd.Series(data[measure], index=index, name=measure)
+        return pd.DataFrame(data, index=index)
+
+    def drill_down(self, dim, value, into, measure="hours"):
+        """``measure`` of the cells where ``dim == value``, broken down by ``into``."""
+        into = [into] if isinstance(into, str) else list(into)
+        return self.slice(**{dim: [value]}).rollup(*into, measure=measure)
+
+    def dense(self, *dims, measure="hours"):
+        """``measure`` as a dense ndarray over the labels of ``dims`` (missing cells are 0)."""
+        shape = tuple(len(self.labels[d]) for d in dims)
+        out = np.zeros(shape)
+        summed = self.rollup(*dims, measure=measure)
+        if len(summed):
+            codes = [self.labels[d].get_indexer(summed.index.get_level_values(d)) for d in dims]
+            out[tuple(codes)] = summed.to_numpy(dtype=float)
+        return out
@@ -0,0 +1,209 @@
+"""Vectorized parsing of Excel time / duration cells.
+
+Maintenance logs mix several representations in the same column:
+``Timedelta``, ``Timestamp`` / ``datetime`` / ``time`` clock values, Excel
+fractions of a day, and "hh:mm[:ss]" strings.  Instead of a Python
+function per cell, the column is split by value type and every group is
+converted with one pandas/NumPy bulk operation.
+
+``duration_hours`` reproduces ``to_hours`` of the daily report and
+``duration_minutes`` reproduces ``time_to_minutes`` of the KPI script,
+including the ``<= 1.5`` day-fraction heuristic, value for value.
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+HHMM_RE = r"^(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$"
+
+# value kinds, checked in the same order as the per-cell isinstance chains
+NA, TIMEDELTA, CLOCK, NUMBER, TEXT, OTHER = range(6)
+
+
+def _kind(t):
+    if issubclass(t, pd.Timedelta):
+        return TIMEDELTA
+    if issubclass(t, (pd.Timestamp, dt.datetime, dt.time)):
+        return CLOCK
+    if issubclass(t, (int, float, np.integer, np.floating)):
+        return NUMBER
+    if issubclass(t, str):
+        return TEXT
+    # bare datetime.timedelta, Decimal, ... fall through exactly like before
+    return OTHER
+
+
+def _kinds_by_type(values, classify):
+    """Classify each cell by its type, calling ``classify`` once per distinct type."""
+    types = values.map(type)
+    lookup = {t: classify(t) for t in types.unique()}
+    return types.map(lookup).to_numpy()
+
+
+def _clock_parts(values):
+    """hour, minute, second arrays of Timestamp/datetime/time objects (sub-seconds dropped)."""
+    n = len(values)
+    hh, mm, ss = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    is_time = _kinds_by_type(values, lambda t: issubclass(t, dt.time)).astype(bool)
+
+    for sel, convert in ((~is_time, _stamp_parts), (is_time, _time_parts)):
+        if sel.any():
+            hh[sel], mm[sel], ss[sel] = convert(values[sel])
+    return hh, mm, ss
+
+
+def _stamp_parts(values):
+    try:
+        ts = pd.to_datetime(values)
+        return ts.dt.hour.to_numpy(), ts.dt.minute.to_numpy(), ts.dt.second.to_numpy()
+    except (TypeError, ValueError):  # mixed time zones: keep each value's own wall clock
+        return _attr_parts(values)
+
+
+def _time_parts(values):
+    # clock values repeat a lot (at most 86400 distinct): convert each distinct one once
+    codes, uniques = pd.factorize(values)
+    return tuple(p[codes] for p in _attr_parts(uniques))
+
+
+def _attr_parts(values):
+    return (np.array([x.hour for x in values], dtype=float),
+            np.array([x.minute for x in values], dtype=float),
+            np.array([x.second for x in values], dtype=float))
+
+
+def _split(series):
+    """Split a column by value kind.
+
+    Returns (s, kinds, seconds, hh, mm, ss, numbers, leftover) with
+    positional arrays: ``seconds`` holds Timedelta lengths, ``hh/mm/ss``
+    clock values and matched "hh:mm[:ss]" strings, ``numbers`` raw numeric
+    cells, and ``leftover`` maps positions of strings that did not match
+    the pattern to their stripped text.
+    """
+    s = pd.Series(series)
+    n = len(s)
+    seconds, hh, mm, ss, numbers = (np.full(n, np.nan) for _ in range(5))
+    leftover = pd.Series([], dtype=object)
+    na = s.isna().to_numpy()
+
+    if pd.api.types.is_timedelta64_dtype(s):
+        kinds = np.where(na, NA, TIMEDELTA)
+        return s, kinds, s.dt.total_seconds().to_numpy(), hh, mm, ss, numbers, leftover
+    if pd.api.types.is_datetime64_any_dtype(s):
+        kinds = np.where(na, NA, CLOCK)
+        hh, mm, ss = (a.to_numpy(dtype=float, na_value=np.nan) for a in (s.dt.hour, s.dt.minute, s.dt.second))
+        return s, kinds, seconds, hh, mm, ss, numbers, leftover
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        kinds = np.where(na, NA, NUMBER)
+        return s, kinds, seconds, hh, mm, ss, s.to_numpy(dtype=float, na_value=np.nan), leftover
+
+    kinds = np.full(n, NA)
+    kinds[~na] = _kinds_by_type(s[~na], _kind)
+
+    sel = kinds == TIMEDELTA
+    if sel.any():
+        seconds[sel] = pd.to_timedelta(s[sel]).dt.total_seconds().to_numpy()
+
+    sel = kinds == CLOCK
+    if sel.any():
+        hh[sel], mm[sel], ss[sel] = _clock_parts(s[sel])
+
+    sel = kinds == NUMBER
+    if sel.any():
+        numbers[sel] = s[sel].astype(float).to_numpy()
+
+    sel = np.flatnonzero(kinds == TEXT)
+    if len(sel):
+        # same idea for strings: run the regex on the distinct values only
+        codes, uniques = pd.factorize(s.iloc[sel].to_numpy(dtype=object))
+        text = pd.Series(uniques, dtype=object).str.strip()
+        parts = text.str.extract(HHMM_RE).astype(float).to_numpy()[codes]
+        ok = ~np.isnan(parts[:, 0])
+        hit = sel[ok]
+        hh[hit], mm[hit], ss[hit] = parts[ok, 0], parts[ok, 1], np.nan_to_num(parts[ok, 2])
+        kinds[hit] = CLOCK
+        leftover = pd.Series(text.to_numpy()[codes[~ok]], index=sel[~ok], dtype=object)
+    return s, kinds, seconds, hh, mm, ss, numbers, leftover
+
+
+def duration_hours(series):
+    """Hours from Excel time/duration values (vectorized ``to_hours``).
+
+    Numbers ``<= 1.5`` are read as a fraction of a day, larger numbers as
+    hours; strings must look like "hh:mm[:ss]"; anything else is NaN.
+    """
+    s, kinds, seconds, hh, mm, ss, numbers, _ = _split(series)
+    out = np.full(len(s), np.nan)
+    out = np.where(kinds == TIMEDELTA, seconds / 3600, out)
+    out = np.where(kinds == CLOCK, hh + mm / 60 + ss / 3600, out)
+    out = np.where(kinds == NUMBER, np.where(numbers <= 1.5, numbers * 24, numbers), out)
+    return pd.Series(out, index=s.index)
+
+
+def _minutes_from_number(v):
+    # 0..1.5 -> fraction of day, <= 48 -> hours, otherwise already minutes
+    return np.where((v >= 0) & (v <= 1.5), v * 24 * 60, np.where(v <= 48, v * 60, v))
+
+
+def duration_minutes(series, default=np.nan):
+    """Minutes from Excel time/duration values (vectorized ``time_to_minutes``).
+
+    Strings that are not "hh:mm[:ss]" are tried as plain numbers; blanks
+    and unparseable cells get ``default``.
+    """
+    s, kinds, seconds, hh, mm, ss, numbers, leftover = _split(series)
+    out = np.full(len(s), default, dtype=float)
+    out = np.where(kinds == TIMEDELTA, seconds / 60, out)
+    out = np.where(kinds == CLOCK, hh * 60 + mm + ss / 60, out)
+    out = np.where((kinds == NUMBER) & ~np.isnan(numbers), _minutes_from_number(numbers), out)
+
+    if len(leftover):
+        v = pd.to_numeric(leftover, errors="coerce").dropna()
+        out[v.index.to_numpy()] = _minutes_from_number(v.to_numpy(dtype=float))
+    return pd.Series(out, index=s.index)
+
+
+HOUR_RE = r"^(\d{1,2}):"
+
+
+def _hours(series):
+    """Hour of day as int8 from clock values and "HH:" strings; -1 where unknown."""
+    s = pd.Series(series)
+    n = len(s)
+    out = np.full(n, -1, dtype=np.int8)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.hour.fillna(-1).to_numpy(dtype=np.int8)
+    if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_timedelta64_dtype(s):
+        return out  # numbers and durations never carried an hour of day
+
+    na = s.isna().to_numpy()
+    kinds = np.full(n, NA)
+    kinds[~na] = _kinds_by_type(s[~na], _kind)
+
+    sel = kinds == CLOCK
+    if sel.any():
+        out[sel] = _clock_parts(s[sel])[0]
+
+    sel = np.flatnonzero(kinds == TEXT)
+    if len(sel):
+        codes, uniques = pd.factorize(s.iloc[sel].to_numpy(dtype=object))
+        hh = pd.Series(uniques, dtype=object).str.strip().str.extract(HOUR_RE)[0].astype(float)
+        out[sel] = hh.fillna(-1).to_numpy()[codes]
+    return out
+
+
+def hour_of_day(start, fallback=None):
+    """Hour 0-23 from ``start``, else from ``fallback`` (e.g. Requested Time).
+
+    Returns a compact ``int8`` Series aligned with ``start``; -1 means the
+    hour is unknown in both columns.
+    """
+    start = pd.Series(start)
+    hours = _hours(start)
+    if fallback is not None:
+        missing = hours < 0
+        if missing.any():
+            hours[missing] = _hours(pd.Series(fallback)[missing])
+    return pd.Series(hours, index=start.index, dtype=np.int8)
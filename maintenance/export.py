@@ -0,0 +1,94 @@
+"""Download formats for the filtered maintenance log.
+
+Exports are built on demand, not on every Streamlit rerun.  The xlsx
+writer streams rows through xlsxwriter's ``constant_memory`` mode (one
+row in memory at a time) instead of building an openpyxl workbook; CSV
+and Parquet are offered for exports too big to be comfortable in Excel.
+"""
+import datetime as dt
+import hashlib
+import io
+
+import pandas as pd
+
+from maintenance.cache import parquet_safe
+
+EXPORT_FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "Excel (xlsx)"),
+    "csv": ("text/csv", "CSV"),
+    "parquet": ("application/octet-stream", "Parquet"),
+}
+
+
+def _cell_values(s):
+    """Column -> list of native Python values with None for blanks."""
+    if isinstance(s.dtype, pd.DatetimeTZDtype):
+        s = s.dt.tz_localize(None)  # Excel has no time zones
+    return s.astype(object).where(s.notna(), None).tolist()
+
+
+def _column_format(s):
+    """Excel number format for clock / duration columns (dates use the default)."""
+    if pd.api.types.is_timedelta64_dtype(s):
+        return "[h]:mm:ss"
+    if s.dtype == object:
+        first = s.dropna().head(1).tolist()
+        if first and isinstance(first[0], dt.time):
+            return "hh:mm:ss"
+        if first and isinstance(first[0], dt.timedelta):
+            return "[h]:mm:ss"
+    return None
+
+
+def to_xlsx_bytes(df, sheet_name="Filtered Data"):
+    """Stream ``df`` into xlsx bytes row by row (xlsxwriter ``constant_memory``)."""
+    import xlsxwriter
+
+    buff = io.BytesIO()
+    wb = xlsxwriter.Workbook(buff, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    ws = wb.add_worksheet(sheet_name[:31])
+    ws.write_row(0, 0, [str(c) for c in df.columns], wb.add_format({"bold": True}))
+    # constant_memory flushes each finished row, so cells must arrive row-major
+    columns = [_cell_values(df[c]) for c in df.columns]
+    special = [(i, wb.add_format({"num_format": f}))
+               for i, f in enumerate(_column_format(df[c]) for c in df.columns) if f]
+    for r, row in enumerate(zip(*columns), start=1):
+        ws.write_row(r, 0, row)
+        for i, fmt in special:  # still the current row, so it can be rewritten
+            if row[i] is not None:
+                ws.write(r, i, row[i], fmt)
+    wb.close()
+    return buff.getvalue()
+
+
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def to_parquet_bytes(df):
+    buff = io.BytesIO()
+    parquet_safe(df).to_parquet(buff, index=False)
+    return buff.getvalue()
+
+
+def filter_state_hash(dataset_key, bits):
+    """Key of one filtered view: the dataset plus the packed row bitset of the filters."""
+    h = hashlib.sha1(repr(dataset_key).encode("utf-8"))
+    h.update(bits.tobytes())
+    return h.hexdigest()
+
+
+EXPORTERS = {"xlsx": to_xlsx_bytes, "csv": to_csv_bytes, "parquet": to_parquet_bytes}
+
+
+def export_bytes(df, fmt, sheet_name="Filtered Data"):
+    """``df`` as bytes in ``fmt`` (a key of ``EXPORT_FORMATS``)."""
+    if fmt == "xlsx":
+        return to_xlsx_bytes(df, sheet_name)
+    return EXPORTERS[fmt](df)
@@ -0,0 +1,176 @@
+"""Rendered matplotlib charts, cached by the data they show.
+
+Every rerun of the daily report rebuilt each figure with ``plt.subplots``
+and handed it to ``st.pyplot``; none were closed, and most reruns come
+from a widget that does not touch the chart at all.  Here a chart is a
+drawing function from ``CHARTS`` plus its data and styling: the key is a
+hash of the three, the value the rendered PNG / SVG bytes, kept in a
+bounded LRU (``FigureCache``).  A figure is always closed right after
+rendering, cached or not, so nothing accumulates in pyplot's registry.
+
+Hashing a KPI aggregate (a few hundred values) takes microseconds; a hit
+skips matplotlib entirely.
+"""
+import hashlib
+import io
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+FIGURE_CACHE_SIZE = 32  # rendered charts kept per session
+FIGURE_DPI = 150
+
+
+def _array_bytes(values):
+    """Raw bytes of a numeric array, else the reprs of its values (chart labels are few)."""
+    values = np.asarray(values)
+    if values.dtype.kind in "biufcmM":
+        return np.ascontiguousarray(values).tobytes()
+    return "\x1f".join(map(repr, values.ravel().tolist())).encode("utf-8")
+
+
+def _update(h, obj):
+    """Feed ``obj`` (pandas / numpy / plain values, nested) into the hash."""
+    if isinstance(obj, pd.DataFrame):
+        values = obj.to_numpy()
+        h.update(repr(("DataFrame", obj.shape, str(values.dtype))).encode("utf-8"))
+        _update(h, obj.columns)
+        _update(h, obj.index)
+        h.update(_array_bytes(values))
+    elif isinstance(obj, pd.Series):
+        h.update(repr(("Series", obj.shape, obj.name, str(obj.dtype))).encode("utf-8"))
+        _update(h, obj.index)
+        h.update(_array_bytes(obj.to_numpy()))
+    elif isinstance(obj, pd.MultiIndex):
+        h.update(repr(("MultiIndex", len(obj), list(obj.names))).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+    elif isinstance(obj, pd.Index):
+        h.update(repr(("Index", len(obj), list(obj.names), str(obj.dtype))).encode("utf-8"))
+        h.update(_array_bytes(obj.to_numpy()))
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode("utf-8"))
+        h.update(_array_bytes(obj))
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            h.update(repr(k).encode("utf-8"))
+            _update(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode("utf-8"))
+        for v in obj:
+            _update(h, v)
+    else:
+        h.update(repr(obj).encode("utf-8"))
+
+
+def chart_key(kind, data, style, fmt):
+    """Hex digest of a chart: its kind, data, styling and output format."""
+    h = hashlib.sha1(f"{kind}|{fmt}|{FIGURE_DPI}".encode("utf-8"))
+    _update(h, data)
+    _update(h, style)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------
+# Drawing functions: data + styling -> Figure (never shown, never kept)
+# ---------------------------------------------------------------
+def _labels(ax, title=None, xlabel=None, ylabel=None):
+    if title:
+        ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+
+
+def bar(series, title=None, xlabel=None, ylabel=None, rotate=False, xticks=None, figsize=(10, 4)):
+    fig, ax = plt.subplots(figsize=figsize)
+    x = series.index if xticks is not None else series.index.astype(str)
+    ax.bar(x, series.to_numpy())
+    _labels(ax, title, xlabel, ylabel)
+    if xticks is not None:
+        ax.set_xticks(list(xticks))
+    if rotate:
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    return fig
+
+
+def barh(series, title=None, xlabel=None, ylabel=None, figsize=(10, 4)):
+    """Horizontal bars, first item on top."""
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.barh(series.index.astype(str)[::-1], series.to_numpy()[::-1])
+    _labels(ax, title, xlabel, ylabel)
+    return fig
+
+
+def line(series, title=None, xlabel=None, ylabel=None, rotate=False, figsize=(10, 4)):
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.plot(series.index, series.to_numpy())
+    _labels(ax, title, xlabel, ylabel)
+    if rotate:
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    return fig
+
+
+def heatmap(frame, title=None, xlabel=None, ylabel=None, colorbar=None, max_ylabels=30, figsize=(12, 5)):
+    """Date x Hour style grid with at most ``max_ylabels`` row labels."""
+    fig, ax = plt.subplots(figsize=figsize)
+    im = ax.imshow(frame.to_numpy(dtype=float), aspect="auto", interpolation="nearest")
+    _labels(ax, title, xlabel, ylabel)
+    ax.set_xticks(range(frame.shape[1]))
+    ax.set_xticklabels([str(c) for c in frame.columns])
+    step = max(1, len(frame) // max_ylabels)
+    ax.set_yticks(range(0, len(frame), step))
+    ax.set_yticklabels([str(d) for d in frame.index[::step]])
+    fig.colorbar(im, ax=ax, label=colorbar)
+    return fig
+
+
+CHARTS = {"bar": bar, "barh": barh, "line": line, "heatmap": heatmap}
+
+
+def render(fig, fmt="png"):
+    """Figure -> bytes; the figure is closed whatever happens."""
+    try:
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, dpi=FIGURE_DPI, bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class FigureCache:
+    """LRU of rendered charts: chart key -> bytes."""
+
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        return sum(len(v) for v in self._items.values())
+
+    def chart(self, kind, data, fmt="png", **style):
+        """Bytes of ``CHARTS[kind](data, **style)`` in ``fmt``, rendered only on a miss."""
+        key = chart_key(kind, data, style, fmt)
+        out = self._items.get(key)
+        if out is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return out
+        self.misses += 1
+        out = render(CHARTS[kind](data, **style), fmt)
+        self._items[key] = out
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return out
+
+    def clear(self):
+        self._items.clear()
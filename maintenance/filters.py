@@ -0,0 +1,159 @@
+"""Bitmap indexes for the sidebar filters of the maintenance dashboard.
+
+Built once per loaded dataset: every distinct value of every filter
+column gets a packed bitset (``np.packbits``, one bit per row), and the
+Date column gets a sorted position index.  Any combination of sidebar
+filters then resolves with bitwise AND/OR on ``n / 8`` bytes instead of
+re-scanning and re-stringifying the whole frame on every rerun.
+
+The cleaned log is kept sorted by Date with an int64 ``day_no`` column
+(see ``sort_by_date``), so a date range is just a ``searchsorted`` pair
+giving a contiguous row slice (``DateIndex``).
+"""
+import numpy as np
+import pandas as pd
+
+NAT_DAY = np.iinfo(np.int64).max  # NaT sorts after every real day
+DAY_COL = "day_no"
+
+
+def day_numbers(dates):
+    """int64 days since 1970-01-01 for a datetime Series (NaT -> NAT_DAY)."""
+    d = pd.to_datetime(pd.Series(dates), errors="coerce")
+    days = d.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+    days[d.isna().to_numpy()] = NAT_DAY
+    return days
+
+
+def to_day_number(d):
+    """datetime.date / Timestamp -> int64 day number."""
+    return int(np.datetime64(pd.Timestamp(d).date(), "D").astype(np.int64))
+
+
+def day_number_dates(days):
+    """int64 day numbers -> array of datetime.date."""
+    return pd.to_datetime(np.asarray(days).astype("datetime64[D]")).date
+
+
+def sort_by_date(df, date_col="Date"):
+    """Stable sort by ``date_col`` (NaT last), add ``day_no``, reset the index."""
+    days = day_numbers(df[date_col])
+    order = np.argsort(days, kind="stable")
+    out = df.iloc[order].reset_index(drop=True)
+    out[DAY_COL] = days[order]
+    return out
+
+
+class DateIndex:
+    """Day numbers of a Date-sorted frame -> contiguous row slices."""
+
+    def __init__(self, days):
+        self.days = np.asarray(days, dtype=np.int64)
+        if len(self.days) > 1 and (self.days[1:] < self.days[:-1]).any():
+            raise ValueError("DateIndex needs rows sorted by Date (see sort_by_date)")
+
+    @classmethod
+    def of(cls, df, date_col="Date"):
+        """Index of a sorted frame, reusing its ``day_no`` column when present."""
+        days = df[DAY_COL].to_numpy() if DAY_COL in df.columns else day_numbers(df[date_col])
+        return cls(days)
+
+    def slice(self, start, end):
+        """Row slice with start <= Date <= end (whole days, NaT excluded)."""
+        lo = np.searchsorted(self.days, to_day_number(start), side="left")
+        hi = np.searchsorted(self.days, to_day_number(end), side="right")
+        return slice(int(lo), int(hi))
+
+    def dated(self):
+        """Number of leading rows with a Date (NaT rows sort last)."""
+        return int(np.searchsorted(self.days, NAT_DAY, side="left"))
+
+    def day_groups(self):
+        """(day_numbers, start_positions) of every distinct non-NaT day."""
+        d = self.days[:self.dated()]
+        if not len(d):
+            return d, np.array([], dtype=np.intp)
+        starts = np.flatnonzero(np.r_[True, d[1:] != d[:-1]])
+        return d[starts], starts
+
+    def sum_by_day(self, values):
+        """Per-day sums of ``values`` (NaN counted as 0) via ``np.add.reduceat``."""
+        days, starts = self.day_groups()
+        # the last day ends where the NaT rows begin, not at the end of the frame
+        vals = np.nan_to_num(np.asarray(values, dtype=float)[:self.dated()])
+        sums = np.add.reduceat(vals, starts) if len(starts) else np.array([])
+        return pd.Series(sums, index=day_number_dates(days))
+
+
+class FilterIndex:
+    """Per-value bitsets for ``columns`` plus a sorted date index of ``df``."""
+
+    def __init__(self, df, columns, date_col="Date"):
+        self.n = len(df)
+        self._ones = np.packbits(np.ones(self.n, dtype=bool))
+        self._zeros = np.zeros_like(self._ones)
+
+        self.bitmaps = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            s = df[col]
+            if not isinstance(s.dtype, pd.CategoricalDtype):
+                s = s.astype(str).where(s.notna()).astype("category")
+            self.bitmaps[col] = self._build(s.cat.codes.to_numpy(), s.cat.categories)
+
+        # sorted log: date ranges are plain slices; otherwise go through an argsort
+        self.dates = self.date_order = None
+        if DAY_COL in df.columns or date_col in df.columns:
+            days = df[DAY_COL].to_numpy() if DAY_COL in df.columns else day_numbers(df[date_col])
+            if len(days) > 1 and (days[1:] < days[:-1]).any():
+                self.date_order = np.argsort(days, kind="stable")
+                days = days[self.date_order]
+            self.dates = DateIndex(days)
+
+    def _build(self, codes, categories):
+        # group row positions by code in one sort, then one bitset per present value
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+        out = {}
+        for i, value in enumerate(categories):
+            lo, hi = bounds[i], bounds[i + 1]
+            if lo == hi:
+                continue
+            rows = np.zeros(self.n, dtype=bool)
+            rows[order[lo:hi]] = True
+            out[value] = np.packbits(rows)
+        return out
+
+    def all(self):
+        """Bitset with every row selected."""
+        return self._ones.copy()
+
+    def date_range(self, start, end):
+        """Bitset of rows with start <= Date <= end (dates inclusive, NaT excluded)."""
+        if self.dates is None:
+            return self.all()
+        sl = self.dates.slice(start, end)
+        rows = np.zeros(self.n, dtype=bool)
+        rows[sl if self.date_order is None else self.date_order[sl]] = True
+        return np.packbits(rows)
+
+    def values(self, col, values):
+        """OR of the bitsets of ``values`` in ``col``."""
+        out = self._zeros.copy()
+        bitmaps = self.bitmaps.get(col, {})
+        for v in values:
+            if v in bitmaps:
+                out |= bitmaps[v]
+        return out
+
+    def options(self, col, bits):
+        """Values of ``col`` that occur in the rows selected by ``bits`` (index order)."""
+        return [v for v, b in self.bitmaps.get(col, {}).items() if (b & bits).any()]
+
+    def mask(self, bits):
+        """Boolean row mask for DataFrame indexing."""
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+    def count(self, bits):
+        return int(np.unpackbits(bits, count=self.n).sum())
@@ -0,0 +1,87 @@
+"""Summed-area table over the Date x Hour downtime matrix.
+
+The heatmaps used to show ``day_hour.tail(30)`` only.  ``DayHourTable``
+lays the matrix out on a contiguous calendar (days without jobs are zero
+rows) and keeps its 2D prefix sums, so the total of any date window x
+hour band is four lookups, whatever the span:
+
+    S[i, j] = sum(grid[:i, :j])
+    total(d0..d1, h0..h1) = S[d1+1, h1+1] - S[d0, h1+1] - S[d1+1, h0] + S[d0, h0]
+
+Rendering a window is a slice of the dense grid (no pivot).
+"""
+import numpy as np
+import pandas as pd
+
+from maintenance.filters import day_number_dates, to_day_number
+
+HOURS = 24
+
+
+class DayHourTable:
+    """Dense day x hour grid from ``first_day`` (day number) on, plus its prefix sums."""
+
+    def __init__(self, first_day, grid):
+        self.first_day = int(first_day)
+        self.grid = np.asarray(grid, dtype=float).reshape(-1, HOURS)
+        self.sat = np.zeros((len(self.grid) + 1, HOURS + 1))
+        self.sat[1:, 1:] = self.grid.cumsum(axis=0).cumsum(axis=1)
+
+    @classmethod
+    def from_day_hour(cls, day_hour):
+        """From a Date x Hour frame (``KpiResult.day_hour``), dates as the index."""
+        if len(day_hour) == 0:
+            return cls(0, np.zeros((0, HOURS)))
+        days = np.array([to_day_number(d) for d in day_hour.index], dtype=np.int64)
+        first = days.min()
+        grid = np.zeros((days.max() - first + 1, HOURS))
+        grid[days - first] = day_hour.reindex(columns=range(HOURS)).fillna(0).to_numpy(dtype=float)
+        return cls(first, grid)
+
+    def __len__(self):
+        return len(self.grid)
+
+    @property
+    def first(self):
+        return day_number_dates([self.first_day])[0] if len(self) else None
+
+    @property
+    def last(self):
+        return day_number_dates([self.first_day + len(self) - 1])[0] if len(self) else None
+
+    def _rows(self, start, end):
+        """Dates -> [lo, hi) row range clipped to the table."""
+        lo = 0 if start is None else to_day_number(start) - self.first_day
+        hi = len(self) if end is None else to_day_number(end) - self.first_day + 1
+        return min(max(lo, 0), len(self)), min(max(hi, 0), len(self))
+
+    def total(self, start=None, end=None, h0=0, h1=HOURS - 1):
+        """Downtime in start <= date <= end and h0 <= hour <= h1, in O(1).
+
+        ``h0 > h1`` is a block across midnight (e.g. a 22-5 night shift):
+        hours h0..23 of each day plus 0..h1 of the day after.
+        """
+        if h0 > h1:
+            if start is None:  # the window opens at h0 of the first day, not at midnight before it
+                if not len(self):
+                    return 0.0
+                start = self.first
+            nxt = [None if d is None else pd.Timestamp(d) + pd.Timedelta(days=1) for d in (start, end)]
+            return self.total(start, end, h0, HOURS - 1) + self.total(*nxt, 0, h1)
+        lo, hi = self._rows(start, end)
+        if lo >= hi:
+            return 0.0
+        s = self.sat
+        return float(s[hi, h1 + 1] - s[lo, h1 + 1] - s[hi, h0] + s[lo, h0])
+
+    def hour_totals(self, start=None, end=None):
+        """Downtime per hour of day over a date window (24 values, O(24))."""
+        lo, hi = self._rows(start, end)
+        cols = self.sat[hi] - self.sat[lo]
+        return pd.Series(np.diff(cols), index=pd.RangeIndex(HOURS, name="hour"))
+
+    def window(self, start=None, end=None):
+        """Date x Hour frame of a window, one row per calendar day."""
+        lo, hi = self._rows(start, end)
+        index = pd.Index(day_number_dates(np.arange(self.first_day + lo, self.first_day + hi)), name="Date")
+        return pd.DataFrame(self.grid[lo:hi], index=index, columns=pd.RangeIndex(HOURS, name="hour"))
@@ -0,0 +1,105 @@
+"""Incremental (delta) ingestion of a re-uploaded workbook.
+
+The monthly log grows by appending rows and is re-uploaded over the
+saved copy.  Instead of cleaning every row again, the raw rows of the new
+workbook are matched against the previous cleaned frame (its sidecar,
+see ``maintenance.cache``) by ``Notification No.`` plus a fingerprint of
+the raw cells (``row_fp``).  Matched rows are reused as they are; only new
+or changed rows go through the cleaning step.  Rows that disappeared
+from the workbook simply drop out.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from maintenance.cache import fingerprint, parquet_safe, read_sidecar, write_sidecar
+from maintenance.filters import sort_by_date
+from maintenance.normalize import normalize_categories
+from maintenance.store import notification_keys
+
+FP_COL = "row_fp"
+_POS = "_raw_pos"
+
+
+def _column_hash(values):
+    # hash each distinct cell once (as text, so int/float/str spellings agree)
+    codes, uniques = pd.factorize(values.to_numpy(dtype=object))
+    text = pd.Series(uniques, dtype=object).astype(str).to_numpy(dtype=object)
+    hashes = pd.util.hash_array(np.append(text, ""))
+    return hashes[codes]  # code -1 (blank) -> hash of ""
+
+
+def row_fingerprints(df, columns=None):
+    """uint64 hash of each row's raw cells."""
+    cols = [c for c in (columns or df.columns) if c in df.columns and c != FP_COL]
+    out = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for c in cols:
+            out = out * np.uint64(1000003) ^ _column_hash(df[c])
+    return out
+
+
+def ingest_delta(path, read_raw, clean):
+    """Refresh the sidecar of ``path`` re-cleaning only new / changed rows.
+
+    ``read_raw(path)`` returns the real (non-template) raw rows with a
+    ``row_fp`` column and an info dict; ``clean(raw)`` turns raw rows into
+    cleaned rows and returns (frame, memory report).  Without a usable
+    previous sidecar every row counts as new.
+
+    Returns (df, info); ``info["delta"]`` holds reused / new / changed /
+    removed row counts.
+    """
+    t0 = time.perf_counter()
+    fp = fingerprint(path)
+    old = read_sidecar(path)
+    raw, info = read_raw(path)
+    t_read = time.perf_counter() - t0
+
+    fps = raw[FP_COL].to_numpy()
+    if old is not None and FP_COL in old.columns and len(old):
+        old_fps = old[FP_COL].to_numpy()
+        # first cleaned row for every known fingerprint (identical raw rows clean identically)
+        known = pd.Index(old_fps).drop_duplicates()
+        first = pd.Series(np.arange(len(old_fps))).groupby(old_fps).first()
+        hit = known.get_indexer(fps) >= 0
+        reused = old.iloc[first.loc[fps[hit]].to_numpy()].reset_index(drop=True)
+        old_notif = set(notification_keys(old["Notification No."]).dropna()) \
+            if "Notification No." in old.columns else set()
+        removed = int((~pd.Index(old_fps).isin(fps)).sum())
+    else:
+        hit = np.zeros(len(raw), dtype=bool)
+        reused = None
+        old_notif, removed = set(), 0
+
+    pos = np.arange(len(raw))
+    t1 = time.perf_counter()
+    delta = raw[~hit].assign(**{_POS: pos[~hit]})  # carried through cleaning
+    cleaned, _ = clean(delta)
+    t_clean = time.perf_counter() - t1
+
+    if "Notification No." in delta.columns and old_notif:
+        changed = int(notification_keys(delta["Notification No."]).isin(old_notif).sum())
+    else:
+        changed = 0
+
+    parts = [cleaned]
+    if reused is not None and len(reused):
+        parts.insert(0, reused.assign(**{_POS: pos[hit]}))
+    df = pd.concat(parts, ignore_index=True)
+    # back to the order a full load produces: raw order, stably sorted by day
+    df = df.sort_values(_POS, kind="stable").drop(columns=_POS)
+    df = sort_by_date(df) if "Date" in df.columns else df.reset_index(drop=True)
+    # reused and new rows carry different category sets; the memory report is of the merged frame
+    memory = normalize_categories(df)
+    df = parquet_safe(df)
+
+    info["timings"] = dict(info.get("timings", {}), read_delta=t_read, clean=t_clean,
+                           total=time.perf_counter() - t0)
+    info["memory"] = memory
+    info["delta"] = {"reused": int(hit.sum()), "new": int((~hit).sum()) - changed,
+                     "changed": changed, "removed": removed}
+    write_sidecar(path, df, info, fp)
+    return df, dict(info, cached=False)
+
@@ -0,0 +1,157 @@
+"""Machine downtime from job intervals, with concurrent jobs merged.
+
+Summing ``Consumed_Hours`` per machine counts labor: when a mechanical
+and an electrical technician work on M15 at the same time, the machine
+was down once but the sum counts it twice.  Here every job becomes a
+[start, end) interval on its machine (minutes since 1970-01-01: the
+Date plus the Start clock; an End before the Start crossed midnight),
+overlapping intervals of a machine are merged, and the union is the
+downtime.  Each merged run is one downtime *episode*.
+
+Merging is one sort plus a running maximum of the end times (no Python
+loop): with machine ``g`` offset by ``g * span``, one global
+``np.maximum.accumulate`` is a per-machine running max, and a new
+episode starts wherever a start lies beyond it.
+
+Jobs without a usable Start or Date cannot be placed on the timeline;
+their own length counts as downtime (one episode each), so the union
+never drops hours, only overlaps.
+
+``daily_downtime`` books each episode on the day it starts, for trends.
+"""
+import numpy as np
+import pandas as pd
+
+from maintenance.durations import duration_minutes
+from maintenance.filters import DAY_COL, NAT_DAY, day_number_dates, day_numbers
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def job_intervals(df, machine_col="Machine No.", start_col="Start", end_col="End", minutes=None):
+    """[start, end) of every job in minutes since 1970-01-01, aligned with ``df``.
+
+    The length is ``minutes`` when given (e.g. the pipeline's consumed
+    minutes), else End - Start with the same midnight rollover as the
+    KPI script.  Returns a frame with machine, start, end and length
+    (start / end NaN where the job cannot be placed).
+    """
+    days = df[DAY_COL].to_numpy() if DAY_COL in df.columns else day_numbers(df["Date"])
+    base = np.where(days == NAT_DAY, np.nan, days.astype(float) * MINUTES_PER_DAY)
+    if start_col in df.columns:
+        clock = duration_minutes(df[start_col]).to_numpy()
+    else:
+        clock = np.full(len(df), np.nan)
+
+    if minutes is not None:
+        length = np.asarray(minutes, dtype=float)
+    elif start_col in df.columns and end_col in df.columns:
+        length = duration_minutes(df[end_col]).to_numpy() - clock
+        length = np.where(length < 0, length + MINUTES_PER_DAY, length)  # crossed midnight
+    else:
+        length = np.full(len(df), np.nan)
+    length = np.clip(np.nan_to_num(length), 0, None)
+
+    start = base + clock
+    machine = df[machine_col].array if machine_col in df.columns else pd.Categorical([np.nan] * len(df))
+    return pd.DataFrame({"machine": machine, "day": days, "start": start, "end": start + length,
+                         "length": length}, index=df.index)
+
+
+def merge_intervals(keys, start, end):
+    """Union of the [start, end) intervals of each key.
+
+    ``keys`` are integer group codes (>= 0).  Returns (episode number of
+    every interval, aligned with the input; DataFrame of episodes with
+    key, start, end, jobs).  Touching or overlapping intervals of the
+    same key share an episode.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    episode = np.full(len(keys), -1, dtype=np.int64)
+    if len(keys) == 0:
+        return episode, pd.DataFrame({"key": [], "start": [], "end": [], "jobs": []})
+
+    order = np.lexsort((start, keys))
+    k, s, e = keys[order], start[order], end[order]
+    t0 = s.min()
+    span = e.max() - t0 + 1.0
+    offset = k * span  # groups sorted ascending -> one global running max stays per group
+    reach = np.maximum.accumulate(e - t0 + offset)
+    new = np.r_[True, (s[1:] - t0 + offset[1:]) > reach[:-1]]
+    firsts = np.flatnonzero(new)
+    episode[order] = np.cumsum(new) - 1
+
+    episodes = pd.DataFrame({
+        "key": k[firsts],
+        "start": s[firsts],
+        "end": np.maximum.reduceat(e, firsts),
+        "jobs": np.diff(np.r_[firsts, len(k)]),
+    })
+    return episode, episodes
+
+
+def machine_downtime(intervals):
+    """Per machine: jobs, summed labor hours, union downtime hours, overlap and episodes.
+
+    ``intervals`` is the output of ``job_intervals`` (any row subset).
+    Sorted by union downtime, largest first.
+    """
+    machine = pd.Series(intervals["machine"].array)
+    codes, labels = pd.factorize(machine, sort=True)
+    length = intervals["length"].to_numpy(dtype=float)
+    start = intervals["start"].to_numpy(dtype=float)
+    known = codes >= 0
+    placed = known & ~np.isnan(start)
+
+    _, episodes = merge_intervals(codes[placed], start[placed], start[placed] + length[placed])
+    n = len(labels)
+    # float even with no placed episodes (bincount of an empty array is int64, weights or not)
+    union = np.bincount(episodes["key"].to_numpy(dtype=np.int64),
+                        weights=(episodes["end"] - episodes["start"]).to_numpy(dtype=float), minlength=n).astype(float)
+    n_episodes = np.bincount(episodes["key"].to_numpy(dtype=np.int64), minlength=n)
+    unplaced = known & ~placed
+    union += np.bincount(codes[unplaced], weights=length[unplaced], minlength=n)
+    n_episodes += np.bincount(codes[unplaced], minlength=n)
+
+    labor = np.bincount(codes[known], weights=length[known], minlength=n)
+    out = pd.DataFrame({
+        "Jobs": np.bincount(codes[known], minlength=n),
+        "Labor_Hours": labor / 60,
+        "Downtime_Hours": union / 60,
+        "Overlap_Hours": (labor - union) / 60,
+        "Episodes": n_episodes,
+        "Unplaced_Jobs": np.bincount(codes[unplaced], minlength=n),
+    }, index=pd.Index(labels, name="Machine No."))
+    return out.sort_values("Downtime_Hours", ascending=False)
+
+
+def daily_downtime(intervals):
+    """Union downtime hours and episodes per (Date, machine), each episode on its start day.
+
+    Unplaced jobs with a Date count on that day (one episode each);
+    undated jobs are left out.  Indexed by Date x "Machine No.", only
+    the pairs with downtime.
+    """
+    machine = pd.Series(intervals["machine"].array)
+    codes, labels = pd.factorize(machine, sort=True)
+    length = intervals["length"].to_numpy(dtype=float)
+    start = intervals["start"].to_numpy(dtype=float)
+    days = intervals["day"].to_numpy()
+    placed = (codes >= 0) & ~np.isnan(start)
+    unplaced = (codes >= 0) & np.isnan(start) & (days != NAT_DAY)
+
+    _, episodes = merge_intervals(codes[placed], start[placed], start[placed] + length[placed])
+    rows = pd.DataFrame({
+        "day": np.r_[(episodes["start"].to_numpy() // MINUTES_PER_DAY).astype(np.int64), days[unplaced]],
+        "key": np.r_[episodes["key"].to_numpy(dtype=np.int64), codes[unplaced]],
+        "Downtime_Hours": np.r_[(episodes["end"] - episodes["start"]).to_numpy(), length[unplaced]] / 60,
+        "Episodes": 1,
+    })
+    out = rows.groupby(["day", "key"], sort=True).sum()
+    index = pd.MultiIndex.from_arrays([
+        pd.Index(day_number_dates(out.index.get_level_values("day")), name="Date"),
+        pd.Index(labels.take(out.index.get_level_values("key")), name="Machine No."),
+    ])
+    return out.set_axis(index)
@@ -0,0 +1,813 @@
+"""Headless Drinks Section KPI report: workbook / store -> self-contained HTML.
+
+This is the pipeline of the Colab KPI script (``pages/KPIs_Jan_Feb_2026.py``)
+without Colab: read a workbook through the app's pipeline and sidecar
+cache (or the consolidated store), derive the report columns
+(``prepare_log``), compute the KPI tables for a period
+(``compute_report``), draw the charts and write the HTML.  Charts of one
+or many reports are drawn in a process pool (``render_charts``), so a
+batch of monthly or per-machine reports renders its figures in parallel.
+
+Reports are compact by default: line and bar charts are inline SVG (text
+kept as text), only the two heatmaps are rasters (WebP, PNG without
+WebP support), the tables share one stylesheet, and the KPI 1 appendix
+is a collapsed ``<details>`` whose table is only built when opened.
+``compact=False`` / ``--full`` embeds every chart as a 200-dpi PNG as
+before (about 7x larger).
+
+Command line (from the repository root)::
+
+    python -m maintenance.kpi_report --workbook log.xlsx --start 2026-01-01 --end 2026-02-26
+    python -m maintenance.kpi_report --store app_files --start 2025-01-01 --end 2025-12-31 --by month --out reports
+    python -m maintenance.kpi_report --workbook log.xlsx --start 2026-01-01 --end 2026-02-26 --by machine
+"""
+import argparse
+import base64
+import io
+import multiprocessing as mp
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from maintenance.cache import load_cached
+from maintenance.durations import duration_minutes
+from maintenance.filters import DAY_COL, DateIndex
+from maintenance.heatmap import DayHourTable
+from maintenance.intervals import daily_downtime, job_intervals, machine_downtime
+from maintenance.kpis import KPI_REPORT_COLUMNS, compute_kpis, technician_log
+from maintenance.pipeline import load_clean_log, real_rows_only
+from maintenance.reader import DASHBOARD_COLUMNS
+from maintenance.rolling import WINDOWS, RollingReliability, machine_areas
+from maintenance.run_calendar import CALENDAR_PATH, load_calendar, machine_reliability, overall_reliability
+from maintenance.store import read_store
+
+HEATMAP_DAYS = 30  # Date x Hour heatmap window (last N days of the period; None = whole period)
+SECTION = "Drinks Section"
+COLOR_MAIN = "#1f77b4"
+FULL_DPI = 200  # full mode: every chart a PNG at this resolution
+RASTER_DPI = 110  # compact mode: the heatmaps (dense grids, large as SVG)
+WEBP_QUALITY = 80
+RASTER_CHARTS = ("heat_date_machine", "heat_date_hour")
+
+
+# ---------------------------
+# Read + prepare the log
+# ---------------------------
+# Job (upper-cased, spaces removed) -> category, else "Other"; the Colab script's normalize_job
+JOB_CATEGORIES = {"B/D": "Breakdown", "BD": "Breakdown", "BREAKDOWN": "Breakdown", "CORRECTIVE": "Corrective"}
+
+
+def prepare_log(df):
+    """Report columns (Date_Clean, Consumed_*, Job_Category, ...) on a cleaned log.
+
+    ``df`` is the output of ``pipeline.load_clean_log`` (a workbook, via
+    its Parquet sidecar) or ``store.read_store``: real rows, sorted by
+    day, label Categoricals, time_h / wait_h / hour / reason.
+    """
+    df_real = real_rows_only(df)
+    if "Machine No." not in df_real.columns:
+        raise ValueError("Machine No. column not found. Cannot build report.")
+
+    if "Date" in df_real.columns:
+        df_real["Date_Clean"] = pd.to_datetime(df_real["Date"], errors="coerce").dt.date
+    else:
+        df_real["Date_Clean"] = pd.NaT
+
+    # Waiting time (blank => 0)
+    wait_h = df_real["wait_h"] if "wait_h" in df_real.columns else pd.Series(np.nan, index=df_real.index)
+    df_real["Waiting_Minutes"] = wait_h.fillna(0.0).to_numpy() * 60.0
+    df_real["Waiting_Hours"] = df_real["Waiting_Minutes"] / 60.0
+
+    # Consumed time: the logged Time Consumed (time_h, as on the dashboard), else Start/End (crossed midnight +24 h)
+    consumed = pd.Series(np.nan, index=df_real.index)
+    if "time_h" in df_real.columns:
+        consumed = df_real["time_h"] * 60.0
+    if "Start" in df_real.columns and "End" in df_real.columns:
+        dur = duration_minutes(df_real["End"]) - duration_minutes(df_real["Start"])
+        consumed = consumed.fillna(dur.where(dur >= 0, dur + 24*60))
+    df_real["Consumed_Minutes"] = consumed.fillna(0.0)
+    df_real["Consumed_Hours"] = df_real["Consumed_Minutes"] / 60.0
+
+    df_real["HourOfDay"] = df_real["hour"] if "hour" in df_real.columns else np.int8(-1)
+
+    if "Job" in df_real.columns:
+        job = df_real["Job"].astype("category")
+        keys = job.cat.categories.astype(str).str.strip().str.upper().str.replace(" ", "")
+        labels = np.append(keys.map(lambda k: JOB_CATEGORIES.get(k, "Other")).to_numpy(dtype=object), "Other")
+        df_real["Job_Category"] = labels[job.cat.codes.to_numpy()]  # code -1 (blank) -> "Other"
+    else:
+        df_real["Job_Category"] = "Other"
+
+    if "Notification No." in df_real.columns:
+        notif = df_real["Notification No."]
+        blank = notif.isna() | notif.astype(str).str.strip().str.lower().isin(["", "nan"])
+        df_real["Notification_Status"] = np.where(blank, "Without Notification", "With Notification")
+    else:
+        df_real["Notification_Status"] = "Unknown"
+
+    df_real["Reason_Clean"] = df_real["reason"] if "reason" in df_real.columns else "unknown"
+    return df_real
+
+
+def load_log(workbook=None, store=None, start=None, end=None):
+    """Prepared log from a workbook (path or buffer) or the store under ``store`` (a data folder).
+
+    A workbook path goes through the Parquet sidecar cache (shared with
+    the dashboard, so the whole sheet); a buffer is read with only the
+    KPI columns (``DASHBOARD_COLUMNS``).  From the store only the month
+    partitions from ``max(WINDOWS)`` days before ``start`` to ``end`` are
+    read (the rolling windows look back).
+    """
+    if workbook is not None:
+        if isinstance(workbook, (str, os.PathLike)):
+            df, _ = load_cached(Path(workbook), load_clean_log)
+        else:
+            df, _ = load_clean_log(workbook, usecols=DASHBOARD_COLUMNS)
+    else:
+        lo = None if start is None else pd.Timestamp(start) - pd.Timedelta(days=max(WINDOWS) - 1)
+        df, _ = read_store(store, lo, None if end is None else pd.Timestamp(end))
+        if not len(df):
+            raise ValueError(f"The store in {store} has no saved rows for this period.")
+    return prepare_log(df)
+
+
+# ---------------------------
+# KPIs of one period
+# ---------------------------
+@dataclass
+class ReportData:
+    """Every table and number of one report (picklable: charts are drawn in other processes)."""
+    title: str
+    start: object
+    end: object
+    kpi1: pd.DataFrame
+    kpi2: pd.DataFrame
+    kpi3: pd.DataFrame
+    kpi4_count: pd.DataFrame
+    kpi4_time: pd.DataFrame
+    kpi5: pd.DataFrame
+    kpi6_overall: pd.DataFrame
+    kpi6_machine: pd.DataFrame
+    kpi6_reliability: pd.DataFrame
+    kpi6_rolling: pd.DataFrame
+    kpi7: pd.DataFrame
+    kpi8: pd.DataFrame
+    kpi9: pd.DataFrame
+    kpi10: pd.DataFrame
+    kpi11: pd.DataFrame
+    pareto: pd.DataFrame
+    concentration: pd.DataFrame
+    planned: pd.Series
+    total_labor_all: float
+    total_downtime_all: float
+    overall_mttr: float
+    overall_mtbf: float
+    overall_availability: float
+    rolling: RollingReliability
+    rolling_area: RollingReliability
+    rolling_all: RollingReliability
+    heatmap_days: int = HEATMAP_DAYS
+
+
+def compute_report(df_real, start, end, calendar=None, machines=None, title=None, heatmap_days=HEATMAP_DAYS):
+    """KPI tables of ``start`` <= Date <= ``end`` (optionally only the rows of ``machines``)."""
+    calendar = calendar or load_calendar()
+    if machines is not None:
+        keep = df_real["Machine No."].astype(str).isin([str(m) for m in machines]).to_numpy()
+        df_real = df_real[keep].reset_index(drop=True)
+    if DAY_COL in df_real.columns:
+        df_period = df_real.iloc[DateIndex.of(df_real).slice(start, end)].copy()
+    else:
+        df_period = df_real.iloc[0:0].copy()
+
+    # Technician log: one row per (job, technician); "share" = 1/crew size
+    # FULL credit rule uses Consumed_Hours as is (NOT divided)
+    tech_log = technician_log(df_period, KPI_REPORT_COLUMNS, carry=[
+        "Date_Clean", "Machine No.", "Shift", "Job_Category", "Notification_Status",
+        "Consumed_Minutes", "Consumed_Hours",
+    ])
+
+    # KPIs (1–11 + extra manager KPIs), one grouped pass over the period
+    kpis = compute_kpis(df_period, KPI_REPORT_COLUMNS, tech_credit="full", tech_log=tech_log)
+
+    # KPI 1: Date x Machine downtime
+    kpi1 = kpis.day_machine.copy()
+    kpi1["Grand Total"] = kpi1.sum(axis=1)
+
+    # KPI 2: Notifications vs no notifications
+    kpi2 = kpis.day_notification.copy()
+    kpi2["Total Jobs"] = kpi2.sum(axis=1)
+    kpi2["% Without Notification"] = (kpi2.get("Without Notification", 0) / kpi2["Total Jobs"] * 100).round(2)
+
+    # KPI 3: Shift downtime
+    kpi3 = kpis.shift_hours.to_frame("Downtime_Hours")
+    kpi3["% Share"] = (kpi3["Downtime_Hours"] / kpi3["Downtime_Hours"].sum() * 100).round(2)
+
+    # KPI 4: Job category (count + downtime)
+    kpi4_count = kpis.category_jobs.to_frame("Jobs_Count")
+    kpi4_time = kpis.category_hours.to_frame("Downtime_Hours")
+
+    # KPI 5: Waiting time by date
+    kpi5 = kpis.day_waiting.to_frame("Waiting_Hours")
+
+    # KPI 6: MTTR & MTBF (Breakdown = B/D)
+    # Concurrent jobs on one machine (e.g. mechanical + electrical crews) are one stop:
+    # downtime is the union of the jobs' Start..Start+Consumed intervals, events are merged episodes
+    intervals = job_intervals(df_period, minutes=df_period["Consumed_Minutes"])
+    machine_dt = machine_downtime(intervals)
+    bd_dt = machine_downtime(intervals[(df_period["Job_Category"] == "Breakdown").to_numpy()])
+
+    kpi6_machine = kpis.breakdown_machines().rename(columns={"Breakdown_Downtime_Hours": "Breakdown_Labor_Hours"})
+    kpi6_machine["Breakdown_Episodes"] = bd_dt["Episodes"].reindex(kpi6_machine.index.astype(str)).fillna(0).astype(int).to_numpy()
+    kpi6_machine["Breakdown_Downtime_Hours"] = bd_dt["Downtime_Hours"].reindex(kpi6_machine.index.astype(str)).fillna(0).to_numpy()
+    kpi6_machine = kpi6_machine.sort_values("Breakdown_Downtime_Hours", ascending=False)
+    bd_jobs = int(kpi6_machine["Breakdown_Events"].sum())
+    bd_events = int(kpi6_machine["Breakdown_Episodes"].sum())
+    bd_labor = kpi6_machine["Breakdown_Labor_Hours"].sum()
+    bd_downtime = kpi6_machine["Breakdown_Downtime_Hours"].sum()
+    distinct_days = kpis.distinct_days
+
+    # Planned hours per machine over the period from the run calendar
+    if machines is not None:
+        calendar_machines = sorted(str(m) for m in machines)
+    else:
+        calendar_machines = sorted(set(machine_dt.index.astype(str)) | set(calendar.machine_hours))
+    planned = calendar.planned_hours(calendar_machines, start, end)
+    kpi6_reliability = machine_reliability(planned, machine_dt["Downtime_Hours"], bd_dt["Downtime_Hours"], bd_dt["Episodes"])
+    overall_mttr, overall_mtbf, overall_availability = overall_reliability(kpi6_reliability)
+    total_running_hours = kpi6_reliability["Run_Hours"].sum()
+
+    kpi6_overall = pd.DataFrame({
+        "Metric": ["Calendar Days", "Distinct Days (with jobs)", "Planned Hours (run calendar)", "Running Hours",
+                   "Breakdown Jobs (B/D)", "Breakdown Events (concurrent jobs merged)", "Breakdown Labor (hrs, summed)",
+                   "Breakdown Downtime (hrs, overlaps merged)", "MTTR (hrs)", "MTBF (hrs)"],
+        "Value":  [(pd.Timestamp(end) - pd.Timestamp(start)).days + 1, distinct_days, round(planned.sum(),2),
+                   round(total_running_hours,2), bd_jobs, bd_events, round(bd_labor,2), round(bd_downtime,2),
+                   round(overall_mttr,2), round(overall_mtbf,2)]
+    })
+
+    machine_rel = kpi6_reliability.reindex(kpi6_machine.index.astype(str))
+    kpi6_machine["Planned_Hours"] = machine_rel["Planned_Hours"].fillna(0).to_numpy()
+    kpi6_machine["MTTR_Hrs"] = machine_rel["MTTR_Hrs"].fillna(0).round(2).to_numpy()
+    kpi6_machine["MTBF_Hrs"] = machine_rel["MTBF_Hrs"].fillna(0).round(2).to_numpy()
+    kpi6_machine["Availability_%"] = machine_rel["Availability_%"].round(2).to_numpy()
+    kpi6_reliability = kpi6_reliability.sort_values("Availability_%").round(2)
+
+    # KPI 6 trends: rolling 7/30/90-day MTBF, MTTR, availability (running totals over the day index).
+    # Windows look back before start (as far as the log goes) so the first report days have full windows.
+    first_logged = df_real["Date_Clean"].dropna().min() if df_real["Date_Clean"].notna().any() else start
+    trend_from = max(pd.Timestamp(start) - pd.Timedelta(days=max(WINDOWS) - 1),
+                     pd.Timestamp(min(first_logged, pd.Timestamp(start).date())))
+    df_trend = df_real.iloc[DateIndex.of(df_real).slice(trend_from, end)] if DAY_COL in df_real.columns else df_period
+    trend_iv = job_intervals(df_trend, minutes=df_trend["Consumed_Minutes"])
+    trend_dt = daily_downtime(trend_iv)
+    trend_bd = daily_downtime(trend_iv[(df_trend["Job_Category"] == "Breakdown").to_numpy()])
+    rolling = RollingReliability.from_daily(
+        calendar.planned(calendar_machines, trend_from, end),
+        trend_dt["Downtime_Hours"].unstack(fill_value=0),
+        trend_bd["Downtime_Hours"].unstack(fill_value=0),
+        trend_bd["Episodes"].unstack(fill_value=0),
+    )
+    rolling_area = rolling.group(machine_areas(df_trend))
+    rolling_all = rolling.combined(SECTION)
+    kpi6_rolling = pd.concat({f"{w}d": rolling.latest(w, end)[["MTBF_Hrs", "MTTR_Hrs", "Availability_%"]]
+                              for w in WINDOWS}, axis=1).sort_values(("30d", "Availability_%")).round(2)
+    kpi6_rolling.columns = [f"{m} ({w})" for w, m in kpi6_rolling.columns]
+
+    # KPI 9: Technician workload (FULL credit, not divided)
+    kpi9 = kpis.technicians.copy()
+    kpi9["Total_Hours"] = kpi9.sum(axis=1)
+    kpi9 = kpi9.sort_values("Total_Hours", ascending=False)
+
+    # Extra: Pareto + concentration (availability: see KPI 6, per machine from the run calendar)
+    pareto = kpis.pareto()
+
+    def share_top(n):
+        total = pareto["Downtime_Hours"].sum()
+        return round(pareto.head(n)["Downtime_Hours"].sum()/total*100, 2) if total else 0.0
+
+    concentration = pd.DataFrame({
+        "Metric": ["Top 3 share %", "Top 5 share %", "Top 10 share %"],
+        "Value": [share_top(3), share_top(5), share_top(10)]
+    })
+
+    if title is None:
+        title = f"{SECTION} KPIs Report — {pd.Timestamp(start):%d %b %Y} to {pd.Timestamp(end):%d %b %Y}"
+    return ReportData(
+        title=title, start=pd.Timestamp(start).date(), end=pd.Timestamp(end).date(),
+        kpi1=kpi1, kpi2=kpi2, kpi3=kpi3, kpi4_count=kpi4_count, kpi4_time=kpi4_time, kpi5=kpi5,
+        kpi6_overall=kpi6_overall, kpi6_machine=kpi6_machine, kpi6_reliability=kpi6_reliability,
+        kpi6_rolling=kpi6_rolling,
+        kpi7=kpis.hourly.to_frame("Downtime_Hours"),  # KPI 7: Hourly pattern 0–23
+        kpi8=kpis.day_hour,                           # KPI 8: Date x hour heatmap table
+        kpi9=kpi9,
+        kpi10=kpis.top_reasons(10, category="Breakdown"),  # KPI 10: Top 10 breakdown reasons
+        kpi11=kpis.breakdown_machines().head(13).rename(    # KPI 11: Top 13 machines (Breakdown)
+            columns={"Breakdown_Downtime_Hours": "Downtime_Hours", "Breakdown_Events": "Incidents"}
+        )[["Downtime_Hours", "Incidents"]],
+        pareto=pareto, concentration=concentration, planned=planned,
+        total_labor_all=kpis.total_hours,
+        total_downtime_all=float(machine_dt["Downtime_Hours"].sum()),  # overlaps merged
+        overall_mttr=overall_mttr, overall_mtbf=overall_mtbf, overall_availability=overall_availability,
+        rolling=rolling, rolling_area=rolling_area, rolling_all=rolling_all, heatmap_days=heatmap_days,
+    )
+
+
+# ---------------------------
+# Charts (PDF-friendly style); each draws one figure from a ReportData
+# ---------------------------
+def chart_trend(r, plt, sns):
+    fig, ax = plt.subplots(figsize=(10,4))
+    ax.plot(r.kpi1.index, r.kpi1["Grand Total"], color=COLOR_MAIN, linewidth=2)
+    ax.set_title(f"Daily Total Downtime (hrs) — {SECTION}")
+    ax.set_xlabel("Date"); ax.set_ylabel("Downtime (hrs)")
+    ax.tick_params(axis="x", rotation=45)
+    return fig
+
+
+def chart_top13(r, plt, sns):
+    fig, ax = plt.subplots(figsize=(10,4))
+    ax.bar(r.pareto.head(13).index.astype(str), r.pareto.head(13)["Downtime_Hours"], color=COLOR_MAIN)
+    ax.set_title("Top 13 Machines by Total Downtime (hrs)")
+    ax.set_xlabel("Machine"); ax.set_ylabel("Downtime (hrs)")
+    ax.tick_params(axis="x", rotation=45)
+    return fig
+
+
+def chart_pareto(r, plt, sns):
+    fig, ax1 = plt.subplots(figsize=(10,4))
+    ax1.bar(r.pareto.index.astype(str), r.pareto["Downtime_Hours"], color=COLOR_MAIN, alpha=0.85)
+    ax1.set_ylabel("Downtime (hrs)"); ax1.set_xlabel("Machine")
+    ax1.tick_params(axis="x", rotation=45)
+    ax2 = ax1.twinx()
+    ax2.plot(r.pareto.index.astype(str), r.pareto["Cumulative %"], color="#d62728", marker="o", linewidth=2)
+    ax2.set_ylabel("Cumulative %"); ax2.set_ylim(0,110)
+    ax1.set_title("Pareto: Machine Downtime (hrs) + Cumulative %")
+    return fig
+
+
+def chart_heat_date_machine(r, plt, sns):
+    # top 13 machines for readability
+    top_cols = [c for c in r.pareto.head(13).index if c in r.kpi1.columns]
+    fig, ax = plt.subplots(figsize=(12,6))
+    if len(r.kpi1) and top_cols:
+        sns.heatmap(r.kpi1[top_cols], cmap="Blues", ax=ax)
+    ax.set_title("Heatmap: Date × Machine Downtime (Top machines)")
+    ax.set_xlabel("Machine"); ax.set_ylabel("Date")
+    return fig
+
+
+def chart_shift(r, plt, sns):
+    fig, ax = plt.subplots(figsize=(8,4))
+    ax.bar(r.kpi3.index.astype(str), r.kpi3["Downtime_Hours"], color=COLOR_MAIN)
+    ax.set_title("Downtime by Shift (hrs)")
+    ax.set_xlabel("Shift"); ax.set_ylabel("Downtime (hrs)")
+    return fig
+
+
+def chart_waiting(r, plt, sns):
+    fig, ax = plt.subplots(figsize=(10,4))
+    ax.plot(r.kpi5.index, r.kpi5["Waiting_Hours"], color="#2ca02c", linewidth=2)
+    ax.set_title("Daily Total Waiting Time (hrs)")
+    ax.set_xlabel("Date"); ax.set_ylabel("Waiting (hrs)")
+    ax.tick_params(axis="x", rotation=45)
+    return fig
+
+
+def chart_hourly(r, plt, sns):
+    fig, ax = plt.subplots(figsize=(10,4))
+    ax.bar(r.kpi7.index, r.kpi7["Downtime_Hours"], color=COLOR_MAIN)
+    ax.set_title("Downtime Pattern by Hour (0–23)")
+    ax.set_xlabel("Hour of Day"); ax.set_ylabel("Downtime (hrs)")
+    ax.set_xticks(range(24))
+    return fig
+
+
+def chart_heat_date_hour(r, plt, sns):
+    # last heatmap_days days, one row per calendar day
+    heat_table = DayHourTable.from_day_hour(r.kpi8)
+    heat_from = None if r.heatmap_days is None or not len(heat_table) else \
+        max(heat_table.first, heat_table.last - pd.Timedelta(days=r.heatmap_days - 1))
+    heat_dh = heat_table.window(heat_from, None)
+    fig, ax = plt.subplots(figsize=(12,6))
+    if len(heat_dh):
+        sns.heatmap(heat_dh, cmap="Blues", ax=ax)
+    ax.set_title(f"Heatmap: Date × Hour Downtime ({'Last %d days' % r.heatmap_days if r.heatmap_days else 'whole period'})")
+    ax.set_xlabel("Hour of Day"); ax.set_ylabel("Date")
+    return fig
+
+
+def _trend_lines(ax, frame, start, title, ylabel):
+    """Rolling series of the report period only (windows reach back before it)."""
+    frame = frame.loc[frame.index >= start]
+    for col in frame.columns:
+        ax.plot(frame.index, frame[col], linewidth=1.6, label=str(col))
+    ax.set_title(title); ax.set_ylabel(ylabel)
+    ax.tick_params(axis="x", rotation=45)
+    if len(frame.columns):
+        ax.legend(fontsize=7, ncol=2)
+
+
+def chart_rolling_section(r, plt, sns):
+    fig, axes = plt.subplots(1, 3, figsize=(15,4))
+    for ax, (metric, label) in zip(axes, [("MTBF_Hrs", "MTBF (hrs)"), ("MTTR_Hrs", "MTTR (hrs)"), ("Availability_%", "Availability %")]):
+        # no machines planned and no jobs (e.g. an empty month): empty axes
+        section = pd.concat({f"{w}-day": r.rolling_all.series(metric, w).iloc[:, 0] for w in WINDOWS}, axis=1) \
+            if len(r.rolling_all.columns) else pd.DataFrame()
+        _trend_lines(ax, section, r.start, f"Rolling {label} — {SECTION}", label)
+    return fig
+
+
+def chart_rolling_area(r, plt, sns):
+    fig, axes = plt.subplots(1, 2, figsize=(15,4))
+    _trend_lines(axes[0], r.rolling_area.series("MTBF_Hrs", 30), r.start, "30-day MTBF by Area (hrs)", "MTBF (hrs)")
+    _trend_lines(axes[1], r.rolling_area.series("Availability_%", 30), r.start, "30-day Availability by Area (%)", "Availability %")
+    return fig
+
+
+def chart_rolling_machines(r, plt, sns):
+    worst = r.kpi6_rolling.index[:5]
+    fig, ax = plt.subplots(figsize=(10,4))
+    _trend_lines(ax, r.rolling.series("Availability_%", 30)[worst], r.start,
+                 "30-day Availability — 5 least available machines (%)", "Availability %")
+    return fig
+
+
+def chart_tech(r, plt, sns):
+    toptech = r.kpi9.head(10)["Total_Hours"] if len(r.kpi9) else pd.Series(dtype=float)
+    fig, ax = plt.subplots(figsize=(10,4))
+    if len(toptech):
+        ax.bar(toptech.index.astype(str), toptech.values, color=COLOR_MAIN)
+    ax.set_title("Top 10 Technicians by Workload (hrs) — FULL credit (not divided)")
+    ax.set_xlabel("Technician"); ax.set_ylabel("Hours")
+    ax.tick_params(axis="x", rotation=45)
+    return fig
+
+
+def chart_reasons(r, plt, sns):
+    fig, ax = plt.subplots(figsize=(10,4))
+    if len(r.kpi10):
+        ax.barh(r.kpi10.index.astype(str)[::-1], r.kpi10["Downtime_Hours"].values[::-1], color=COLOR_MAIN)
+    ax.set_title("Top 10 Breakdown Reasons by Downtime (hrs)")
+    ax.set_xlabel("Downtime (hrs)")
+    return fig
+
+
+CHARTS = {
+    "trend": chart_trend,
+    "top13": chart_top13,
+    "pareto": chart_pareto,
+    "heat_date_machine": chart_heat_date_machine,
+    "shift": chart_shift,
+    "waiting": chart_waiting,
+    "hourly": chart_hourly,
+    "heat_date_hour": chart_heat_date_hour,
+    "rolling_section": chart_rolling_section,
+    "rolling_area": chart_rolling_area,
+    "rolling_machines": chart_rolling_machines,
+    "tech": chart_tech,
+    "reasons": chart_reasons,
+}
+
+
+def raster_format():
+    """"webp" when Pillow (a matplotlib dependency) can write it, else "png"."""
+    from PIL import features
+
+    return "webp" if features.check("webp") else "png"
+
+
+def chart_formats(compact=True):
+    """{chart name: (format, dpi)}: compact = SVG, heatmaps WebP / PNG; full = 200-dpi PNG for all."""
+    if not compact:
+        return {name: ("png", FULL_DPI) for name in CHARTS}
+    raster = raster_format()
+    return {name: (raster, RASTER_DPI) if name in RASTER_CHARTS else ("svg", None) for name in CHARTS}
+
+
+def inline_svg(svg):
+    """Matplotlib SVG file -> ``<svg>`` element for inlining: no XML prolog, and only the ids
+    that are referenced (clip paths, markers) -- "figure_1", "axes_1", ... repeat in every chart."""
+    svg = svg[svg.index("<svg"):].strip()
+    refs = set(re.findall(r"#([^\s\"')]+)", svg))
+    return re.sub(r' id="([^"]+)"', lambda m: m.group(0) if m.group(1) in refs else "", svg)
+
+
+def draw_chart(r, name, fmt="png", dpi=FULL_DPI):
+    """Worker entry point: one chart of ``r`` as (format, payload).
+
+    The payload is the ``<svg>`` element for "svg", else the base64 image bytes.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_theme(style="whitegrid")
+    # SVG text stays text (no glyph outlines); ids salted per chart so inlined SVGs never clash
+    matplotlib.rcParams.update({"svg.fonttype": "none", "svg.hashsalt": f"{r.title}|{name}"})
+    fig = CHARTS[name](r, plt, sns)
+    try:
+        buf = io.BytesIO()
+        if fmt == "svg":
+            fig.savefig(buf, format="svg", bbox_inches="tight", metadata={"Date": None})
+            return fmt, inline_svg(buf.getvalue().decode("utf-8"))
+        pil_kwargs = {"quality": WEBP_QUALITY} if fmt == "webp" else {"optimize": True}
+        fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight", pil_kwargs=pil_kwargs)
+        return fmt, base64.b64encode(buf.getvalue()).decode("utf-8")
+    finally:
+        plt.close(fig)
+
+
+def _draw(job):
+    return draw_chart(*job)
+
+
+def render_charts(reports, workers=None, compact=True):
+    """{name: (format, payload)} for each report; all charts of all reports drawn in one process pool.
+
+    ``workers=1`` draws in this process.
+    """
+    formats = chart_formats(compact)
+    jobs = [(r, name, *formats[name]) for r in reports for name in CHARTS]
+    slots = [(i, name) for i in range(len(reports)) for name in CHARTS]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        images = [_draw(j) for j in jobs]
+    else:
+        # spawn: safe next to the threads of a Streamlit server
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=mp.get_context("spawn")) as pool:
+            images = list(pool.map(_draw, jobs))
+    out = [{} for _ in reports]
+    for (i, name), image in zip(slots, images):
+        out[i][name] = image
+    return out
+
+
+# ---------------------------
+# HTML (self-contained)
+# ---------------------------
+# One stylesheet for every report; tables and charts carry classes, no inline styles
+REPORT_CSS = """\
+body{font-family:Arial,sans-serif;margin:24px;color:#111}
+h1{margin-bottom:0}
+.sub{color:#555;margin-top:6px}
+.note{font-size:12px;color:#444}
+.cards{display:grid;grid-template-columns:repeat(4,1fr);gap:12px;margin:16px 0}
+.card{border:1px solid #e5e5e5;border-radius:10px;padding:12px 14px;background:#fff}
+.k{font-size:12px;color:#666}
+.v{font-size:22px;font-weight:700;margin-top:6px}
+.chart{display:block;width:100%;max-width:1100px;height:auto;box-sizing:border-box;border:1px solid #eee;border-radius:10px;padding:6px;background:#fff}
+.chart svg{width:100%;height:auto}
+table.table{border-collapse:collapse;width:100%;margin:10px 0 18px 0}
+table.table th,table.table td{border:1px solid #e6e6e6;padding:6px 8px;font-size:12px}
+table.table th{background:#f6f8fa;text-align:left}
+table.table thead tr{text-align:right}
+.two-col{display:grid;grid-template-columns:1fr 1fr;gap:14px}
+.section{page-break-inside:avoid;margin-top:22px}
+details summary{cursor:pointer;font-weight:700}
+@media (max-width:700px){.cards{grid-template-columns:repeat(2,1fr)}.two-col{grid-template-columns:1fr}}
+"""
+
+# Appendix table: parsed but inert in a <template> until the <details> is first opened
+LAZY_SCRIPT = """\
+document.querySelectorAll("details[data-lazy]").forEach(function(d){
+d.addEventListener("toggle",function(){var t=d.querySelector("template");
+if(d.open&&t){d.appendChild(t.content.cloneNode(true));t.remove();}});});"""
+
+
+def table_html(df):
+    """``DataFrame.to_html`` without pandas' per-table inline header style and indentation."""
+    html = df.to_html(border=0, classes="table")
+    html = html.replace(' style="text-align: right;"', "").replace(' class="dataframe table"', ' class="table"')
+    return re.sub(r"\n\s+", "\n", html)
+
+
+def df_to_html(df, title, max_rows=30):
+    df2 = df.copy()
+    if len(df2) > max_rows:
+        df2 = df2.head(max_rows)
+    # format floats
+    for c in df2.columns:
+        if pd.api.types.is_float_dtype(df2[c]):
+            df2[c] = df2[c].map(lambda x: f"{x:,.2f}")
+    return f"<h3>{title}</h3>" + table_html(df2)
+
+
+def render_html(r, images):
+    def img(key):
+        fmt, payload = images[key]
+        if fmt == "svg":
+            return f'<div class="chart">{payload}</div>'
+        return f'<img class="chart" alt="{key}" src="data:image/{fmt};base64,{payload}"/>'
+
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"/>
+<meta name="viewport" content="width=device-width,initial-scale=1"/>
+<title>{r.title}</title>
+<style>
+{REPORT_CSS}</style>
+</head><body>
+
+<h1>{r.title}</h1>
+<div class="sub">Manager-ready maintenance & downtime report (PDF-friendly)</div>
+
+<div class="section">
+<h2>1) Executive Summary</h2>
+<div class="cards">
+  <div class="card"><div class="k">Total Downtime (hrs)</div><div class="v">{r.total_downtime_all:,.2f}</div></div>
+  <div class="card"><div class="k">Availability %</div><div class="v">{r.overall_availability:,.2f}%</div></div>
+  <div class="card"><div class="k">MTTR (hrs) — Breakdown</div><div class="v">{r.overall_mttr:,.2f}</div></div>
+  <div class="card"><div class="k">MTBF (hrs) — Breakdown</div><div class="v">{r.overall_mtbf:,.2f}</div></div>
+</div>
+<p class="note">
+<b>Planned hours:</b> machine run calendar, {r.planned.sum():,.0f} hrs over {len(r.planned)} machines
+(MTBF = running hours / breakdown events; availability = running / planned hours).<br>
+<b>Downtime:</b> jobs running at the same time on one machine are counted once
+({r.total_labor_all:,.2f} labor hrs &rarr; {r.total_downtime_all:,.2f} machine downtime hrs).
+</p>
+{img('trend')}
+</div>
+
+<div class="section">
+<h2>2) Machine Downtime (KPI 1 + KPI 11)</h2>
+<div class="two-col">
+  {img('top13')}
+  {img('pareto')}
+</div>
+{img('heat_date_machine')}
+{df_to_html(r.pareto, "Pareto table (machines)", max_rows=30)}
+{df_to_html(r.concentration, "Downtime concentration (Top shares)", max_rows=10)}
+</div>
+
+<div class="section">
+<h2>3) Notifications (KPI 2)</h2>
+{df_to_html(r.kpi2, "Jobs with Notification vs Without Notification (by date)", max_rows=31)}
+</div>
+
+<div class="section">
+<h2>4) Shifts & Job Types (KPI 3 + KPI 4)</h2>
+{img('shift')}
+{df_to_html(r.kpi3, "Downtime by Shift", max_rows=10)}
+<div class="two-col">
+  <div>{df_to_html(r.kpi4_count, "Job Count by Category", max_rows=10)}</div>
+  <div>{df_to_html(r.kpi4_time, "Downtime Hours by Category", max_rows=10)}</div>
+</div>
+</div>
+
+<div class="section">
+<h2>5) Waiting Time (KPI 5)</h2>
+{img('waiting')}
+{df_to_html(r.kpi5, "Waiting Hours by Date", max_rows=31)}
+</div>
+
+<div class="section">
+<h2>6) Reliability (KPI 6: MTTR + MTBF)</h2>
+{df_to_html(r.kpi6_overall, "Overall MTTR / MTBF Summary", max_rows=20)}
+{df_to_html(r.kpi6_machine, "Per-machine MTTR/MTBF (sorted by downtime)", max_rows=30)}
+{df_to_html(r.kpi6_reliability, "Per-machine availability (run calendar, lowest first)", max_rows=30)}
+{img('rolling_section')}
+{img('rolling_area')}
+{img('rolling_machines')}
+{df_to_html(r.kpi6_rolling, f"Rolling 7/30/90-day reliability per machine at {r.end:%d %b %Y}", max_rows=30)}
+</div>
+
+<div class="section">
+<h2>7) Time Pattern (KPI 7 + KPI 8)</h2>
+{img('hourly')}
+{img('heat_date_hour')}
+</div>
+
+<div class="section">
+<h2>8) Technician Performance (KPI 9)</h2>
+<p class="note"><b>Workload rule:</b> Each technician receives FULL job minutes (not divided).</p>
+{img('tech')}
+{df_to_html(r.kpi9, "Technician workload (hours) by job category (Top 30)", max_rows=30)}
+</div>
+
+<div class="section">
+<h2>9) Breakdown Reasons (KPI 10)</h2>
+{img('reasons')}
+{df_to_html(r.kpi10, "Top 10 Breakdown Reasons (by downtime hours)", max_rows=10)}
+</div>
+
+<div class="section">
+<h2>Appendix: KPI 1 (Date × Machine downtime)</h2>
+<p class="note">Shown for transparency/audit. Can be large.</p>
+<details data-lazy><summary>Show table ({len(r.kpi1)} days × {len(r.kpi1.columns)} columns)</summary>
+<template>{table_html(r.kpi1.round(2))}</template>
+</details>
+</div>
+
+<script>
+{LAZY_SCRIPT}
+</script>
+</body></html>
+"""
+
+
+# ---------------------------
+# Reports: one, per month, per machine
+# ---------------------------
+def report_filename(start, end, label=None):
+    name = f"Drinks_Section_KPIs_Report_{pd.Timestamp(start):%Y-%m-%d}_to_{pd.Timestamp(end):%Y-%m-%d}"
+    if label:
+        name += "_" + re.sub(r"[^A-Za-z0-9]+", "_", str(label)).strip("_")
+    return name + ".html"
+
+
+def month_periods(start, end):
+    """[(first, last) date of each calendar month] clipped to start..end."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    out = []
+    for m in pd.period_range(start, end, freq="M"):
+        out.append((max(m.start_time, start).date(), min(m.end_time.normalize(), end).date()))
+    return out
+
+
+def plan_reports(df_real, start, end, by=None):
+    """[(start, end, machines or None, label)] of the reports of one run."""
+    if by is None:
+        return [(start, end, None, None)]
+    if by == "month":
+        return [(lo, hi, None, None) for lo, hi in month_periods(start, end)]
+    if by == "machine":
+        period = df_real.iloc[DateIndex.of(df_real).slice(start, end)]
+        machines = sorted(period["Machine No."].dropna().astype(str).unique())
+        return [(start, end, [m], m) for m in machines]
+    raise ValueError(f"unknown batch mode {by!r} (month / machine)")
+
+
+def render_reports(df_real, start, end, by=None, calendar=None, workers=None, heatmap_days=HEATMAP_DAYS,
+                   compact=True):
+    """[(file name, HTML)] of the report(s) of a prepared log.
+
+    ``by`` = None (one report), "month" or "machine".  Charts of every
+    report are drawn together in one process pool; ``compact=False``
+    embeds every chart as a 200-dpi PNG (several MB per report).
+    """
+    calendar = calendar or load_calendar()
+    plan = plan_reports(df_real, start, end, by)
+    reports = []
+    for lo, hi, machines, label in plan:
+        title = f"{SECTION} KPIs Report — {pd.Timestamp(lo):%d %b %Y} to {pd.Timestamp(hi):%d %b %Y}"
+        if machines is not None:
+            title += f" — {label}"
+        reports.append(compute_report(df_real, lo, hi, calendar, machines=machines, title=title,
+                                      heatmap_days=heatmap_days))
+    return [(report_filename(lo, hi, label), render_html(r, images))
+            for (lo, hi, _, label), r, images in zip(plan, reports, render_charts(reports, workers, compact))]
+
+
+def build_reports(df_real, start, end, out_dir=".", **kwargs):
+    """Write ``render_reports`` into ``out_dir``; returns the written paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, html in render_reports(df_real, start, end, **kwargs):
+        path = out_dir / name
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"{SECTION} KPI report (self-contained HTML).")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--workbook", help="maintenance log workbook (.xlsx)")
+    source.add_argument("--store", help="data folder with the consolidated store (e.g. app_files)")
+    parser.add_argument("--start", required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="last day, YYYY-MM-DD")
+    parser.add_argument("--out", default=".", help="output folder (default: current folder)")
+    parser.add_argument("--by", choices=["month", "machine"], help="one report per month / per machine")
+    parser.add_argument("--calendar", default=str(CALENDAR_PATH), help="run calendar JSON")
+    parser.add_argument("--heatmap-days", type=int, default=HEATMAP_DAYS, help="Date x Hour heatmap window (0 = whole period)")
+    parser.add_argument("--workers", type=int, default=None, help="chart processes (default: one per core)")
+    parser.add_argument("--full", action="store_true", help="every chart as a 200-dpi PNG (large file)")
+    args = parser.parse_args(argv)
+
+    start, end = pd.Timestamp(args.start).date(), pd.Timestamp(args.end).date()
+    t0 = time.perf_counter()
+    try:
+        df_real = load_log(args.workbook, args.store, start, end)
+    except ValueError as e:
+        parser.error(str(e))
+    print("Real rows:", len(df_real), f"({time.perf_counter() - t0:.2f}s)")
+    paths = build_reports(df_real, start, end, args.out, by=args.by, calendar=load_calendar(args.calendar),
+                          workers=args.workers, heatmap_days=args.heatmap_days or None, compact=not args.full)
+    for p in paths:
+        print("Report saved:", p, f"({p.stat().st_size / 1e6:.2f} MB)")
+    print(f"{len(paths)} report(s) in {time.perf_counter() - t0:.2f}s")
+    return paths
+
+
+if __name__ == "__main__":
+    main()
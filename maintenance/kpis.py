@@ -0,0 +1,335 @@
+"""Single-pass KPI engine for the cleaned maintenance log.
+
+The pages used to run one ``groupby`` / ``pivot_table`` per chart over the
+filtered log.  Here the log is grouped once on the shared keys
+(day, hour, machine, shift, area, job category, notification status)
+into a ``DowntimeCube`` (``kpi_cube``), and every chart / KPI table is a
+roll-up of that cube.  Reasons, unique complaints and technicians need
+their own keys and get one extra pass each.
+
+``compute_kpis`` returns a ``KpiResult`` consumed by both the Streamlit
+daily report and the HTML KPI report.  Column names differ between the
+two pipelines, so they are passed in as ``KpiColumns``.
+"""
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from maintenance.cube import DowntimeCube
+from maintenance.filters import DAY_COL, NAT_DAY, day_numbers, day_number_dates
+
+WITH_NOTIFICATION = "With Notification"
+WITHOUT_NOTIFICATION = "Without Notification"
+
+
+@dataclass(frozen=True)
+class KpiColumns:
+    """Where the engine finds each field in the cleaned log."""
+    hours: str = "time_h"
+    hour: str = "hour"
+    date: str = "Date"
+    machine: str = "Machine No."
+    shift: str = "Shift"
+    category: str = None  # None -> every row in one "All" category
+    notification: str = "Notification No."
+    waiting: str = "wait_h"
+    reason: str = "reason"
+    area: str = "Area"
+    technician: str = "Performed By"
+    breakdown: str = "Breakdown"  # category value used for KPI 6 / 10 / 11
+
+
+# daily report (pages/2_Maintenance_Daily_Report.py)
+DAILY_REPORT_COLUMNS = KpiColumns()
+# KPI / HTML report (pages/KPIs_Jan_Feb_2026.py)
+KPI_REPORT_COLUMNS = KpiColumns(
+    hours="Consumed_Hours", hour="HourOfDay", category="Job_Category",
+    waiting="Waiting_Hours", reason="Reason_Clean",
+)
+
+
+@dataclass
+class KpiResult:
+    """Every aggregate the dashboard pages and the HTML report draw."""
+    columns: KpiColumns
+    total_jobs: int
+    unique_complaints: float
+    total_hours: float
+    avg_hours: float
+    total_waiting_hours: float
+    distinct_days: int
+    machine_hours: pd.Series        # all jobs, sorted desc (top machines, Pareto)
+    day_hours: pd.Series            # daily total downtime
+    day_machine: pd.DataFrame       # KPI 1: Date x Machine
+    day_notification: pd.DataFrame  # KPI 2: job counts by notification status
+    shift_hours: pd.Series          # KPI 3
+    category_jobs: pd.Series        # KPI 4
+    category_hours: pd.Series       # KPI 4
+    day_waiting: pd.Series          # KPI 5
+    machine_category: pd.DataFrame  # jobs + hours per (machine, category): KPI 6 / 11
+    hourly: pd.Series               # KPI 7: 0..23
+    day_hour: pd.DataFrame          # KPI 8: Date x Hour
+    day_complaints: pd.Series       # unique notifications per day
+    reasons: pd.DataFrame           # hours + incidents per (reason, category): KPI 10
+    technicians: pd.DataFrame       # hours per technician x category: KPI 9
+    cube: DowntimeCube = None       # day x hour x machine x shift x area x category x status (drill-down)
+
+    def top_machines(self, n=10):
+        return self.machine_hours.head(n)
+
+    def pareto(self):
+        out = self.machine_hours.to_frame("Downtime_Hours")
+        total = out["Downtime_Hours"].sum()
+        out["% of Total"] = (out["Downtime_Hours"] / total * 100).round(2)
+        out["Cumulative %"] = out["% of Total"].cumsum().round(2)
+        return out
+
+    def breakdown_machines(self):
+        """Breakdown events + downtime per machine, sorted by downtime (KPI 6 / 11)."""
+        mc = self.machine_category
+        bd = mc[mc["category"] == self.columns.breakdown]
+        out = bd.groupby("machine", observed=True).agg(
+            Breakdown_Events=("jobs", "sum"), Breakdown_Downtime_Hours=("hours", "sum"))
+        out.index.name = self.columns.machine
+        return out.sort_values("Breakdown_Downtime_Hours", ascending=False)
+
+    def top_reasons(self, n=10, category=None):
+        """Reasons by hours (+ incident count), optionally for one category only."""
+        r = self.reasons
+        if category is not None:
+            r = r[r["category"] == category]
+        out = r.groupby("reason").agg(Downtime_Hours=("hours", "sum"), Incidents=("jobs", "sum"))
+        out.index.name = self.columns.reason
+        return out.sort_values("Downtime_Hours", ascending=False).head(n)
+
+    def technician_totals(self):
+        return self.technicians.sum(axis=1).sort_values(ascending=False)
+
+
+# ------------------------------------------------------------------
+# technician log (equal share + full credit in one long table)
+# ------------------------------------------------------------------
+# "A/B", "A & B", "A, B", "A; B", "A and B"
+TECH_SPLIT_RE = re.compile(r"[/,&;]|\band\b", re.IGNORECASE)
+UNKNOWN_TECH = "Unknown"
+
+
+def _split_crews(uniques):
+    """Distinct 'Performed By' strings -> (flat names, start, count) per string."""
+    parts = pd.Series(uniques, dtype=object).astype(str).str.split(TECH_SPLIT_RE, regex=True)
+    flat = parts.explode().str.strip()
+    flat = flat[flat.notna() & (flat != "") & (flat.str.lower() != "nan")]
+    # strings without any name left count as one "Unknown" technician
+    empty = np.setdiff1d(np.arange(len(uniques)), flat.index.to_numpy())
+    flat = pd.concat([flat, pd.Series(UNKNOWN_TECH, index=empty, dtype=object)]).sort_index(kind="stable")
+    owner = flat.index.to_numpy()
+    count = np.bincount(owner, minlength=len(uniques))
+    start = np.concatenate([[0], np.cumsum(count)[:-1]]).astype(np.int64)
+    return flat.to_numpy(dtype=object), start, count
+
+
+def technician_log(df, cols=DAILY_REPORT_COLUMNS, carry=None):
+    """Long-form technician log: one row per (job, technician).
+
+    ``row`` is the job's position in ``df`` and ``share`` its 1/crew-size
+    weight, so the equal-split rule is ``hours * share`` and the full-credit
+    rule is plain ``hours`` -- both come from the same table.  ``carry``
+    columns (default: date, machine, shift, category, hours) are copied
+    along.  Build it once per dataset and select rows with ``select_rows``.
+    """
+    if carry is None:
+        carry = [cols.date, DAY_COL, cols.machine, cols.shift, cols.category, cols.hours]
+    carry = [c for c in dict.fromkeys(carry) if c and c in df.columns]
+    who = df[cols.technician] if cols.technician in df.columns else pd.Series(np.nan, index=df.index)
+
+    codes, uniques = pd.factorize(who.to_numpy(dtype=object))
+    codes = np.where(codes < 0, len(uniques), codes)  # blanks -> "Unknown"
+    names, start, count = _split_crews(list(uniques) + [UNKNOWN_TECH])
+
+    # explode: repeat each row crew-size times and gather its names
+    per_row = count[codes]
+    rows = np.repeat(np.arange(len(df)), per_row)
+    within = np.arange(len(rows)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    out = pd.DataFrame({
+        "row": rows,
+        "Technician": pd.Categorical(names[start[codes][rows] + within]),
+        "share": 1.0 / per_row[rows],
+    })
+    for c in carry:
+        out[c] = df[c].to_numpy()[rows] if not isinstance(df[c].dtype, pd.CategoricalDtype) \
+            else df[c].array.take(rows)
+    return out
+
+
+def select_rows(tech_log, rows):
+    """Technician rows of the jobs selected by a slice or boolean mask of the log."""
+    if isinstance(rows, slice):
+        r = tech_log["row"].to_numpy()
+        lo = np.searchsorted(r, rows.start or 0, side="left")
+        hi = len(r) if rows.stop is None else np.searchsorted(r, rows.stop, side="left")
+        return tech_log.iloc[lo:hi]
+    return tech_log[np.asarray(rows)[tech_log["row"].to_numpy()]]
+
+
+def technician_hours(tech_log, cols=DAILY_REPORT_COLUMNS, credit="equal"):
+    """Technician x category hours; ``credit`` is "equal" (split) or "full"."""
+    if cols.hours not in tech_log.columns:
+        return pd.DataFrame(index=pd.Index([], name="Technician"))
+    hours = pd.to_numeric(tech_log[cols.hours], errors="coerce").to_numpy(dtype=float)
+    if credit == "equal":
+        hours = hours * tech_log["share"].to_numpy()
+    keep = ~np.isnan(hours)
+    frame = pd.DataFrame({
+        "Technician": tech_log["Technician"].array[keep],
+        "category": _col(tech_log, cols.category, "All").array[keep],
+        "hours": hours[keep],
+    })
+    out = frame.groupby(["Technician", "category"], observed=True)["hours"].sum().unstack(fill_value=0)
+    out.columns.name = cols.category
+    return out
+
+
+# ------------------------------------------------------------------
+# engine
+# ------------------------------------------------------------------
+def _blank(s):
+    if pd.api.types.is_numeric_dtype(s):
+        return s.isna().to_numpy()
+    codes, uniques = pd.factorize(s.to_numpy(dtype=object))
+    blank = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower().isin(["", "nan"])
+    return np.where(codes < 0, True, blank.to_numpy()[codes] if len(uniques) else True)
+
+
+def _col(df, name, default):
+    return df[name] if name and name in df.columns else pd.Series(default, index=df.index)
+
+
+CUBE_DIMS = ("day", "hour", "machine", "shift", "area", "category", "status")
+CUBE_MEASURES = ("hours", "hours_n", "waiting", "jobs")
+
+
+def _notification_status(df, cols):
+    if cols.notification not in df.columns:
+        return "Unknown"
+    return np.where(_blank(df[cols.notification]), WITHOUT_NOTIFICATION, WITH_NOTIFICATION)
+
+
+def kpi_cube(df, cols=DAILY_REPORT_COLUMNS):
+    """``DowntimeCube`` of ``df`` on the shared KPI keys (day, hour, machine, shift, area, category, status)."""
+    n = len(df)
+    hours = pd.to_numeric(_col(df, cols.hours, np.nan), errors="coerce")
+    days = df[DAY_COL].to_numpy() if DAY_COL in df.columns else day_numbers(_col(df, cols.date, pd.NaT))
+    frame = pd.DataFrame({
+        "day": days,
+        "hour": _col(df, cols.hour, -1).to_numpy(),
+        # .array keeps Categoricals, so the cube codes are their integer codes
+        "machine": _col(df, cols.machine, np.nan).array,
+        "shift": _col(df, cols.shift, np.nan).array,
+        "area": _col(df, cols.area, np.nan).array,
+        "category": _col(df, cols.category, "All").array,
+        "status": _notification_status(df, cols),
+        "hours": hours.to_numpy(),
+        "hours_n": hours.notna().to_numpy(dtype=np.int64),
+        "waiting": pd.to_numeric(_col(df, cols.waiting, 0.0), errors="coerce").to_numpy(),
+        "jobs": np.ones(n, dtype=np.int64),
+    })
+    return DowntimeCube.from_frame(frame, CUBE_DIMS, CUBE_MEASURES)
+
+
+def _dated(series):
+    """Roll-up indexed by day number -> indexed by datetime.date."""
+    series.index = pd.Index(day_number_dates(series.index), name="Date")
+    return series
+
+
+def compute_kpis(df, cols=DAILY_REPORT_COLUMNS, tech_credit="equal", tech_log=None, cube=None):
+    """All dashboard aggregates of ``df``: roll-ups of its ``kpi_cube`` (+ reasons/complaints/technicians).
+
+    ``tech_log`` is the ``technician_log`` of exactly the rows of ``df``
+    and ``cube`` its ``kpi_cube`` (e.g. a slice of the cube of the whole
+    log); both are built here when not given.
+    """
+    hours = pd.to_numeric(_col(df, cols.hours, np.nan), errors="coerce")
+    days = df[DAY_COL].to_numpy() if DAY_COL in df.columns else day_numbers(_col(df, cols.date, pd.NaT))
+    category = _col(df, cols.category, "All")
+    has_notif = cols.notification in df.columns
+    notif = _col(df, cols.notification, np.nan)
+
+    # ---- pass 1: roll-ups of the cube ----
+    if cube is None:
+        cube = kpi_cube(df, cols)
+    valid_day = cube.slice(day=slice(None, NAT_DAY - 1))
+    timed = cube.slice(hour=slice(0, None))
+
+    machine_hours = cube.rollup("machine").sort_values(ascending=False)
+    machine_hours.index.name = cols.machine
+    shift_hours = cube.rollup("shift").sort_values(ascending=False)
+    shift_hours.index.name = cols.shift
+
+    day_machine = _dated(valid_day.rollup("day", "machine").unstack(fill_value=0))
+    day_machine.columns.name = cols.machine
+
+    day_notification = _dated(valid_day.rollup("day", "status", measure="jobs").unstack(fill_value=0))
+    day_notification.columns.name = None
+
+    hourly = timed.rollup("hour").reindex(range(24), fill_value=0)
+    hourly.index.name = cols.hour
+    day_hour = _dated(timed.slice(day=slice(None, NAT_DAY - 1)).rollup("day", "hour").unstack()
+                      .reindex(columns=range(24)).fillna(0))
+    day_hour.columns.name = cols.hour
+
+    machine_category = cube.rollup("machine", "category", measure=["jobs", "hours"]).reset_index()
+
+    # ---- pass 2: reasons ----
+    reasons = pd.DataFrame({
+        "reason": _col(df, cols.reason, "unknown").array,
+        "category": category.array,
+        "hours": hours.to_numpy(),
+        "jobs": 1,
+    }).groupby(["reason", "category"], observed=True).sum().reset_index()
+
+    # ---- pass 3: unique complaints per day ----
+    if has_notif:
+        pairs = pd.DataFrame({"day": days, "n": notif.to_numpy()})
+        pairs = pairs[(pairs["day"] != NAT_DAY) & notif.notna().to_numpy()].drop_duplicates()
+        day_complaints = pairs.groupby("day").size()
+        day_complaints.index = pd.Index(day_number_dates(day_complaints.index), name="Date")
+    else:
+        day_complaints = _dated(valid_day.rollup("day", measure="jobs"))
+
+    # ---- pass 4: technicians ----
+    if cols.technician in df.columns:
+        if tech_log is None:
+            tech_log = technician_log(df, cols)
+        technicians = technician_hours(tech_log, cols, tech_credit)
+    else:
+        technicians = pd.DataFrame()
+
+    total_hours = float(cube.total("hours"))
+    hours_n = int(cube.total("hours_n"))
+    return KpiResult(
+        columns=cols,
+        total_jobs=int(cube.total("jobs")),
+        unique_complaints=notif.nunique(dropna=True) if has_notif else np.nan,
+        total_hours=total_hours,
+        avg_hours=total_hours / hours_n if hours_n else np.nan,
+        total_waiting_hours=float(cube.total("waiting")),
+        distinct_days=len(valid_day.rollup("day", measure="jobs")),
+        machine_hours=machine_hours,
+        day_hours=_dated(valid_day.rollup("day")),
+        day_machine=day_machine.sort_index(),
+        day_notification=day_notification.sort_index(),
+        shift_hours=shift_hours,
+        category_jobs=cube.rollup("category", measure="jobs").sort_values(ascending=False),
+        category_hours=cube.rollup("category").sort_values(ascending=False),
+        day_waiting=_dated(valid_day.rollup("day", measure="waiting")),
+        machine_category=machine_category,
+        hourly=hourly,
+        day_hour=day_hour.sort_index(),
+        day_complaints=day_complaints,
+        reasons=reasons,
+        technicians=technicians,
+        cube=cube,
+    )
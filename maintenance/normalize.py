@@ -0,0 +1,135 @@
+"""Pandas Categoricals for the label columns of the cleaned maintenance log.
+
+Free-text columns such as ``Machine No.`` or ``Type`` hold a few dozen
+distinct values repeated over every row.  Each column is stored as a
+Categorical whose categories are exactly the values in the log (nothing
+is trimmed or merged) in a stable, natural order, so filters and groupbys
+work on integer codes instead of hashing Python strings while every KPI
+groups the same labels as before.
+
+``merge_spellings`` is the opt-in second step: it merges the spellings of
+one label ("M 1" / "m1" / "M1", "B/D" / "BD" / "Breakdown", "Crates Area
+/Line" / "Crates Area/Line") through the alias table below.  It changes
+groupings, so it only runs when asked for (the daily report's "Merge label
+spellings" switch).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["Machine No.", "Area", "Shift", "Type", "Job", "Performed By"]
+
+WORK_TYPE_ORDER = ["B/D", "Corrective", "PM"]
+
+# merge_spellings: work type spelling (upper-cased, spaces removed) -> label
+WORK_TYPE_ALIASES = {
+    "B/D": "B/D", "BD": "B/D", "BREAKDOWN": "B/D", "BREAKDOWNS": "B/D",
+    "CORRECTIVE": "Corrective", "CORR": "Corrective",
+    "PM": "PM", "PREVENTIVE": "PM", "PREVENTIVEMAINTENANCE": "PM",
+}
+MACHINE_RE = re.compile(r"^M\s*-?\s*0*(\d+)$", re.IGNORECASE)  # "M 1", "m-01" -> M1
+
+
+def _natural_key(v):
+    # M2 before M10; known work types first
+    s = str(v)
+    if s in WORK_TYPE_ORDER:
+        return (0, WORK_TYPE_ORDER.index(s), "")
+    m = re.match(r"^M(\d+)$", s)
+    if m:
+        return (1, int(m.group(1)), "")
+    return (2, 0, s.lower())
+
+
+def to_category(series, canonical=None):
+    """Ordered-category Series of ``series``; ``canonical`` maps each distinct value once when given."""
+    codes, uniques = pd.factorize(series)
+    canon = list(uniques) if canonical is None else [canonical(u) for u in uniques]
+    cats = sorted({c for c in canon if c is not None}, key=_natural_key)
+    remap = pd.Index(cats, dtype=object).get_indexer(pd.Index(canon, dtype=object))  # None -> -1
+    new_codes = np.where(codes < 0, -1, remap[codes] if len(remap) else -1)
+    cat = pd.Categorical.from_codes(new_codes, categories=pd.Index(cats, dtype=object))
+    return pd.Series(cat, index=series.index, name=series.name)
+
+
+def _text_bytes(series):
+    """Memory of a label column held as text, the dtype a fresh read gives (also for a Categorical)."""
+    # rebuilt from the values, so a filtered or sliced column is not charged for its parent's buffers
+    text = pd.Series(series.to_numpy(dtype=object), dtype="str")
+    return int(text.memory_usage(deep=True, index=False))
+
+
+def normalize_categories(df, columns=None):
+    """Convert the label columns of ``df`` to Categoricals of their own values (in place).
+
+    Returns a memory report: bytes per column as text and as a Categorical,
+    the same for a fresh read and for a frame that is already categorical
+    (a delta load, the store).
+    """
+    report = {}
+    for c in columns or CATEGORY_COLUMNS:
+        if c not in df.columns:
+            continue
+        before = _text_bytes(df[c])
+        df[c] = to_category(df[c])
+        report[c] = [before, int(df[c].memory_usage(deep=True, index=False))]
+    return report
+
+
+def _clean_text(v):
+    """Trim, collapse inner whitespace and tighten spaces around '/'."""
+    s = re.sub(r"\s+", " ", str(v)).strip()
+    s = re.sub(r"\s*/\s*", "/", s)
+    return None if s == "" or s.lower() == "nan" else s
+
+
+def canonical_machine(v):
+    s = _clean_text(v)
+    if s is None:
+        return None
+    m = MACHINE_RE.match(s)
+    return f"M{int(m.group(1))}" if m else s
+
+
+def canonical_work_type(v):
+    s = _clean_text(v)
+    if s is None:
+        return None
+    return WORK_TYPE_ALIASES.get(s.upper().replace(" ", ""), s)
+
+
+def canonical_shift(v):
+    s = _clean_text(v)
+    return s.upper() if s is not None else None
+
+
+CANONICALIZERS = {
+    "Machine No.": canonical_machine,
+    "Type": canonical_work_type,
+    "Job": canonical_work_type,
+    "Shift": canonical_shift,
+}
+
+
+def merge_spellings(df, columns=None):
+    """Copy of ``df`` with the spellings of each label column merged into one label.
+
+    Every column is trimmed (inner whitespace collapsed, no spaces around
+    '/'); Machine No., Type, Job and Shift also go through
+    ``CANONICALIZERS``.  Works on the distinct values, not the rows.
+    """
+    out = df.copy()
+    for c in columns or CATEGORY_COLUMNS:
+        if c in out.columns:
+            out[c] = to_category(out[c], CANONICALIZERS.get(c, _clean_text))
+    return out
+
+
+def memory_report_frame(report):
+    """Memory report dict -> small DataFrame in KB for display."""
+    out = pd.DataFrame.from_dict(report, orient="index", columns=["Before (KB)", "After (KB)"]) / 1024
+    if len(out):
+        out.loc["Total"] = out.sum()
+    out["Saved %"] = (1 - out["After (KB)"] / out["Before (KB)"]) * 100
+    return out.round(1)
@@ -0,0 +1,159 @@
+"""In-memory PDF report for the 2025 Drinkable KPIs page.
+
+``generate_pdf`` used to export the seven Plotly figures one after the
+other through kaleido, draw three matplotlib tables, write every image
+into a ``tempfile.mkdtemp`` folder and read them back into reportlab --
+once per download button.  Here the report is a pipeline:
+
+1. ``rasterize`` turns every chart into PNG bytes in a process pool (one
+   kaleido export per worker at a time, figures travel as their Plotly
+   JSON);
+2. ``build_pdf`` lays the report out with reportlab Platypus into a
+   ``BytesIO``: charts are ``Image`` flowables, tables are real
+   ``Table`` flowables (vector text, searchable) that split across pages
+   and repeat their header row -- no matplotlib table screenshots;
+3. the page keeps the PDF bytes under ``report_key`` -- a hash of the
+   figures, tables, KPI cards and logo -- so the second button, or the
+   same button again, reuses them.
+
+The pool lives at module level and is shared by all sessions of the
+server process, like the ingestion pool in ``maintenance.worker``.
+"""
+import hashlib
+import io
+import json
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+PAGE_SIZE = landscape(A4)
+MAX_WORKERS = 4  # kaleido starts one Chromium per worker
+
+_lock = threading.Lock()
+_pool = None
+
+
+# ---------------------------------------------------------------
+# Rasterizing (run in the pool workers)
+# ---------------------------------------------------------------
+def plotly_png(fig_json):
+    """Plotly figure JSON -> PNG bytes (kaleido)."""
+    import plotly.io as pio
+
+    return pio.from_json(fig_json).to_image(format="png")
+
+
+RASTERIZERS = {"plotly": plotly_png}
+
+
+def _render(job):
+    kind, payload = job
+    return RASTERIZERS[kind](payload)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: do not fork the threads of the Streamlit server
+        _pool = ProcessPoolExecutor(max_workers=min(MAX_WORKERS, os.cpu_count() or 1),
+                                    mp_context=mp.get_context("spawn"))
+    return _pool
+
+
+def rasterize(jobs):
+    """[(kind, payload), ...] -> PNG bytes of each job, in order, rendered concurrently.
+
+    ``kind`` is "plotly" (payload: ``fig.to_json()``).  A single job is
+    rendered in-process.
+    """
+    global _pool
+    jobs = list(jobs)
+    if len(jobs) <= 1:
+        return [_render(j) for j in jobs]
+    with _lock:
+        try:
+            return list(_get_pool().map(_render, jobs))
+        except BrokenProcessPool:
+            # a worker died (e.g. kaleido crashed): start a fresh pool once
+            _pool = None
+            return list(_get_pool().map(_render, jobs))
+
+
+# ---------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------
+def _cell(v):
+    """Table cell text: blanks empty, whole floats without ".0"."""
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def table_flowables(df, title=None):
+    """DataFrame -> [caption, Table]; the table splits across pages, repeating its header row."""
+    styles = getSampleStyleSheet()
+    data = [[str(c) for c in df.columns]] + [[_cell(v) for v in row] for row in df.itertuples(index=False)]
+    table = Table(data, repeatRows=1, hAlign="LEFT")
+    table.setStyle(TableStyle([
+        ("FONT", (0, 0), (-1, -1), "Helvetica", 8),
+        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 8),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f6f8fa")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#fbfbfb")]),
+        ("GRID", (0, 0), (-1, -1), 0.4, colors.HexColor("#dddddd")),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+    out = [Paragraph(title, styles["Heading2"])] if title else []
+    return out + [table]
+
+
+def build_pdf(title, kpis, blocks, logo=None):
+    """PDF bytes: a title page (logo, title, KPI cards), then one page per block.
+
+    ``blocks`` are ("image", PNG bytes, (width, height)) or ("table",
+    DataFrame, caption); a long table continues on the next pages.
+    """
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle("ReportTitle", parent=styles["Title"], fontName="Helvetica-Bold",
+                                 fontSize=28, leading=34, alignment=0)
+    kpi_style = ParagraphStyle("ReportKpi", parent=styles["Normal"], fontName="Helvetica", fontSize=16, leading=25)
+
+    story = []
+    if logo is not None:
+        story.append(Image(logo, width=400, height=120, hAlign="LEFT"))
+    story += [Spacer(1, 12), Paragraph(title, title_style), Spacer(1, 12)]
+    story += [Paragraph(f"{k}: {v}", kpi_style) for k, v in kpis.items()]
+
+    for kind, payload, extra in blocks:
+        story.append(PageBreak())
+        if kind == "image":
+            w, h = extra
+            story.append(Image(io.BytesIO(payload), width=w, height=h, hAlign="LEFT"))
+        else:
+            story += table_flowables(payload, extra)
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=PAGE_SIZE, leftMargin=50, rightMargin=50, topMargin=40,
+                            bottomMargin=40, title=title)
+    doc.build(story)
+    return buf.getvalue()
+
+
+def report_key(kpis, parts, logo=None):
+    """Hash of everything that ends up in the PDF: (kind, Plotly JSON or DataFrame) parts."""
+    h = hashlib.sha1(json.dumps(kpis, sort_keys=True, default=str).encode("utf-8"))
+    for kind, payload in parts:
+        h.update(kind.encode("utf-8"))
+        h.update(payload.encode("utf-8") if isinstance(payload, str) else payload.to_json().encode("utf-8"))
+    if logo is not None and os.path.exists(logo):
+        stat = os.stat(logo)
+        h.update(f"{logo}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
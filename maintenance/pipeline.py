@@ -0,0 +1,103 @@
+"""Read + clean pipeline of the maintenance log.
+
+``read_log`` reads a workbook and keeps the real (non-template) rows:
+every column by default, since the filtered table and its export show
+them, or only ``usecols`` (``DASHBOARD_COLUMNS`` for KPI-only callers such
+as the headless report).  ``clean_log`` derives the analysis columns
+(time_h / wait_h / hour, label Categoricals, reason label) and
+``load_clean_log`` runs both.  Everything here is importable without
+Streamlit, so background workers can run it in another process.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from maintenance.durations import duration_hours, hour_of_day
+from maintenance.filters import sort_by_date
+from maintenance.ingest import row_fingerprints
+from maintenance.normalize import normalize_categories
+from maintenance.reader import read_excel_smart
+
+
+def real_rows_only(df):
+    """Remove template/blank rows. A row is 'real' if any key fields exist."""
+    keys = ["Notification No.", "Machine No.", "Type", "Reported Problem"]
+    present = [c for c in keys if c in df.columns]
+    if not present:
+        return df.copy()
+
+    mask = False
+    for c in present:
+        mask = mask | df[c].notna()
+    return df[mask].copy()
+
+
+def reason_labels(df):
+    """First 6 cleaned words of 'Reported Problem', falling back to the lower-case Type."""
+    fallback = df["Type"].astype(object).fillna("unknown").astype(str).str.strip().str.lower() if "Type" in df.columns else "unknown"
+    if "Reported Problem" not in df.columns:
+        return pd.Series(fallback, index=df.index)
+    reason = df["Reported Problem"].fillna("").astype(str).str.strip()
+    reason_clean = (reason.str.lower()
+                    .str.replace(r"[^a-z0-9\s]", "", regex=True)
+                    .str.replace(r"\s+", " ", regex=True)
+                    .str.strip())
+    reason_short = reason_clean.str.split().str[:6].str.join(" ")
+    return reason_short.where(reason_short != "", fallback)
+
+
+def read_log(file_path_or_buffer, usecols=None):
+    """Read the workbook and keep the real rows, each with a fingerprint of its raw cells."""
+    df, sheet, timings = read_excel_smart(file_path_or_buffer, usecols=usecols)
+    df.columns = [str(c).strip() for c in df.columns]
+    real = real_rows_only(df)
+    real["row_fp"] = row_fingerprints(real)
+    return real, {"sheet": sheet, "rows": len(df), "cols": len(df.columns), "timings": timings}
+
+
+def clean_log(real):
+    """Cleaned log with time_h / wait_h / hour; returns (frame, memory report)."""
+    # Parse Date; keep the log sorted by day (int64 day_no) for slice-based ranges
+    if "Date" in real.columns:
+        real["Date"] = pd.to_datetime(real["Date"], errors="coerce")
+        real = sort_by_date(real)
+
+    # Convert time columns to hours
+    if "Time Consumed" in real.columns:
+        real["time_h"] = duration_hours(real["Time Consumed"])
+    else:
+        real["time_h"] = np.nan
+
+    if "Waiting Time" in real.columns:
+        real["wait_h"] = duration_hours(real["Waiting Time"])
+    else:
+        real["wait_h"] = np.nan
+
+    # Hour of day (int8, -1 = unknown) from Start else Requested Time
+    start = real["Start"] if "Start" in real.columns else pd.Series(np.nan, index=real.index)
+    real["hour"] = hour_of_day(start, real.get("Requested Time"))
+
+    # Label columns stored as Categoricals of their own values (filters/groupbys on integer codes)
+    memory = normalize_categories(real)
+
+    # Short reason label (first 6 words of the problem text, else the job type)
+    real["reason"] = reason_labels(real)
+    return real, memory
+
+
+def load_clean_log(file_path_or_buffer, progress=None, usecols=None):
+    """Read the workbook and build the cleaned log with time_h / wait_h / hour.
+
+    ``progress(stage)`` is called with "reading" and "cleaning" when given.
+    ``usecols`` limits the read to those columns (see ``read_log``).
+    """
+    if progress:
+        progress("reading")
+    real, info = read_log(file_path_or_buffer, usecols=usecols)
+    if progress:
+        progress("cleaning")
+    t0 = time.perf_counter()
+    real, info["memory"] = clean_log(real)
+    info["timings"]["clean"] = time.perf_counter() - t0
+    return real, info
@@ -0,0 +1,82 @@
+"""Workbook reader: one open, sheet sniffing, column projection, timings.
+
+``pd.ExcelFile`` is opened once and the chosen sheet is parsed from that
+same handle.  When ``usecols`` is given only those header names are kept
+(matched after stripping), so KPI-only readers do not convert the dozens
+of unused columns in the maintenance log.  The dashboard reads every
+column: its filtered table and export show the whole sheet.  The calamine engine (Rust,
+``python-calamine``) is used when installed, openpyxl otherwise.
+"""
+import time
+
+import pandas as pd
+
+MAIN_SHEET_NAMES = ["main data", "maindata", "main"]
+
+# Columns the KPIs use (the filtered table and its export keep the whole sheet)
+DASHBOARD_COLUMNS = [
+    "Notification No.", "Date", "Shift", "Area", "Machine No.", "Type", "Job",
+    "Reported Problem", "Performed By", "Start", "End", "Requested Time",
+    "Time Consumed", "Waiting Time",
+]
+
+try:
+    import python_calamine  # noqa: F401
+    FAST_ENGINE = "calamine"
+except ImportError:
+    FAST_ENGINE = None
+
+
+def pick_sheet(sheet_names):
+    """'Main Data' if present, else the first sheet."""
+    return next((s for s in sheet_names if s.strip().lower() in MAIN_SHEET_NAMES), sheet_names[0])
+
+
+def _rewind(src):
+    if hasattr(src, "seek"):
+        src.seek(0)
+
+
+def _read(src, usecols, engine, timings):
+    t0 = time.perf_counter()
+    with pd.ExcelFile(src, engine=engine) as xls:
+        timings["open"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        sheet = pick_sheet(xls.sheet_names)
+        timings["sheet"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        if usecols is None:
+            df = xls.parse(sheet)
+        else:
+            wanted = set(usecols)
+            df = xls.parse(sheet, usecols=lambda c: str(c).strip() in wanted)
+        timings["parse"] = time.perf_counter() - t0
+    return df, sheet
+
+
+def read_excel_smart(file_path_or_buffer, usecols=None, engine="auto"):
+    """Read the maintenance sheet once; return (df, sheet, timings).
+
+    ``engine="auto"`` tries calamine and falls back to pandas' default
+    (openpyxl for xlsx/xlsm) if calamine is missing or fails on the file.
+    ``timings`` holds seconds per stage plus the engine that was used.
+    """
+    timings = {}
+    engines = [engine]
+    if engine == "auto":
+        engines = [FAST_ENGINE, None] if FAST_ENGINE else [None]
+
+    t_total = time.perf_counter()
+    for i, eng in enumerate(engines):
+        _rewind(file_path_or_buffer)
+        try:
+            df, sheet = _read(file_path_or_buffer, usecols, eng, timings)
+            break
+        except Exception:
+            if i == len(engines) - 1:
+                raise
+    timings["engine"] = eng or "default"
+    timings["total"] = time.perf_counter() - t_total
+    return df, sheet, timings
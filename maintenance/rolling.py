@@ -0,0 +1,141 @@
+"""Rolling 7 / 30 / 90-day MTBF, MTTR and availability per machine and area.
+
+The KPI pages showed one MTBF / MTTR for the whole period.  For trends,
+``RollingReliability`` keeps the running totals of four daily measures
+per machine -- planned hours, downtime hours, breakdown repair hours and
+breakdown events -- over a contiguous day index:
+
+    C[t] = sum(x[:t])                    (C[0] = 0)
+    window of w days ending on day t = C[t+1] - C[max(t+1-w, 0)]
+
+so any window on any day is one subtraction per machine, whatever its
+length, and the series of every day is one vectorised difference.  A new
+day of data is one more row ``C[-1] + x`` (``append_day``): O(machines),
+nothing else is recomputed.  Windows at the start of the index cover the
+days available so far.
+
+Area figures are the machine columns summed per area (``group``): a sum
+of running totals is the running total of the sums.
+"""
+import numpy as np
+import pandas as pd
+
+from maintenance.filters import day_number_dates, to_day_number
+
+WINDOWS = (7, 30, 90)
+MEASURES = ("planned", "downtime", "repair", "events")
+METRICS = ("MTBF_Hrs", "MTTR_Hrs", "Availability_%")
+
+
+def _metrics(sums):
+    """(..., 4, n) window sums -> dict of MTBF, MTTR, availability arrays (..., n)."""
+    planned, downtime, repair, events = (sums[..., i, :] for i in range(len(MEASURES)))
+    run = np.clip(planned - downtime, 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_event = np.where(events > 0, events, np.nan)
+        return {
+            "MTBF_Hrs": run / per_event,
+            "MTTR_Hrs": repair / per_event,
+            "Availability_%": run / np.where(planned > 0, planned, np.nan) * 100,
+        }
+
+
+def machine_areas(df, machine_col="Machine No.", area_col="Area"):
+    """Machine -> its most frequent area in the log (Series indexed by machine as str)."""
+    if area_col not in df.columns:
+        return pd.Series(dtype=object)
+    counts = df.groupby([df[machine_col].astype(str), df[area_col].astype(str)], observed=True).size()
+    if counts.empty:
+        return pd.Series(dtype=object)
+    best = counts.sort_values(ascending=False, kind="stable").reset_index()
+    best = best.drop_duplicates(best.columns[0])
+    return pd.Series(best.iloc[:, 1].to_numpy(), index=best.iloc[:, 0].to_numpy())
+
+
+class RollingReliability:
+    """Running totals of the daily reliability measures, one column per machine."""
+
+    def __init__(self, first_day, columns, cum=None):
+        self.first_day = int(first_day)
+        self.columns = pd.Index(columns)
+        if cum is None:
+            cum = np.zeros((1, len(MEASURES), len(self.columns)))
+        self._n = len(cum) - 1
+        self._cum = np.zeros((max(2 * len(cum), 64), len(MEASURES), len(self.columns)))
+        self._cum[:len(cum)] = cum
+
+    @classmethod
+    def from_daily(cls, planned, downtime=None, repair=None, events=None):
+        """From Date x machine frames, one row per calendar day.
+
+        ``planned`` (``RunCalendar.planned``) fixes the days and machines;
+        the other frames are aligned on it, missing values count as 0.
+        """
+        daily = np.zeros((len(planned), len(MEASURES), len(planned.columns)))
+        for i, frame in enumerate((planned, downtime, repair, events)):
+            if frame is None:
+                continue
+            frame = frame.set_axis(frame.columns.astype(str), axis=1)
+            daily[:, i, :] = frame.reindex(index=planned.index, columns=planned.columns.astype(str)).fillna(0)
+        cum = np.zeros((len(daily) + 1, len(MEASURES), len(planned.columns)))
+        np.cumsum(daily, axis=0, out=cum[1:])
+        first = to_day_number(planned.index[0]) if len(planned) else 0
+        return cls(first, planned.columns.astype(str), cum)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def cum(self):
+        return self._cum[:self._n + 1]
+
+    @property
+    def dates(self):
+        return pd.Index(day_number_dates(np.arange(self.first_day, self.first_day + self._n)), name="Date")
+
+    def append_day(self, planned, downtime=0.0, repair=0.0, events=0):
+        """Add the next calendar day; each value is a scalar or one value per column.
+
+        Series are aligned on the columns (missing -> 0).  O(columns).
+        """
+        row = np.empty((len(MEASURES), len(self.columns)))
+        for i, value in enumerate((planned, downtime, repair, events)):
+            if isinstance(value, pd.Series):
+                value = value.set_axis(value.index.astype(str)).reindex(self.columns).fillna(0).to_numpy()
+            row[i] = value
+        if self._n + 1 == len(self._cum):
+            self._cum = np.concatenate([self._cum, np.zeros_like(self._cum)])
+        self._cum[self._n + 1] = self._cum[self._n] + row
+        self._n += 1
+
+    def window_sums(self, window):
+        """(days, measures, columns) sums over the ``window`` days ending on each day."""
+        c = self.cum
+        t = np.arange(1, self._n + 1)
+        return c[t] - c[np.maximum(t - window, 0)]
+
+    def series(self, metric, window):
+        """``metric`` over a rolling ``window`` as a Date x column frame."""
+        values = _metrics(self.window_sums(window))[metric]
+        return pd.DataFrame(values, index=self.dates, columns=self.columns)
+
+    def latest(self, window, end=None):
+        """Measures and metrics of the ``window`` days ending on ``end`` (default: last day), O(columns)."""
+        t = self._n if end is None else min(max(to_day_number(end) - self.first_day + 1, 0), self._n)
+        sums = self.cum[t] - self.cum[max(t - window, 0)]
+        out = pd.DataFrame(_metrics(sums), index=self.columns)
+        for i, m in enumerate(MEASURES):
+            out.insert(i, m.title(), sums[i])
+        return out
+
+    def group(self, mapping, missing="(none)", name="Area"):
+        """Columns summed per group (``mapping``: column -> group, e.g. ``machine_areas``)."""
+        groups = pd.Series(mapping).reindex(self.columns).fillna(missing).astype(str)
+        codes, labels = pd.factorize(groups, sort=True)
+        member = np.zeros((len(self.columns), len(labels)))
+        member[np.arange(len(self.columns)), codes] = 1.0
+        return RollingReliability(self.first_day, pd.Index(labels, name=name), self.cum @ member)
+
+    def combined(self, name="All"):
+        """All columns as one."""
+        return self.group(pd.Series(name, index=self.columns), name=None)
@@ -0,0 +1,162 @@
+"""Planned run hours per machine per day (run calendar).
+
+MTBF and availability used one global constant for every machine
+(``RUN_HOURS_PER_DAY = 600`` for the whole section, 24 planned hours a
+day).  A ``RunCalendar`` gives the planned hours of each machine on each
+calendar day instead, from a small JSON file next to the saved logs
+(``app_files/run_calendar.json``)::
+
+    {
+      "default_hours": 24,
+      "machines": {"M5": 0, "M9": 0, "M10": 12},
+      "weekdays": {"Fri": 0},
+      "shutdowns": [
+        {"start": "2026-01-10", "end": "2026-01-12", "hours": 0, "note": "annual CIP"},
+        {"start": "2026-02-01", "end": "2026-02-03", "machines": ["M15"], "hours": 8}
+      ]
+    }
+
+``machines`` overrides the default hours per day (0 = idle machine),
+``weekdays`` caps the hours on a weekday for every machine, and each
+shutdown sets the hours of its machines (all when omitted) for a date
+span; later shutdowns win.  Without the file every machine is planned 24 h every day.
+
+``load_calendar`` caches the parsed calendar per file and modification
+time, so every KPI page shares one object.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from maintenance.filters import day_number_dates, to_day_number
+
+DEFAULT_RUN_HOURS = 24.0
+CALENDAR_PATH = Path("app_files") / "run_calendar.json"
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+@dataclass(frozen=True)
+class Shutdown:
+    start: object            # datetime.date
+    end: object              # datetime.date, inclusive
+    machines: tuple = None   # None -> every machine
+    hours: float = 0.0
+    note: str = ""
+
+
+@dataclass(frozen=True)
+class RunCalendar:
+    default_hours: float = DEFAULT_RUN_HOURS
+    machine_hours: dict = field(default_factory=dict)
+    weekday_hours: dict = field(default_factory=dict)  # 0 = Monday
+    shutdowns: tuple = ()
+
+    @classmethod
+    def from_dict(cls, spec):
+        weekdays = {WEEKDAYS.index(k[:3].title()): float(v) for k, v in spec.get("weekdays", {}).items()}
+        shutdowns = tuple(
+            Shutdown(
+                start=pd.Timestamp(s["start"]).date(),
+                end=pd.Timestamp(s.get("end", s["start"])).date(),
+                machines=tuple(str(m) for m in s["machines"]) if s.get("machines") else None,
+                hours=float(s.get("hours", 0.0)),
+                note=s.get("note", ""),
+            )
+            for s in spec.get("shutdowns", [])
+        )
+        return cls(
+            default_hours=float(spec.get("default_hours", DEFAULT_RUN_HOURS)),
+            machine_hours={str(m): float(h) for m, h in spec.get("machines", {}).items()},
+            weekday_hours=weekdays,
+            shutdowns=shutdowns,
+        )
+
+    def planned(self, machines, start, end):
+        """Planned hours as a Date x machine frame for start <= date <= end."""
+        machines = [str(m) for m in machines]
+        d0, d1 = to_day_number(start), to_day_number(end)
+        days = np.arange(d0, d1 + 1)
+        base = np.array([self.machine_hours.get(m, self.default_hours) for m in machines], dtype=float)
+        grid = np.broadcast_to(base, (len(days), len(machines))).copy()
+
+        if self.weekday_hours:
+            weekday = (days + 3) % 7  # 1970-01-01 was a Thursday
+            for wd, hours in self.weekday_hours.items():
+                grid[weekday == wd] = np.minimum(grid[weekday == wd], hours)
+        col = {m: j for j, m in enumerate(machines)}
+        for s in self.shutdowns:
+            lo = max(to_day_number(s.start), d0) - d0
+            hi = min(to_day_number(s.end), d1) - d0 + 1
+            if lo >= hi:
+                continue
+            cols = slice(None) if s.machines is None else [col[m] for m in s.machines if m in col]
+            grid[lo:hi, cols] = s.hours
+
+        return pd.DataFrame(grid, index=pd.Index(day_number_dates(days), name="Date"),
+                            columns=pd.Index(machines, name="Machine No."))
+
+    def planned_hours(self, machines, start, end):
+        """Total planned hours per machine over start..end."""
+        return self.planned(machines, start, end).sum().rename("Planned_Hours")
+
+
+DEFAULT_CALENDAR = RunCalendar()
+
+
+@lru_cache(maxsize=8)
+def _load(path, mtime_ns):
+    with open(path, "r", encoding="utf-8") as f:
+        return RunCalendar.from_dict(json.load(f))
+
+
+def load_calendar(path=CALENDAR_PATH):
+    """The run calendar of ``path`` (default calendar when the file does not exist)."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return DEFAULT_CALENDAR
+    return _load(str(path), mtime)
+
+
+def machine_reliability(planned_hours, downtime_hours, repair_hours, events):
+    """Per machine: planned, downtime and run hours, breakdown events, MTBF, MTTR, availability.
+
+    Inputs are Series indexed by machine (missing -> 0): ``downtime_hours``
+    of all stops, ``repair_hours`` and ``events`` of breakdowns only.
+    MTBF is run hours / events and MTTR repair hours / events (NaN
+    without events); availability is run / planned hours in % (NaN when
+    the machine was not planned to run).
+    """
+    series = [s.set_axis(s.index.astype(str)) for s in (planned_hours, downtime_hours, repair_hours, events)]
+    index = series[0].index.union(series[1].index).union(series[3].index)
+
+    def get(s, dtype=float):
+        return s.reindex(index).fillna(0).to_numpy(dtype=dtype)
+
+    out = pd.DataFrame({
+        "Planned_Hours": get(series[0]),
+        "Downtime_Hours": get(series[1]),
+        "Repair_Hours": get(series[2]),
+        "Events": get(series[3], np.int64),
+    }, index=pd.Index(index, name="Machine No."))
+    out["Run_Hours"] = (out["Planned_Hours"] - out["Downtime_Hours"]).clip(lower=0)
+    per_event = out["Events"].replace(0, np.nan)
+    out["MTBF_Hrs"] = out["Run_Hours"] / per_event
+    out["MTTR_Hrs"] = out["Repair_Hours"] / per_event
+    out["Availability_%"] = out["Run_Hours"] / out["Planned_Hours"].replace(0, np.nan) * 100
+    return out
+
+
+def overall_reliability(table):
+    """(MTTR, MTBF, availability %) of a ``machine_reliability`` table as a whole."""
+    events = table["Events"].sum()
+    planned = table["Planned_Hours"].sum()
+    mttr = table["Repair_Hours"].sum() / events if events else 0.0
+    mtbf = table["Run_Hours"].sum() / events if events else 0.0
+    availability = table["Run_Hours"].sum() / planned * 100 if planned else 0.0
+    return mttr, mtbf, availability
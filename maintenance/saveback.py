@@ -0,0 +1,133 @@
+"""Write ``st.data_editor`` changes back into a macro-enabled workbook.
+
+The editor returns the whole table, but usually only a few rows differ
+from what was loaded.  ``save_back`` diffs the edited frame against the
+loaded one by index label and only touches those rows of the sheet:
+changed cells are overwritten in place, deleted rows are removed with
+one ``delete_rows`` per contiguous run (bottom-up) and new rows are
+written after the last kept row.  When the layout changed (columns, a
+header that does not match the sheet, or deletions scattered all over)
+the data area is cleared once and rewritten with ``ws.append``.
+
+The workbook is opened with ``keep_vba=True`` either way, so macros
+survive the save.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+# more deleted runs than this -> one bulk rewrite is cheaper than shifting rows per run
+MAX_DELETE_RUNS = 50
+
+
+def _cell(v):
+    """Frame value -> openpyxl cell value (blanks become empty cells)."""
+    if v is None or (not isinstance(v, (list, tuple, dict)) and pd.isna(v)):
+        return None
+    if hasattr(v, "item") and not isinstance(v, pd.Timestamp):
+        return v.item()  # numpy scalar -> Python
+    return v
+
+
+def _row_values(df):
+    return ([_cell(v) for v in row] for row in df.itertuples(index=False, name=None))
+
+
+def diff_frames(before, after):
+    """Compare two frames by index label.
+
+    Returns (changed, deleted, inserted): ``changed`` maps the position of
+    a kept row in ``before`` to the column positions that differ,
+    ``deleted`` lists positions in ``before`` and ``inserted`` the labels
+    of ``after`` that are new.
+    """
+    kept = before.index.intersection(after.index, sort=False)
+    deleted = sorted(before.index.get_indexer(before.index.difference(after.index, sort=False)))
+    inserted = after.index.difference(before.index, sort=False)
+
+    differs = np.zeros((len(kept), len(before.columns)), dtype=bool)
+    for j, c in enumerate(before.columns):
+        old, new = before[c].loc[kept], after[c].loc[kept]
+        if isinstance(new.dtype, pd.StringDtype) and not isinstance(old.dtype, pd.StringDtype):
+            # the editor shows mixed-type columns (time / number / text) as text,
+            # so an untouched cell comes back as the string of the loaded value
+            old = old.astype("string")
+        old, new = old.astype(object), new.astype(object)
+        differs[:, j] = ~((old == new) | (old.isna() & new.isna())).to_numpy()
+    changed = {}
+    pos = before.index.get_indexer(kept)
+    for p, row in zip(pos, differs):
+        if row.any():
+            changed[int(p)] = row.nonzero()[0].tolist()
+    return changed, [int(p) for p in deleted], inserted
+
+
+def _runs(positions):
+    """Sorted positions -> (start, length) of each contiguous run."""
+    runs = []
+    for p in positions:
+        if runs and runs[-1][0] + runs[-1][1] == p:
+            runs[-1][1] += 1
+        else:
+            runs.append([p, 1])
+    return runs
+
+
+def _header_matches(ws, columns):
+    header = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1, max_col=len(columns)), [])]
+    return [str(h) if h is not None else "" for h in header] == [str(c) for c in columns]
+
+
+def _rewrite(ws, df):
+    if ws.max_row > 0:
+        ws.delete_rows(1, ws.max_row)
+    ws.append([str(c) for c in df.columns])
+    for row in _row_values(df):
+        ws.append(row)
+
+
+def save_back(path, before, after, sheet_name="Main Data"):
+    """Write the difference between ``before`` (loaded) and ``after`` (edited) into ``path``.
+
+    Returns a report dict: mode ("diff" or "full"), changed / inserted /
+    deleted row counts, rows and cells touched, and seconds taken.
+    """
+    t0 = time.perf_counter()
+    wb = load_workbook(path, keep_vba=True)  # keep_vba=True preserves the VBA project on save
+    report = {"mode": "diff", "changed": 0, "inserted": 0, "deleted": 0, "rows_touched": 0, "cells": 0}
+
+    same_layout = list(after.columns) == list(before.columns)
+    ws = wb[sheet_name] if sheet_name in wb.sheetnames else None
+    if ws is not None and same_layout and _header_matches(ws, before.columns):
+        changed, deleted, inserted = diff_frames(before, after)
+        runs = _runs(deleted)
+    else:
+        changed, deleted, inserted, runs = {}, [], [], None
+
+    if runs is None or len(runs) > MAX_DELETE_RUNS:
+        if ws is None:
+            ws = wb.create_sheet(sheet_name)
+        _rewrite(ws, after)
+        report.update(mode="full", rows_touched=len(after) + 1, cells=(len(after) + 1) * len(after.columns))
+    else:
+        # row 1 is the header, frame position p lives on sheet row p + 2
+        for p, cols in changed.items():
+            values = after.loc[before.index[p]]
+            for j in cols:
+                ws.cell(row=p + 2, column=j + 1, value=_cell(values.iloc[j]))
+            report["cells"] += len(cols)
+        for start, length in reversed(runs):
+            ws.delete_rows(start + 2, length)
+        first_new = len(before) - len(deleted) + 2
+        for i, row in enumerate(_row_values(after.loc[inserted, before.columns])):
+            for j, v in enumerate(row, start=1):
+                ws.cell(row=first_new + i, column=j, value=v)
+            report["cells"] += len(row)
+        report.update(changed=len(changed), inserted=len(inserted), deleted=len(deleted),
+                      rows_touched=len(changed) + len(inserted) + len(deleted))
+
+    wb.save(path)
+    report["seconds"] = time.perf_counter() - t0
+    return report
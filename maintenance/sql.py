@@ -0,0 +1,263 @@
+"""Optional DuckDB engine over the Parquet files of the cleaned log.
+
+With ``duckdb`` installed the daily report can run its aggregates as SQL
+straight over the Parquet files the app already keeps: a saved file's
+sidecar (``maintenance.cache``) or the month partitions of the
+consolidated store (``maintenance.store``).  DuckDB scans only the
+columns and row groups a query needs, so the KPI queries do not depend
+on the whole log fitting in pandas.  An uploaded (unsaved) workbook has no
+Parquet file; its frame is registered instead.
+
+Every source is exposed as one view named ``log`` with the columns of the
+cleaned frame (``time_h``, ``hour``, ``reason``, ``day_no`` ...) except
+the internal row fingerprint ``row_fp`` of delta ingestion.  Once
+the view exists the connection is locked down: no file access except the
+view's own Parquet files, and no configuration changes, so the page's
+SQL console cannot read other files of the server.  The
+queries in ``KPI_QUERIES`` mirror ``maintenance.kpis.compute_kpis`` for the
+daily report columns (equal technician credit).
+"""
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from maintenance.filters import DAY_COL, NAT_DAY, day_number_dates, to_day_number
+from maintenance.ingest import FP_COL
+from maintenance.kpis import DAILY_REPORT_COLUMNS, UNKNOWN_TECH
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    duckdb = None
+    HAS_DUCKDB = False
+
+# same separators as maintenance.kpis.TECH_SPLIT_RE (RE2 syntax)
+TECH_SPLIT_SQL = r"(?i)[/,&;]|\band\b"
+
+# a first guard for the console; the connection lock-down is what enforces read-only access
+_READ_ONLY = re.compile(r"^\s*(select|with|from|describe|summarize|show)\b", re.IGNORECASE)
+
+
+def quote(name):
+    """SQL identifier for a column name ("Machine No." -> "\"Machine No.\"")."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def where_clause(date_range=None, selections=None):
+    """(sql, params) restricting ``log`` to a day span and multiselect values.
+
+    ``date_range`` is (start, end) dates, ``selections`` maps a column to
+    its selected values (empty selections are ignored), like the sidebar
+    filters of the daily report.
+    """
+    parts, params = [], []
+    if date_range is not None:
+        parts.append(f"{quote(DAY_COL)} BETWEEN ? AND ?")
+        params += [to_day_number(date_range[0]), to_day_number(date_range[1])]
+    for col, values in (selections or {}).items():
+        if values:
+            parts.append(f"CAST({quote(col)} AS VARCHAR) IN ({', '.join('?' * len(values))})")
+            params += [str(v) for v in values]
+    return ("WHERE " + " AND ".join(parts)) if parts else "", params
+
+
+c = DAILY_REPORT_COLUMNS
+KPI_QUERIES = {
+    "totals": f"""
+        SELECT count(*) AS jobs,
+               count(DISTINCT {quote(c.notification)}) AS complaints,
+               coalesce(sum({c.hours}), 0) AS hours,
+               avg({c.hours}) AS avg_hours
+        FROM log {{where}}""",
+    "top_machines": f"""
+        SELECT {quote(c.machine)} AS machine, coalesce(sum({c.hours}), 0) AS hours
+        FROM log {{where}}
+        GROUP BY 1 HAVING machine IS NOT NULL
+        ORDER BY hours DESC, machine""",
+    "hourly": f"""
+        SELECT {c.hour} AS hour, sum({c.hours}) AS hours
+        FROM log {{where}} {{and_}} {c.hour} >= 0
+        GROUP BY 1""",
+    "heatmap": f"""
+        SELECT {DAY_COL} AS day, {c.hour} AS hour, sum({c.hours}) AS hours
+        FROM log {{where}} {{and_}} {c.hour} >= 0 AND {DAY_COL} <> {NAT_DAY}
+        GROUP BY 1, 2""",
+    "complaints": f"""
+        SELECT {DAY_COL} AS day, count(DISTINCT {quote(c.notification)}) AS complaints
+        FROM log {{where}} {{and_}} {quote(c.notification)} IS NOT NULL AND {DAY_COL} <> {NAT_DAY}
+        GROUP BY 1 ORDER BY 1""",
+    "reasons": f"""
+        SELECT {c.reason} AS reason, coalesce(sum({c.hours}), 0) AS hours, count(*) AS incidents
+        FROM log {{where}}
+        GROUP BY 1
+        ORDER BY hours DESC, reason""",
+    # equal share: each named technician gets hours / crew size
+    "technician_hours": f"""
+        WITH crews AS (
+            SELECT {c.hours} AS hours,
+                   list_filter(
+                       list_transform(
+                           regexp_split_to_array(coalesce(CAST({quote(c.technician)} AS VARCHAR), ''),
+                                                 {_literal(TECH_SPLIT_SQL)}),
+                           lambda x: trim(x)),
+                       lambda x: x <> '' AND lower(x) <> 'nan') AS names
+            FROM log {{where}}
+        ), named AS (
+            SELECT hours, CASE WHEN len(names) = 0 THEN [{_literal(UNKNOWN_TECH)}] ELSE names END AS names
+            FROM crews WHERE hours IS NOT NULL
+        )
+        SELECT tech, sum(share) AS hours
+        FROM (SELECT unnest(names) AS tech, hours / len(names) AS share FROM named)
+        GROUP BY 1 ORDER BY hours DESC, tech""",
+}
+del c
+
+
+@dataclass
+class SqlKpis:
+    """The daily report aggregates, answered by DuckDB (see ``KpiResult``)."""
+    total_jobs: int
+    unique_complaints: float
+    total_hours: float
+    avg_hours: float
+    machine_hours: pd.Series
+    hourly: pd.Series
+    day_hour: pd.DataFrame
+    day_complaints: pd.Series
+    reasons: pd.DataFrame
+    technicians: pd.Series
+    timings: dict
+
+    def top_machines(self, n=10):
+        return self.machine_hours.head(n)
+
+    def top_reasons(self, n=10, category=None):
+        return self.reasons.head(n)
+
+    def technician_totals(self):
+        return self.technicians
+
+
+class SqlEngine:
+    """One DuckDB connection with the cleaned log exposed as the view ``log``.
+
+    ``source`` is a list of Parquet paths or a DataFrame.  The view reads
+    its Parquet files at query time, so exactly those files stay readable
+    (``allowed_paths``); all other file access and any later ``SET`` fail.
+    """
+
+    def __init__(self, source):
+        if not HAS_DUCKDB:
+            raise ImportError("duckdb is not installed (pip install duckdb)")
+        self.con = duckdb.connect()
+        paths = []
+        if isinstance(source, pd.DataFrame):
+            self.con.register("log", source.drop(columns=[FP_COL], errors="ignore"))
+        else:
+            paths = [str(Path(p).resolve()) for p in source]
+            files = "[" + ", ".join(_literal(p) for p in paths) + "]"
+            scan = f"read_parquet({files}, union_by_name = true)"
+            hidden = FP_COL in self.con.execute(f"SELECT * FROM {scan} LIMIT 0").df().columns
+            self.con.execute(f"CREATE VIEW log AS SELECT *{f' EXCLUDE ({quote(FP_COL)})' if hidden else ''} FROM {scan}")
+        self._lock_down(paths)
+
+    def _lock_down(self, paths):
+        if paths:
+            self.con.execute(f"SET allowed_paths = [{', '.join(_literal(p) for p in paths)}]")
+        self.con.execute("SET enable_external_access = false")
+        self.con.execute("SET lock_configuration = true")
+
+    def query(self, sql, params=None):
+        """Run ``sql``; returns (DataFrame, seconds)."""
+        t0 = time.perf_counter()
+        df = self.con.execute(sql, params or []).df()
+        return df, time.perf_counter() - t0
+
+    def user_query(self, sql, limit=10_000):
+        """Run a query typed into the page: read-only statements only, at most ``limit`` rows."""
+        sql = sql.strip().rstrip(";")
+        if not _READ_ONLY.match(sql) or ";" in sql:
+            raise ValueError("Only a single SELECT / WITH / DESCRIBE / SUMMARIZE query is allowed.")
+        t0 = time.perf_counter()
+        df = self.con.sql(sql).limit(limit).df()
+        return df, time.perf_counter() - t0
+
+    def columns(self):
+        return self.con.execute("SELECT * FROM log LIMIT 0").df().columns.tolist()
+
+    def _kpi(self, name, where, params, timings):
+        and_ = "AND" if where else "WHERE"
+        df, secs = self.query(KPI_QUERIES[name].format(where=where, and_=and_), params)
+        timings[name] = secs
+        return df
+
+    def kpis(self, where="", params=None):
+        """Daily report aggregates for the rows matching ``where`` (see ``where_clause``)."""
+        cols = DAILY_REPORT_COLUMNS
+        have = set(self.columns())
+        timings = {}
+        tot = self._kpi("totals", where, params, timings).iloc[0] if cols.notification in have else None
+        if tot is None:  # no notification column: count the rest without it
+            tot, secs = self.query(
+                f"SELECT count(*) AS jobs, coalesce(sum({cols.hours}), 0) AS hours, "
+                f"avg({cols.hours}) AS avg_hours FROM log {where}", params)
+            tot = tot.iloc[0]
+            timings["totals"] = secs
+
+        if cols.machine in have:
+            m = self._kpi("top_machines", where, params, timings)
+            machine_hours = pd.Series(m["hours"].to_numpy(), index=pd.Index(m["machine"], name=cols.machine))
+        else:
+            machine_hours = pd.Series(dtype=float)
+
+        h = self._kpi("hourly", where, params, timings)
+        hourly = pd.Series(h["hours"].to_numpy(), index=h["hour"].astype(int)).reindex(range(24), fill_value=0)
+        hourly.index.name = cols.hour
+
+        hm = self._kpi("heatmap", where, params, timings)
+        day_hour = (hm.pivot(index="day", columns="hour", values="hours")
+                    .sort_index().reindex(columns=range(24)).fillna(0))
+        day_hour.index = pd.Index(day_number_dates(day_hour.index.to_numpy(dtype=np.int64)), name="Date")
+        day_hour.columns = pd.Index(range(24), name=cols.hour)
+
+        if cols.notification in have:
+            dc = self._kpi("complaints", where, params, timings)
+        else:
+            dc, timings["complaints"] = self.query(
+                f"SELECT {DAY_COL} AS day, count(*) AS complaints FROM log {where} "
+                f"{'AND' if where else 'WHERE'} {DAY_COL} <> {NAT_DAY} GROUP BY 1 ORDER BY 1", params)
+        day_complaints = pd.Series(dc["complaints"].to_numpy(),
+                                   index=pd.Index(day_number_dates(dc["day"].to_numpy(dtype=np.int64)), name="Date"))
+
+        r = self._kpi("reasons", where, params, timings)
+        reasons = pd.DataFrame({"Downtime_Hours": r["hours"].to_numpy(), "Incidents": r["incidents"].to_numpy()},
+                               index=pd.Index(r["reason"], name=cols.reason))
+
+        if cols.technician in have:
+            t = self._kpi("technician_hours", where, params, timings)
+            technicians = pd.Series(t["hours"].to_numpy(), index=pd.Index(t["tech"], name="Technician"))
+        else:
+            technicians = pd.Series(dtype=float)
+
+        return SqlKpis(
+            total_jobs=int(tot["jobs"]),
+            unique_complaints=float(tot["complaints"]) if "complaints" in tot else np.nan,
+            total_hours=float(tot["hours"]),
+            avg_hours=float(tot["avg_hours"]) if pd.notna(tot["avg_hours"]) else np.nan,
+            machine_hours=machine_hours,
+            hourly=hourly,
+            day_hour=day_hour,
+            day_complaints=day_complaints,
+            reasons=reasons,
+            technicians=technicians,
+            timings=timings,
+        )
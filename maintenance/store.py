@@ -0,0 +1,213 @@
+"""Consolidated, month-partitioned store of every saved workbook.
+
+The shop keeps one workbook per month in ``app_files/``.  ``sync_store``
+merges the cleaned logs of all of them (served from their Parquet
+sidecars, see ``maintenance.cache``) into one dataset under
+``app_files/.store/``::
+
+    month=2026-01.parquet
+    month=2026-02.parquet
+    month=none.parquet        rows without a Date
+    manifest.json             sources (size, mtime) + rows / day range per month
+
+A notification number that shows up in several files is kept from the
+most recently modified file only (all of its rows there); rows without a
+notification number are kept as they are.  ``read_store`` then loads
+just the month files overlapping the requested date span.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from maintenance.cache import CACHE_VERSION, load_cached
+from maintenance.filters import DAY_COL, NAT_DAY, DateIndex, day_number_dates, sort_by_date, to_day_number
+from maintenance.normalize import CATEGORY_COLUMNS, normalize_categories
+
+STORE_DIRNAME = ".store"
+STORE_VERSION = 1
+NO_MONTH = "none"
+SOURCE_COL = "source"
+
+
+def store_dir(data_dir):
+    return Path(data_dir) / STORE_DIRNAME
+
+
+def _manifest_path(data_dir):
+    return store_dir(data_dir) / "manifest.json"
+
+
+def _partition_path(data_dir, month):
+    return store_dir(data_dir) / f"month={month}.parquet"
+
+
+def partition_paths(data_dir, months):
+    """Parquet files of the given month partitions (e.g. ``info["partitions"]`` of ``read_store``)."""
+    return [_partition_path(data_dir, m) for m in months]
+
+
+def read_manifest(data_dir):
+    try:
+        with open(_manifest_path(data_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _sources(data_dir, files):
+    """{file name: [size, mtime_ns]} of the saved workbooks."""
+    out = {}
+    for name in files:
+        stat = os.stat(Path(data_dir) / name)
+        out[name] = [stat.st_size, stat.st_mtime_ns]
+    return out
+
+
+def is_current(manifest, sources):
+    return (manifest is not None and manifest.get("version") == STORE_VERSION
+            and manifest.get("cache_version") == CACHE_VERSION and manifest.get("sources") == sources)
+
+
+def notification_keys(series):
+    """Comparable notification numbers: 1001, 1001.0 and " 1001" -> "1001"; blanks -> None."""
+    num = pd.to_numeric(series, errors="coerce")
+    whole = num.notna() & (num % 1 == 0)
+    text = series.astype(object).where(series.notna()).astype(str).str.strip()
+    keys = text.where(~whole, num.where(whole).astype("Int64").astype(str))
+    return keys.where(series.notna() & (text != "") & (text.str.lower() != "nan"), None).astype(object)
+
+
+def drop_cross_file_duplicates(df, newest_first):
+    """Keep each notification from one file only: the first of ``newest_first`` that has it."""
+    rank = df[SOURCE_COL].astype(object).map({s: i for i, s in enumerate(newest_first)}).to_numpy()
+    keys = notification_keys(df["Notification No."]) if "Notification No." in df.columns \
+        else pd.Series(None, index=df.index, dtype=object)
+    has = keys.notna().to_numpy()
+    owner = pd.Series(rank[has]).groupby(keys[has].to_numpy()).transform("min").to_numpy()
+    keep = np.ones(len(df), dtype=bool)
+    keep[has] = rank[has] == owner
+    return df[keep].reset_index(drop=True), int((~keep).sum())
+
+
+def _month_of(days):
+    """int64 day numbers -> "YYYY-MM" labels (NO_MONTH for NaT)."""
+    months = np.full(len(days), NO_MONTH, dtype=object)
+    ok = days != NAT_DAY
+    if ok.any():
+        months[ok] = pd.DatetimeIndex(day_number_dates(days[ok])).strftime("%Y-%m")
+    return months
+
+
+def build_store(data_dir, files, loader):
+    """Rebuild the store from the cleaned logs of ``files`` (names inside ``data_dir``)."""
+    t0 = time.perf_counter()
+    sources = _sources(data_dir, files)
+    frames = []
+    for name in files:
+        df, _ = load_cached(Path(data_dir) / name, loader)
+        frames.append(df.assign(**{SOURCE_COL: name}))
+    t_load = time.perf_counter() - t0
+
+    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    newest_first = sorted(files, key=lambda n: sources[n][1], reverse=True)
+    duplicates = 0
+    if len(combined):
+        combined, duplicates = drop_cross_file_duplicates(combined, newest_first)
+        combined = sort_by_date(combined)
+        # per-file category sets differ; one shared set so partitions concat as Categoricals
+        normalize_categories(combined, CATEGORY_COLUMNS + [SOURCE_COL])
+
+    out_dir = store_dir(data_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob("month=*.parquet"):
+        old.unlink()
+
+    months = {}
+    if len(combined):
+        labels = _month_of(combined[DAY_COL].to_numpy())
+        # sorted by day -> every month is one contiguous block
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        for lo, hi in zip(starts, np.r_[starts[1:], len(labels)]):
+            part = combined.iloc[lo:hi]
+            month = labels[lo]
+            part.to_parquet(_partition_path(data_dir, month), index=False)
+            days = part[DAY_COL].to_numpy()
+            months[month] = {"rows": int(hi - lo), "first_day": int(days[0]), "last_day": int(days[-1])}
+
+    manifest = {
+        "version": STORE_VERSION,
+        "cache_version": CACHE_VERSION,
+        "sources": sources,
+        "months": months,
+        "rows": int(len(combined)),
+        "duplicates_dropped": duplicates,
+        "built_at": time.time(),
+        "timings": {"load": t_load, "total": time.perf_counter() - t0},
+    }
+    with open(_manifest_path(data_dir), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def sync_store(data_dir, files, loader):
+    """Return the manifest, rebuilding the store only when a saved workbook changed."""
+    manifest = read_manifest(data_dir)
+    if is_current(manifest, _sources(data_dir, files)):
+        return dict(manifest, rebuilt=False)
+    return dict(build_store(data_dir, files, loader), rebuilt=True)
+
+
+def store_date_range(manifest):
+    """(first, last) datetime.date over all dated partitions, or None."""
+    dated = [m for k, m in manifest.get("months", {}).items() if k != NO_MONTH]
+    if not dated:
+        return None
+    first = min(m["first_day"] for m in dated)
+    last = max(m["last_day"] for m in dated)
+    return tuple(day_number_dates([first, last]))
+
+
+def read_store(data_dir, start=None, end=None, manifest=None):
+    """Cleaned log of all saved files, optionally limited to start <= Date <= end.
+
+    Only the month partitions overlapping the span are read; without a
+    span every partition (including undated rows) is returned.  Returns
+    (df, info) like ``load_cached``.
+    """
+    t0 = time.perf_counter()
+    manifest = manifest or read_manifest(data_dir) or {"months": {}, "sources": {}}
+    span = start is not None and end is not None
+    lo, hi = (to_day_number(start), to_day_number(end)) if span else (None, None)
+
+    wanted = []
+    for month in sorted(k for k in manifest["months"] if k != NO_MONTH):
+        m = manifest["months"][month]
+        if not span or (m["last_day"] >= lo and m["first_day"] <= hi):
+            wanted.append(month)
+    if not span and NO_MONTH in manifest["months"]:
+        wanted.append(NO_MONTH)
+
+    parts = [pd.read_parquet(_partition_path(data_dir, m)) for m in wanted]
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["Date", DAY_COL])
+    lost = [c for c in CATEGORY_COLUMNS + [SOURCE_COL]
+            if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if lost:
+        normalize_categories(df, lost)
+    if span:
+        df = df.iloc[DateIndex.of(df).slice(start, end)].reset_index(drop=True)
+
+    info = {
+        "sheet": f"{len(manifest['sources'])} saved files",
+        "rows": int(manifest.get("rows", len(df))),
+        "cols": len(df.columns),
+        "timings": dict(manifest.get("timings", {}), read=time.perf_counter() - t0, engine="store"),
+        "memory": {},
+        "cached": not manifest.get("rebuilt", False),
+        "partitions": wanted,
+        "duplicates_dropped": manifest.get("duplicates_dropped", 0),
+    }
+    return df, info
@@ -0,0 +1,155 @@
+"""Background ingestion of saved workbooks.
+
+Saving a workbook from the sidebar used to parse and clean it on the
+Streamlit script thread.  ``submit`` hands the work to a process pool
+instead (one worker per core, so several uploads ingest in parallel)
+and returns at once.  The worker fills the Parquet sidecar exactly like
+``load_cached`` / ``ingest_delta`` would, so the dashboard later finds a
+fresh sidecar and loads in milliseconds.
+
+Progress is written by the worker to ``.cache/<name>.status.json`` next
+to the sidecar (state, stage, timestamps, rows, error), so any session
+of the app can show it.  The pool and the job table live at module level
+and are shared by all sessions of the server process.
+"""
+import json
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+
+from maintenance.cache import load_cached, sidecar_paths
+
+QUEUED, READING, CLEANING, DONE, FAILED = "queued", "reading", "cleaning", "done", "failed"
+ACTIVE_STATES = (QUEUED, READING, CLEANING)
+
+_lock = threading.Lock()
+_pool = None
+_jobs = {}  # str(path) -> Future
+
+
+def status_path(path):
+    pq_path, _ = sidecar_paths(path)
+    return pq_path.with_name(f"{Path(path).name}.status.json")
+
+
+def write_status(path, state, **extra):
+    p = status_path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    old = read_status(path) or {}
+    status = {"state": state, "queued_at": old.get("queued_at", time.time()), "updated_at": time.time()}
+    status.update(extra)
+    tmp = p.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f)
+    os.replace(tmp, p)  # readers never see a half-written file
+
+
+def read_status(path):
+    try:
+        with open(status_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ingest_job(path, delta=False):
+    """Worker entry point: build the sidecar of ``path`` and record progress."""
+    from maintenance.ingest import ingest_delta
+    from maintenance.pipeline import clean_log, load_clean_log, read_log
+
+    path = Path(path)
+    t0 = time.time()
+    stage = partial(_stage, path, t0)
+    try:
+        if delta:
+            def read(p):
+                stage(READING)
+                return read_log(p)
+
+            def clean(raw):
+                stage(CLEANING)
+                return clean_log(raw)
+
+            df, info = ingest_delta(path, read, clean)
+        else:
+            df, info = load_cached(path, partial(load_clean_log, progress=stage))
+        write_status(path, DONE, started_at=t0, rows=len(df), seconds=time.time() - t0,
+                     delta=info.get("delta"))
+        return len(df)
+    except Exception as e:
+        write_status(path, FAILED, started_at=t0, error=f"{type(e).__name__}: {e}")
+        raise
+
+
+def _stage(path, t0, stage):
+    write_status(path, stage, started_at=t0)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: do not fork the threads of the Streamlit server
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=mp.get_context("spawn"))
+    return _pool
+
+
+def submit(path, delta=False):
+    """Queue ingestion of a saved workbook; ``delta`` re-cleans only new/changed rows."""
+    key = str(Path(path))
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and not job.done():
+            return job
+        _jobs.pop(key, None)  # re-queued jobs move to the end (newest)
+        if status_path(path).exists():
+            status_path(path).unlink()
+        write_status(path, QUEUED)
+        try:
+            _jobs[key] = _get_pool().submit(ingest_job, key, delta)
+        except BrokenProcessPool:
+            # a worker died (e.g. out of memory): start a fresh pool once
+            global _pool
+            _pool = None
+            _jobs[key] = _get_pool().submit(ingest_job, key, delta)
+        return _jobs[key]
+
+
+def job_state(path):
+    """Status dict of the last job for ``path`` (None when never ingested in the background).
+
+    A status left "running" by a job this server does not know about
+    (e.g. after a restart) is reported as interrupted.
+    """
+    status = read_status(path)
+    if status is None:
+        return None
+    job = _jobs.get(str(Path(path)))
+    if status["state"] in ACTIVE_STATES and (job is None or job.done()):
+        if job is not None and job.exception() is not None:
+            return dict(status, state=FAILED, error=str(job.exception()))
+        return dict(status, state="interrupted")
+    return status
+
+
+def is_processing(path):
+    job = _jobs.get(str(Path(path)))
+    return job is not None and not job.done()
+
+
+def active_jobs():
+    """{path: status} of jobs that are queued or running."""
+    with _lock:
+        keys = [k for k, job in _jobs.items() if not job.done()]
+    return {k: read_status(k) or {"state": QUEUED} for k in keys}
+
+
+def recent_jobs(limit=10):
+    """{path: status} of the last ``limit`` submitted jobs, newest first."""
+    with _lock:
+        keys = list(_jobs)[-limit:][::-1]
+    return {k: job_state(k) or {"state": QUEUED} for k in keys}
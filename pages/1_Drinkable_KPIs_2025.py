@@ -302,124 +302,49 @@ st.plotly_chart(fig_hour, use_container_width=True)
 
 st.markdown("---")
 st.caption("NADEC Drinkable Plant | Technician Workload + Downtime Dashboard 2025")
-import matplotlib.pyplot as plt
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-import tempfile
-import os
+from maintenance.pdf_report import build_pdf, rasterize, report_key
 
-# -----------------------------
-# FUNCTION: Convert DataFrame to Image
-# -----------------------------
-def df_to_image(df, filename):
-    fig, ax = plt.subplots(figsize=(12, 4))
-    ax.axis('tight')
-    ax.axis('off')
-    table = ax.table(cellText=df.values, colLabels=df.columns, loc='center')
-    table.auto_set_font_size(False)
-    table.set_fontsize(8)
-    table.scale(1, 1.5)
-    plt.savefig(filename, bbox_inches='tight')
-    plt.close()
+REPORT_TITLE = "NADEC Drinkable Maintenance Performance Report – 2025"
+LOGO_FILE = "company_logo.png"
+CHART_BOX = (700, 400)   # width, height of a chart on its page
+FULL_BOX = (700, 450)
 
 # -----------------------------
-# FUNCTION: Export Plotly Figure to PNG
+# PDF pages (in order): 4 overview charts, 3 tables, heatmap, trend, hourly
+# Tables are native PDF tables (split across pages, header row repeated)
 # -----------------------------
-def fig_to_png(fig, filename):
-    fig.write_image(filename)
+def pdf_pages():
+    """[(kind, payload, box or caption), ...]: "plotly" charts are rasterized, "table"s drawn as text."""
+    return [
+        ("plotly", fig1.to_json(), CHART_BOX),
+        ("plotly", fig2.to_json(), CHART_BOX),
+        ("plotly", fig3.to_json(), CHART_BOX),
+        ("plotly", fig4.to_json(), CHART_BOX),
+        ("table", df_tech, "Technician Monthly Breakdown Workload (Jan–Dec)"),
+        ("table", df_machine_freq, "Machine-wise Breakdown Frequency"),
+        ("table", df_area, "Machine Area Wise Repeated Issue"),
+        ("plotly", fig_heat.to_json(), FULL_BOX),
+        ("plotly", fig_trend.to_json(), FULL_BOX),
+        ("plotly", fig_hour.to_json(), FULL_BOX),
+    ]
 
 # -----------------------------
-# FUNCTION: Generate PDF
+# FUNCTION: Generate PDF (bytes, cached for this page's data)
 # -----------------------------
 def generate_pdf():
-
-    temp_dir = tempfile.mkdtemp()
-    pdf_path = os.path.join(temp_dir, "NADEC_2025_Report.pdf")
-
-    c = canvas.Canvas(pdf_path, pagesize=landscape(A4))
-
-    # -----------------------------
-    # PAGE 1 — LOGO + TITLE + KPIs
-    # -----------------------------
-    c.drawImage("company_logo.png", 50, 450, width=400, height=120)
-    c.setFont("Helvetica-Bold", 28)
-    c.drawString(50, 420, "NADEC Drinkable Maintenance Performance Report – 2025")
-
-    c.setFont("Helvetica", 16)
-    y = 380
-    for k, v in kpi_data.items():
-        c.drawString(50, y, f"{k}: {v}")
-        y -= 25
-
-    c.showPage()
-
-    # -----------------------------
-    # PAGE 2 — CHARTS
-    # -----------------------------
-    charts = [
-        ("monthly_downtime.png", fig1),
-        ("top_machines.png", fig2),
-        ("tech_pie.png", fig3),
-        ("tech_rank.png", fig4)
-    ]
-
-    for filename, fig in charts:
-        path = os.path.join(temp_dir, filename)
-        fig_to_png(fig, path)
-        c.drawImage(path, 50, 100, width=700, height=400)
-        c.showPage()
-
-    # -----------------------------
-    # PAGE 3 — Technician Table
-    # -----------------------------
-    tech_img = os.path.join(temp_dir, "tech_table.png")
-    df_to_image(df_tech, tech_img)
-    c.drawImage(tech_img, 50, 80, width=700, height=450)
-    c.showPage()
-
-    # -----------------------------
-    # PAGE 4 — Machine Breakdown Frequency
-    # -----------------------------
-    freq_img = os.path.join(temp_dir, "machine_freq.png")
-    df_to_image(df_machine_freq, freq_img)
-    c.drawImage(freq_img, 50, 80, width=700, height=450)
-    c.showPage()
-
-    # -----------------------------
-    # PAGE 5 — Machine Area Repeated Issues
-    # -----------------------------
-    area_img = os.path.join(temp_dir, "area_table.png")
-    df_to_image(df_area, area_img)
-    c.drawImage(area_img, 50, 80, width=700, height=450)
-    c.showPage()
-
-    # -----------------------------
-    # PAGE 6 — Heatmap
-    # -----------------------------
-    heatmap_img = os.path.join(temp_dir, "heatmap.png")
-    fig_heat.write_image(heatmap_img)
-    c.drawImage(heatmap_img, 50, 80, width=700, height=450)
-    c.showPage()
-
-    # -----------------------------
-    # PAGE 7 — Monthly Trend
-    # -----------------------------
-    trend_img = os.path.join(temp_dir, "trend.png")
-    fig_trend.write_image(trend_img)
-    c.drawImage(trend_img, 50, 80, width=700, height=450)
-    c.showPage()
-
-    # -----------------------------
-    # PAGE 8 — Hourly Breakdown
-    # -----------------------------
-    hour_img = os.path.join(temp_dir, "hourly.png")
-    fig_hour.write_image(hour_img)
-    c.drawImage(hour_img, 50, 80, width=700, height=450)
-    c.showPage()
-
-    c.save()
-    return pdf_path
+    """PDF bytes of the report; rebuilt only when a chart, table, KPI or the logo changes."""
+    pages = pdf_pages()
+    key = report_key(kpi_data, [(kind, payload) for kind, payload, _ in pages], LOGO_FILE)
+    cached = st.session_state.get("pdf_report")
+    if cached is None or cached[0] != key:
+        with st.spinner("Rendering PDF report..."):
+            charts = iter(rasterize([(kind, payload) for kind, payload, _ in pages if kind == "plotly"]))
+            blocks = [("image", next(charts), extra) if kind == "plotly" else ("table", payload, extra)
+                      for kind, payload, extra in pages]
+            pdf = build_pdf(REPORT_TITLE, kpi_data, blocks, logo=LOGO_FILE)
+        cached = (key, pdf)
+        st.session_state["pdf_report"] = cached
+    return cached[1]
 
 # -----------------------------
 # DOWNLOAD BUTTONS (TOP + BOTTOM)
@@ -427,13 +352,11 @@ def generate_pdf():
 st.markdown("### 📄 Download Full Technical PDF Report")
 
 if st.button("Download PDF (Top)"):
-    pdf_file = generate_pdf()
-    with open(pdf_file, "rb") as f:
-        st.download_button("Click to Download PDF", f, file_name="NADEC_2025_Report.pdf")
+    st.download_button("Click to Download PDF", generate_pdf(), file_name="NADEC_2025_Report.pdf",
+                       mime="application/pdf", key="pdf_top")
 
 st.markdown("---")
 
 if st.button("Download PDF (Bottom)"):
-    pdf_file = generate_pdf()
-    with open(pdf_file, "rb") as f:
-        st.download_button("Click to Download PDF", f, file_name="NADEC_2025_Report.pdf")
+    st.download_button("Click to Download PDF", generate_pdf(), file_name="NADEC_2025_Report.pdf",
+                       mime="application/pdf", key="pdf_bottom")
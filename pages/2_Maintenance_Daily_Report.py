@@ -1,14 +1,26 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import re
 import os
 from pathlib import Path
 import io
-import matplotlib.pyplot as plt
-import datetime as dt
-
-from openpyxl import load_workbook  # for saving back to XLSM with keep_vba=True
+import time
+from datetime import timedelta
+
+from maintenance.cache import load_cached, invalidate, sidecar_paths
+from maintenance.reader import read_excel_smart
+from maintenance.normalize import memory_report_frame, merge_spellings
+from maintenance.pipeline import load_clean_log
+from maintenance.filters import DAY_COL, FilterIndex, to_day_number
+from maintenance import worker
+from maintenance.ingest import FP_COL
+from maintenance.saveback import save_back
+from maintenance.store import partition_paths, read_store, store_date_range, sync_store
+from maintenance.heatmap import DayHourTable
+from maintenance.intervals import job_intervals, machine_downtime
+from maintenance.figures import FigureCache
+from maintenance.export import EXPORT_FORMATS, export_bytes, filter_state_hash
+from maintenance.kpis import compute_kpis, kpi_cube, technician_log, select_rows, DAILY_REPORT_COLUMNS
+from maintenance.sql import HAS_DUCKDB, SqlEngine, where_clause
 
 # ======================================================
 # Page setup
@@ -36,85 +48,18 @@ def save_uploaded_file(uploaded_file, overwrite=False):
     This preserves xlsm macros because we do not modify content, only copy bytes. [3](https://stackoverflow.com/questions/76893985/pandas-corrupting-file-when-writing-data-from-xlsx-to-xlsm)
     """
     target = DATA_DIR / uploaded_file.name
-    if target.exists() and not overwrite:
+    existed = target.exists()
+    if existed and not overwrite:
         return False, f"File already exists: {uploaded_file.name}"
+    if existed and worker.is_processing(target):
+        return False, f"Still processing the previous copy of {uploaded_file.name}; try again shortly."
     with open(target, "wb") as f:
         f.write(uploaded_file.getbuffer())
-    return True, f"Saved permanently: {uploaded_file.name}"
-
-def read_excel_smart(file_path_or_buffer):
-    """Pick 'Main Data' if present, else first sheet."""
-    xls = pd.ExcelFile(file_path_or_buffer)
-    sheet = next((s for s in xls.sheet_names if s.strip().lower() in ["main data", "maindata", "main"]), xls.sheet_names[0])
-    df = pd.read_excel(file_path_or_buffer, sheet_name=sheet)
-    return df, sheet
-
-def to_hours(series):
-    """Convert Excel time/duration representations into hours."""
-    # timedelta -> hours
-    if pd.api.types.is_timedelta64_dtype(series):
-        return series.dt.total_seconds() / 3600
-
-    # object -> could be time, datetime, number, string
-    def conv(x):
-        if pd.isna(x):
-            return np.nan
-        if isinstance(x, pd.Timedelta):
-            return x.total_seconds() / 3600
-        if isinstance(x, pd.Timestamp):
-            return x.hour + x.minute / 60 + x.second / 3600
-        if isinstance(x, dt.time):
-            return x.hour + x.minute / 60 + x.second / 3600
-        if isinstance(x, dt.datetime):
-            return x.hour + x.minute / 60 + x.second / 3600
-        if isinstance(x, (int, float, np.integer, np.floating)):
-            # Excel fraction-of-day -> hours
-            if x <= 1.5:
-                return x * 24
-            return float(x)
-        if isinstance(x, str):
-            t = x.strip()
-            m = re.match(r"^(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$", t)
-            if m:
-                hh = int(m.group(1)); mm = int(m.group(2)); ss = int(m.group(3) or 0)
-                return hh + mm / 60 + ss / 3600
-        return np.nan
-
-    return series.apply(conv)
-
-def get_hour(x):
-    """Extract hour-of-day (0-23) from time/time-like values."""
-    if pd.isna(x):
-        return np.nan
-    if isinstance(x, pd.Timestamp):
-        return x.hour
-    if isinstance(x, dt.time):
-        return x.hour
-    if isinstance(x, dt.datetime):
-        return x.hour
-    if isinstance(x, str):
-        m = re.match(r"^(\d{1,2}):", x.strip())
-        if m:
-            return int(m.group(1))
-    return np.nan
-
-def split_names(s):
-    """Split technician string 'A/B/C' or 'A & B' etc. into individual names."""
-    parts = re.split(r"[/,&]|\band\b", str(s), flags=re.IGNORECASE)
-    parts = [p.strip() for p in parts if p.strip() and p.strip().lower() != "nan"]
-    return parts if parts else ["Unknown"]
-
-def real_rows_only(df):
-    """Remove template/blank rows. A row is 'real' if any key fields exist."""
-    keys = ["Notification No.", "Machine No.", "Type", "Reported Problem"]
-    present = [c for c in keys if c in df.columns]
-    if not present:
-        return df.copy()
-
-    mask = False
-    for c in present:
-        mask = mask | df[c].notna()
-    return df[mask].copy()
+    if not existed:
+        invalidate(target)
+    # parse + clean in the background; an overwrite re-cleans only new or changed rows
+    worker.submit(target, delta=existed)
+    return True, f"Saved permanently: {uploaded_file.name} (processing in background)"
 
 def df_to_xlsx_bytes(df, sheet_name="Main Data"):
     """Convert dataframe to downloadable xlsx bytes."""
@@ -132,17 +77,47 @@ st.sidebar.header("📁 File Manager (Permanent storage)")
 tab_add, tab_manage, tab_edit = st.sidebar.tabs(["➕ Add", "🗂 Manage", "✏️ Edit"])
 
 with tab_add:
-    up = st.file_uploader("Upload Excel (xlsm/xlsx/xls)", type=["xlsm", "xlsx", "xls"], key="upload_save")
+    ups = st.file_uploader("Upload Excel (xlsm/xlsx/xls)", type=["xlsm", "xlsx", "xls"],
+                           accept_multiple_files=True, key="upload_save")
     overwrite = st.checkbox("Overwrite if exists", value=False, key="overwrite_save")
     if st.button("Save permanently to folder", use_container_width=True, key="btn_save_file"):
-        if up is None:
+        if not ups:
             st.warning("Please upload a file first.")
         else:
-            ok, msg = save_uploaded_file(up, overwrite=overwrite)
-            (st.success if ok else st.error)(msg)
-            if ok:
+            saved = False
+            for up in ups:
+                ok, msg = save_uploaded_file(up, overwrite=overwrite)
+                (st.success if ok else st.error)(msg)
+                saved = saved or ok
+            if saved:
                 st.rerun()
 
+def ingestion_panel():
+    """Progress of background ingestion; polls while jobs are running."""
+    jobs = worker.recent_jobs()
+    if not jobs:
+        return
+    running = [p for p in jobs if worker.is_processing(p)]
+    ready = sum(1 for s in jobs.values() if s["state"] == worker.DONE)
+    st.markdown("**⚙️ Background ingestion**")
+    st.progress(ready / len(jobs), text=f"{ready} of {len(jobs)} ready")
+    icons = {worker.DONE: "✅", worker.FAILED: "❌", "interrupted": "⚠️"}
+    for p, status in jobs.items():
+        since = status.get("started_at") or status.get("queued_at") or time.time()
+        took = status.get("seconds", time.time() - since)
+        line = f"{icons.get(status['state'], '⏳')} {Path(p).name}: {status['state']} ({took:.1f}s)"
+        if status.get("error"):
+            line += f" — {status['error']}"
+        st.caption(line)
+    # last job just finished -> rerun the whole page so the file selector updates
+    if st.session_state.get("ingest_running") and not running:
+        st.session_state["ingest_running"] = False
+        st.rerun(scope="app")
+    st.session_state["ingest_running"] = bool(running)
+
+with st.sidebar:
+    st.fragment(ingestion_panel, run_every=1.0 if worker.active_jobs() else None)()
+
 with tab_manage:
     files = list_saved_files()
     if not files:
@@ -169,12 +144,14 @@ with tab_manage:
                 st.error("A file with that name already exists.")
             else:
                 fpath.rename(new_path)
+                invalidate(fpath)
                 st.success("Renamed.")
                 st.rerun()
 
         # Delete
         if st.button("🗑️ Delete permanently", type="primary", use_container_width=True, key="btn_delete"):
             fpath.unlink(missing_ok=True)
+            invalidate(fpath)
             st.success("Deleted permanently.")
             st.rerun()
 
@@ -186,7 +163,7 @@ with tab_edit:
         selected_edit = st.selectbox("Select file to edit", files, key="edit_select")
         fpath = DATA_DIR / selected_edit
 
-        df_edit, used_sheet = read_excel_smart(fpath)
+        df_edit, used_sheet, _ = read_excel_smart(fpath)
         st.caption(f"Loaded sheet: {used_sheet} | Rows: {len(df_edit):,} | Columns: {len(df_edit.columns)}")
 
         # Editable table
@@ -208,6 +185,7 @@ with tab_edit:
                 xbytes = df_to_xlsx_bytes(edited_df, sheet_name="Main Data")
                 with open(out_path, "wb") as f:
                     f.write(xbytes)
+                invalidate(out_path)
                 st.success(f"Saved: {out_path.name}")
                 st.rerun()
 
@@ -215,93 +193,198 @@ with tab_edit:
         if fpath.suffix.lower() == ".xlsm":
             st.info("XLSM detected: You can save back into the SAME XLSM while preserving macros using keep_vba=True. [1](https://cheat-sheet.streamlit.app/)[2](blob:https://fa000000124.resources.office.net/fb93a13e-8828-4905-b110-ad10ba214d90)")
             if st.button("💾 Save back to SAME .xlsm (keep macros)", use_container_width=True, key="btn_save_back_xlsm"):
-                wb = load_workbook(fpath, keep_vba=True)  # keep_vba=True preserves VBA project when saving [1](https://cheat-sheet.streamlit.app/)
-                # write into 'Main Data' sheet (create if missing)
-                ws_name = "Main Data"
-                if ws_name in wb.sheetnames:
-                    ws = wb[ws_name]
-                    # clear existing rows
-                    if ws.max_row > 0:
-                        ws.delete_rows(1, ws.max_row)
-                else:
-                    ws = wb.create_sheet(ws_name)
-
-                # header
-                for j, col in enumerate(edited_df.columns, start=1):
-                    ws.cell(row=1, column=j, value=str(col))
-
-                # data
-                for i in range(len(edited_df)):
-                    row = edited_df.iloc[i].tolist()
-                    for j, val in enumerate(row, start=1):
-                        ws.cell(row=i+2, column=j, value=val)
-
-                wb.save(fpath)
-                st.success("Saved back to original XLSM with keep_vba=True.")
+                # only changed / inserted / deleted rows are written; keep_vba=True inside save_back
+                report = save_back(fpath, df_edit, edited_df, sheet_name=used_sheet)
+                invalidate(fpath)
+                st.session_state["save_back_report"] = (selected_edit, report)
                 st.rerun()
 
+            last = st.session_state.get("save_back_report")
+            if last and last[0] == selected_edit:
+                r = last[1]
+                st.success(
+                    f"Saved back to original XLSM with keep_vba=True ({r['mode']}): "
+                    f"{r['rows_touched']:,} rows touched ({r['changed']:,} changed, {r['inserted']:,} inserted, "
+                    f"{r['deleted']:,} deleted), {r['cells']:,} cells in {r['seconds']:.2f}s."
+                )
+
 # ======================================================
 # MAIN: Choose file to analyze
 # ======================================================
 st.subheader("📊 Analyze & Dashboard")
 
-mode = st.radio("Choose data source:", ["Use a saved file (permanent)", "Upload once (not saved)"], horizontal=True, key="source_mode")
+ALL_FILES = "All saved files (consolidated)"
+mode = st.radio("Choose data source:", ["Use a saved file (permanent)", ALL_FILES, "Upload once (not saved)"], horizontal=True, key="source_mode")
 
-if mode == "Use a saved file (permanent)":
+if mode == ALL_FILES:
+    files = list_saved_files()
+    if not files:
+        st.warning("No saved files found. Upload one using the sidebar ➕ Add.")
+        st.stop()
+    busy = [f for f in files if worker.is_processing(DATA_DIR / f)]
+    if busy:
+        st.caption(f"⏳ Not included until processed: {', '.join(busy)}")
+        files = [f for f in files if f not in busy]
+        if not files:
+            st.stop()
+    with st.spinner("Updating the consolidated store..."):
+        manifest = sync_store(DATA_DIR, files, load_clean_log)
+    span = store_date_range(manifest)
+    store_start = store_end = None
+    if span:
+        all_dates = st.checkbox("All dates", value=True, key="store_all_dates")
+        if not all_dates:
+            store_start, store_end = st.date_input(
+                "Period (reads only the months it needs)",
+                value=span, min_value=span[0], max_value=span[1], key="store_span"
+            )
+    file_to_read = None
+    dataset_key = ("store", manifest["built_at"], store_start, store_end)
+elif mode == "Use a saved file (permanent)":
     files = list_saved_files()
     if not files:
         st.warning("No saved files found. Upload one using the sidebar ➕ Add.")
         st.stop()
     selected = st.selectbox("Select saved file to analyze", files, key="analyze_saved")
+    # labels of the selectbox stay fixed (its value is matched by label), so the marks go below it
+    st.caption(" · ".join(
+        f"⏳ {n} (processing)" if worker.is_processing(DATA_DIR / n) else f"✅ {n}" for n in files
+    ))
     file_to_read = DATA_DIR / selected
+    if worker.is_processing(file_to_read):
+        st.info(f"{selected} is still being processed in the background; progress is shown in the sidebar.")
+        st.stop()
+    fstat = file_to_read.stat()
+    dataset_key = (str(file_to_read), fstat.st_size, fstat.st_mtime_ns)
 else:
     tmp_up = st.file_uploader("Upload file to analyze (not saved)", type=["xlsm", "xlsx", "xls"], key="analyze_once")
     if tmp_up is None:
         st.stop()
     file_to_read = tmp_up
+    dataset_key = (tmp_up.name, tmp_up.file_id)
 
 # ======================================================
-# Read + clean + compute
+# Read + clean + compute (saved files are served from the Parquet sidecar)
 # ======================================================
-df, sheet = read_excel_smart(file_to_read)
-df.columns = [str(c).strip() for c in df.columns]
-
-st.caption(f"Loaded sheet: **{sheet}** | Rows: **{len(df):,}** | Cols: **{len(df.columns)}**")
-
-real = real_rows_only(df)
-
-# Parse Date
-if "Date" in real.columns:
-    real["Date"] = pd.to_datetime(real["Date"], errors="coerce")
-
-# Convert time columns to hours
-if "Time Consumed" in real.columns:
-    real["time_h"] = to_hours(real["Time Consumed"])
-else:
-    real["time_h"] = np.nan
-
-if "Waiting Time" in real.columns:
-    real["wait_h"] = to_hours(real["Waiting Time"])
+t_load = time.perf_counter()
+if mode == ALL_FILES:
+    real, info = read_store(DATA_DIR, store_start, store_end, manifest=manifest)
+elif isinstance(file_to_read, Path):
+    real, info = load_cached(file_to_read, load_clean_log)
 else:
-    real["wait_h"] = np.nan
-
-# Hour of day from Start else Requested Time
-real["hour"] = np.nan
-if "Start" in real.columns:
-    real["hour"] = real["Start"].apply(get_hour)
-if "Requested Time" in real.columns:
-    real.loc[real["hour"].isna(), "hour"] = real.loc[real["hour"].isna(), "Requested Time"].apply(get_hour)
+    real, info = load_clean_log(file_to_read)
+    info["cached"] = False
+t_load = time.perf_counter() - t_load
+
+st.caption(
+    f"Loaded sheet: **{info['sheet']}** | Rows: **{info['rows']:,}** | Cols: **{info['cols']}**"
+    + (" | ⚡ from cache" if info["cached"] else "")
+)
+if mode == ALL_FILES:
+    st.caption(
+        f"Months read: **{', '.join(info['partitions']) or '-'}** | "
+        f"Duplicate notifications dropped across files: **{info['duplicates_dropped']:,}**"
+    )
+
+with st.sidebar.expander("⏱ Load timing"):
+    if info["cached"]:
+        st.write(f"Served from Parquet cache in **{t_load:.3f} s**")
+        st.caption("Timing of the original parse:")
+    t = info.get("timings", {})
+    st.write(f"Engine: **{t.get('engine', '-')}**")
+    st.dataframe(
+        pd.Series({k: v for k, v in t.items() if k != "engine"}, name="seconds").round(3),
+        use_container_width=True,
+    )
+
+with st.sidebar.expander("🧮 Memory (categorical labels)"):
+    st.dataframe(memory_report_frame(info.get("memory", {})), use_container_width=True)
+
+# labels are grouped as logged unless asked otherwise (merging changes KPI groupings)
+merge_labels = st.sidebar.checkbox(
+    "Merge label spellings", key="merge_labels",
+    help='Count "M 1" / "m1" as M1, "BD" / "Breakdown" as B/D, trim spaces (see maintenance/normalize.py).')
+if merge_labels:
+    real = merge_spellings(real)
+    dataset_key = (dataset_key, "merged")
 
 # ======================================================
 # Filters
 # ======================================================
 st.sidebar.header("🔎 KPI Filters")
-st.sidebar.write(f"Real rows detected: **{len(real):,}** (from {len(df):,})")
-
-df_f = real.copy()
+st.sidebar.write(f"Real rows detected: **{len(real):,}** (from {info['rows']:,})")
+
+FILTERS = [("Area", "Area"), ("Shift", "Shift"), ("Type", "Type"),
+           ("Machine No.", "Machine No."), ("Performed By", "Technician")]
+# filters that are dimensions of the KPI cube (the rest need the filtered rows)
+CUBE_FILTERS = {"Area": "area", "Shift": "shift", "Machine No.": "machine"}
+
+def get_filter_index(df, key):
+    """Bitmap index over the loaded log, rebuilt only when the dataset changes."""
+    cached = st.session_state.get("filter_index")
+    if cached is None or cached[0] != key:
+        cached = (key, FilterIndex(df, [c for c, _ in FILTERS]))
+        st.session_state["filter_index"] = cached
+    return cached[1]
+
+def get_tech_log(df, key):
+    """Long-form technician log of the loaded log, rebuilt only when the dataset changes."""
+    cached = st.session_state.get("tech_log")
+    if cached is None or cached[0] != key:
+        cached = (key, technician_log(df, DAILY_REPORT_COLUMNS))
+        st.session_state["tech_log"] = cached
+    return cached[1]
+
+def get_cube(df, key):
+    """KPI cube of the loaded log, rebuilt only when the dataset changes."""
+    cached = st.session_state.get("kpi_cube")
+    if cached is None or cached[0] != key:
+        cached = (key, kpi_cube(df, DAILY_REPORT_COLUMNS))
+        st.session_state["kpi_cube"] = cached
+    return cached[1]
+
+def get_intervals(df, key):
+    """[start, end) of every job of the loaded log, rebuilt only when the dataset changes."""
+    cached = st.session_state.get("job_intervals")
+    if cached is None or cached[0] != key:
+        cached = (key, job_intervals(df, minutes=df["time_h"] * 60 if "time_h" in df.columns else None))
+        st.session_state["job_intervals"] = cached
+    return cached[1]
+
+def get_figure_cache():
+    """Rendered charts of this session, keyed by the data and styling they show."""
+    if "figure_cache" not in st.session_state:
+        st.session_state["figure_cache"] = FigureCache()
+    return st.session_state["figure_cache"]
+
+def get_sql_engine(key):
+    """DuckDB view over the Parquet files behind the loaded log (the frame itself for uploads / merged labels)."""
+    cached = st.session_state.get("sql_engine")
+    if cached is None or cached[0] != key:
+        if merge_labels:
+            source = real
+        elif mode == ALL_FILES:
+            source = partition_paths(DATA_DIR, info["partitions"])
+        elif isinstance(file_to_read, Path):
+            source = [p for p in [sidecar_paths(file_to_read)[0]] if p.exists()]
+        else:
+            source = real
+        # no Parquet file behind the rows (sidecar not written): the frame
+        cached = (key, SqlEngine(source if len(source) else real))
+        st.session_state["sql_engine"] = cached
+    return cached[1]
+
+fidx = get_filter_index(real, dataset_key)
+tech_log = get_tech_log(real, dataset_key)
+figures = get_figure_cache()
+bits = fidx.all()
+date_slice = slice(None)
+date_span = None
+selections = {}
+narrowed = False  # any multiselect filter in use
 
-if "Date" in df_f.columns:
-    dmin, dmax = df_f["Date"].min(), df_f["Date"].max()
+if "Date" in real.columns:
+    dmin, dmax = real["Date"].min(), real["Date"].max()
     if pd.notna(dmin) and pd.notna(dmax):
         start_date, end_date = st.sidebar.date_input(
             "Date range",
@@ -310,31 +393,62 @@ if "Date" in df_f.columns:
             max_value=dmax.date(),
             key="date_range"
         )
-        df_f = df_f[(df_f["Date"].dt.date >= start_date) & (df_f["Date"].dt.date <= end_date)]
+        date_span = (start_date, end_date)
+        date_slice = fidx.dates.slice(start_date, end_date)
+        bits &= fidx.date_range(start_date, end_date)
 
 def mfilter(col, label):
-    global df_f
-    if col in df_f.columns:
-        opts = sorted(df_f[col].dropna().astype(str).unique())
+    global bits, narrowed
+    if col in fidx.bitmaps:
+        # only values still present after the previous filters, in category order
+        opts = fidx.options(col, bits)
         sel = st.sidebar.multiselect(label, opts, key=f"filter_{col}")
         if sel:
-            df_f = df_f[df_f[col].astype(str).isin(sel)]
-
-mfilter("Area", "Area")
-mfilter("Shift", "Shift")
-mfilter("Type", "Type")
-mfilter("Machine No.", "Machine No.")
-mfilter("Performed By", "Technician")
+            bits &= fidx.values(col, sel)
+            selections[col] = sel
+            narrowed = True
+
+for col, label in FILTERS:
+    mfilter(col, label)
+
+# date range only -> contiguous slice of the sorted log, no mask needed
+if narrowed or fidx.date_order is not None:
+    rows = fidx.mask(bits)
+    df_f = real[rows]
+    intervals_f = get_intervals(real, dataset_key)[rows]
+else:
+    rows = date_slice
+    df_f = real.iloc[date_slice]
+    intervals_f = get_intervals(real, dataset_key).iloc[date_slice]
+tech_f = select_rows(tech_log, rows)
 
 st.sidebar.caption(f"Filtered rows: **{len(df_f):,}**")
 
 # ======================================================
 # KPIs
 # ======================================================
-total_jobs = len(df_f)
-unique_complaints = df_f["Notification No."].nunique(dropna=True) if "Notification No." in df_f.columns else np.nan
-total_hours = df_f["time_h"].sum(skipna=True)
-avg_hours = df_f["time_h"].mean(skipna=True)
+if HAS_DUCKDB and len(real):  # an empty period has no columns for the SQL view
+    engine = st.sidebar.radio("KPI engine", ["pandas", "DuckDB (SQL)"], horizontal=True, key="kpi_engine")
+else:
+    engine = "pandas"
+
+# every chart below reads from kpis
+if engine == "pandas":
+    cube_f = None
+    if set(selections) <= set(CUBE_FILTERS):
+        # charts are slices of the per-dataset cube: no regrouping of the filtered rows
+        days = slice(*map(to_day_number, date_span)) if date_span else None
+        cube_f = get_cube(real, dataset_key).slice(
+            day=days, **{CUBE_FILTERS[c]: sel for c, sel in selections.items()})
+    kpis = compute_kpis(df_f, DAILY_REPORT_COLUMNS, tech_credit="equal", tech_log=tech_f, cube=cube_f)
+else:
+    kpis = get_sql_engine(dataset_key).kpis(*where_clause(date_span, selections))
+    with st.sidebar.expander("🦆 SQL timing"):
+        st.dataframe(pd.Series(kpis.timings, name="seconds").round(4), use_container_width=True)
+total_jobs = kpis.total_jobs
+unique_complaints = kpis.unique_complaints
+total_hours = kpis.total_hours
+avg_hours = kpis.avg_hours
 
 st.subheader("✅ KPI Summary")
 c1, c2, c3, c4 = st.columns(4)
@@ -343,6 +457,13 @@ c2.metric("Complaints (unique notifications)", f"{int(unique_complaints):,}" if
 c3.metric("Total Time Consumed (hours)", f"{total_hours:,.2f}")
 c4.metric("Avg Time per Job (hours)", f"{avg_hours:,.2f}" if pd.notna(avg_hours) else "-")
 
+machine_dt = machine_downtime(intervals_f)
+st.caption(
+    f"Machine downtime with concurrent jobs on the same machine counted once: "
+    f"**{machine_dt['Downtime_Hours'].sum():,.2f} h** in {int(machine_dt['Episodes'].sum()):,} stops "
+    f"(labor {machine_dt['Labor_Hours'].sum():,.2f} h, overlap {machine_dt['Overlap_Hours'].sum():,.2f} h)"
+)
+
 st.divider()
 
 # ======================================================
@@ -350,15 +471,9 @@ st.divider()
 # ======================================================
 st.subheader("🏭 Machine-wise Breakdown (Top 10 by hours)")
 if "Machine No." in df_f.columns:
-    top_m = df_f.groupby("Machine No.")["time_h"].sum().sort_values(ascending=False).head(10)
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.bar(top_m.index.astype(str), top_m.values)
-    ax.set_ylabel("Hours")
-    ax.set_xlabel("Machine")
-    ax.set_title("Top 10 Machines by Total Time Consumed (hours)")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    st.pyplot(fig)
+    top_m = kpis.top_machines(10)
+    st.image(figures.chart("bar", top_m, title="Top 10 Machines by Total Time Consumed (hours)",
+                           xlabel="Machine", ylabel="Hours", rotate=True), use_container_width=True)
 else:
     st.info("Machine No. column not found.")
 
@@ -367,26 +482,10 @@ else:
 # ======================================================
 st.subheader("👷 Technician Worked Hours (Top 10)")
 if "Performed By" in df_f.columns:
-    rows = []
-    for who, h in zip(df_f["Performed By"].fillna("Unknown"), df_f["time_h"]):
-        if pd.isna(h):
-            continue
-        names = split_names(who)
-        share = h / len(names)
-        for n in names:
-            rows.append((n, share))
-
-    tech_df = pd.DataFrame(rows, columns=["Technician", "hours"])
-    top_t = tech_df.groupby("Technician")["hours"].sum().sort_values(ascending=False).head(10)
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.bar(top_t.index.astype(str), top_t.values)
-    ax.set_ylabel("Hours (allocated)")
-    ax.set_xlabel("Technician")
-    ax.set_title("Top 10 Technicians by Allocated Worked Hours")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    st.pyplot(fig)
+    top_t = kpis.technician_totals().head(10)
+
+    st.image(figures.chart("bar", top_t, title="Top 10 Technicians by Allocated Worked Hours",
+                           xlabel="Technician", ylabel="Hours (allocated)", rotate=True), use_container_width=True)
 else:
     st.info("Performed By column not found.")
 
@@ -397,21 +496,10 @@ st.divider()
 # ======================================================
 st.subheader("📩 Complaints Received Trend (Date-wise)")
 if "Date" in df_f.columns:
-    dated = df_f.dropna(subset=["Date"]).copy()
-    dated["day"] = dated["Date"].dt.date
-    if "Notification No." in dated.columns:
-        comp = dated.dropna(subset=["Notification No."]).groupby("day")["Notification No."].nunique()
-    else:
-        comp = dated.groupby("day").size()
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(comp.index, comp.values)
-    ax.set_ylabel("Complaints (unique)")
-    ax.set_xlabel("Date")
-    ax.set_title("Complaints Received per Day")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    st.pyplot(fig)
+    comp = kpis.day_complaints
+
+    st.image(figures.chart("line", comp, title="Complaints Received per Day",
+                           xlabel="Date", ylabel="Complaints (unique)", rotate=True), use_container_width=True)
 else:
     st.info("Date column not found.")
 
@@ -419,39 +507,32 @@ else:
 # Chart 4: 0–23 hour pattern
 # ======================================================
 st.subheader("🕐 0–23 Hour Pattern (Total Time Consumed)")
-hourly = df_f.dropna(subset=["hour"]).groupby("hour")["time_h"].sum().reindex(range(24), fill_value=0)
+hourly = kpis.hourly
 
-fig, ax = plt.subplots(figsize=(10, 4))
-ax.bar(hourly.index, hourly.values)
-ax.set_xlabel("Hour (0–23)")
-ax.set_ylabel("Hours")
-ax.set_title("Total Time Consumed by Hour of Day")
-ax.set_xticks(range(24))
-plt.tight_layout()
-st.pyplot(fig)
+st.image(figures.chart("bar", hourly, title="Total Time Consumed by Hour of Day",
+                       xlabel="Hour (0–23)", ylabel="Hours", xticks=range(24)), use_container_width=True)
 
 # ======================================================
 # Chart 5: Date × Hour heatmap
 # ======================================================
 st.subheader("🗓️ Date × Hour Heatmap (Time Consumed)")
-heat = df_f.dropna(subset=["Date", "hour"]).copy()
-heat["day"] = heat["Date"].dt.date
-
-pivot = heat.pivot_table(index="day", columns="hour", values="time_h", aggfunc="sum").reindex(columns=range(24)).fillna(0)
-pivot_recent = pivot.tail(30)  # last 30 days in filtered data
-
-fig, ax = plt.subplots(figsize=(12, 5))
-im = ax.imshow(pivot_recent.values, aspect="auto", interpolation="nearest")
-ax.set_title("Date × Hour Heatmap (last 30 days in filtered data)")
-ax.set_xlabel("Hour of day")
-ax.set_ylabel("Date")
-ax.set_xticks(range(24))
-ax.set_xticklabels(range(24))
-ax.set_yticks(range(len(pivot_recent.index)))
-ax.set_yticklabels([str(d) for d in pivot_recent.index])
-fig.colorbar(im, ax=ax, label="Hours")
-plt.tight_layout()
-st.pyplot(fig)
+heat = DayHourTable.from_day_hour(kpis.day_hour)  # prefix sums: any window total is O(1)
+if len(heat) > 1:
+    default_lo = max(heat.first, heat.last - timedelta(days=29))
+    win_lo, win_hi = st.slider("Heatmap window", min_value=heat.first, max_value=heat.last,
+                               value=(default_lo, heat.last), format="YYYY-MM-DD")
+    band_lo, band_hi = st.slider("Hour band", min_value=0, max_value=23, value=(0, 23))
+else:
+    win_lo, win_hi, band_lo, band_hi = heat.first, heat.last, 0, 23
+pivot_recent = heat.window(win_lo, win_hi)
+st.caption(
+    f"Window total: **{heat.total(win_lo, win_hi):,.2f} h** | "
+    f"Hours {band_lo}–{band_hi}: **{heat.total(win_lo, win_hi, band_lo, band_hi):,.2f} h** | "
+    f"Whole period: **{heat.total():,.2f} h**"
+)
+
+st.image(figures.chart("heatmap", pivot_recent, title=f"Date × Hour Heatmap ({win_lo} to {win_hi})",
+                       xlabel="Hour of day", ylabel="Date", colorbar="Hours"), use_container_width=True)
 
 st.divider()
 
@@ -460,40 +541,76 @@ st.divider()
 # ======================================================
 st.subheader("🧾 Top 10 Breakdown Reasons")
 if "Reported Problem" in df_f.columns:
-    reason = df_f["Reported Problem"].fillna("").astype(str).str.strip()
-    reason_clean = (reason.str.lower()
-                    .str.replace(r"[^a-z0-9\s]", "", regex=True)
-                    .str.replace(r"\s+", " ", regex=True)
-                    .str.strip())
-    reason_short = reason_clean.apply(lambda s: " ".join(s.split()[:6]) if s else "")
-
-    fallback = df_f["Type"].fillna("unknown").astype(str).str.strip().str.lower() if "Type" in df_f.columns else "unknown"
-    df_f["reason"] = reason_short.where(reason_short != "", fallback)
-
-    top_r = df_f.groupby("reason")["time_h"].sum().sort_values(ascending=False).head(10)
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.barh(top_r.index[::-1], top_r.values[::-1])
-    ax.set_xlabel("Hours")
-    ax.set_title("Top 10 Reasons by Total Time Consumed")
-    plt.tight_layout()
-    st.pyplot(fig)
+    top_r = kpis.top_reasons(10)["Downtime_Hours"]
+
+    st.image(figures.chart("barh", top_r, title="Top 10 Reasons by Total Time Consumed", xlabel="Hours"),
+             use_container_width=True)
 else:
     st.info("Reported Problem column not found.")
 
+# ======================================================
+# SQL console (DuckDB over the Parquet files of the loaded log)
+# ======================================================
+with st.expander("🦆 SQL query (power users)"):
+    if HAS_DUCKDB and not len(real):
+        st.info("No rows loaded for this period, nothing to query.")
+    elif HAS_DUCKDB:
+        sql_engine = get_sql_engine(dataset_key)
+        st.caption("The loaded log is the view `log` (unfiltered). Columns: "
+                   + ", ".join(f"`{c}`" for c in sql_engine.columns()))
+        query = st.text_area(
+            "Query",
+            value='SELECT "Machine No.", round(sum(time_h), 2) AS hours, count(*) AS jobs\n'
+                  "FROM log GROUP BY 1 ORDER BY hours DESC LIMIT 10",
+            height=120, key="sql_query",
+        )
+        if st.button("▶ Run query", key="sql_run"):
+            try:
+                result, secs = sql_engine.user_query(query)
+                st.session_state["sql_result"] = (dataset_key, query, result, secs)
+            except Exception as e:
+                st.session_state["sql_result"] = (dataset_key, query, e, 0.0)
+        last = st.session_state.get("sql_result")
+        if last and last[:2] == (dataset_key, query):
+            result, secs = last[2:]
+            if isinstance(result, Exception):
+                st.error(f"{type(result).__name__}: {result}")
+            else:
+                st.caption(f"{len(result):,} rows in **{secs * 1000:.1f} ms**")
+                st.dataframe(result, use_container_width=True)
+    else:
+        st.info("Install `duckdb` (pip install duckdb) to query the log with SQL.")
+
 # ======================================================
 # Data preview + download filtered data
 # ======================================================
 st.subheader("📄 Filtered Data")
 with st.expander("View filtered table"):
-    st.dataframe(df_f, use_container_width=True)
-
-# Download filtered as xlsx
-download_bytes = df_to_xlsx_bytes(df_f, sheet_name="Filtered Data")
-st.download_button(
-    "⬇️ Download filtered data (xlsx)",
-    data=download_bytes,
-    file_name="filtered_data.xlsx",
-    use_container_width=True,
-    key="download_filtered"
-)  # st.download_button [5](https://stackoverflow.com/questions/75528026/saving-files-from-streamlit-into-a-temporary-directory)
+    st.dataframe(df_f.drop(columns=[DAY_COL, FP_COL], errors="ignore"), use_container_width=True)
+
+# Download filtered data: built only on request, cached per filter state
+EXPORTS_KEPT = 4
+fmt = st.radio("Export format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][1],
+               horizontal=True, key="export_format")
+exports = st.session_state.setdefault("exports", {})
+export_key = (filter_state_hash(dataset_key, bits), fmt)
+
+if export_key not in exports:
+    if st.button(f"📦 Prepare download ({len(df_f):,} rows)", use_container_width=True, key="prepare_export"):
+        t0 = time.perf_counter()
+        data = export_bytes(df_f.drop(columns=[DAY_COL, FP_COL], errors="ignore"), fmt, sheet_name="Filtered Data")
+        while len(exports) >= EXPORTS_KEPT:
+            exports.pop(next(iter(exports)))
+        exports[export_key] = (data, time.perf_counter() - t0)
+
+if export_key in exports:
+    data, secs = exports[export_key]
+    st.download_button(
+        f"⬇️ Download filtered data ({fmt})",
+        data=data,
+        file_name=f"filtered_data.{fmt}",
+        mime=EXPORT_FORMATS[fmt][0],
+        use_container_width=True,
+        key="download_filtered"
+    )  # st.download_button [5](https://stackoverflow.com/questions/75528026/saving-files-from-streamlit-into-a-temporary-directory)
+    st.caption(f"Prepared in {secs:.2f}s · {len(data) / 1024:,.0f} KB")
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# the benchmarks keep the per-cell / per-chart reference code the equivalence tests compare against
+sys.path.insert(1, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture
+def make_workbook(tmp_path):
+    """``make_workbook(header, rows, name="log.xlsx", sheet="Main Data")`` -> path of a saved workbook."""
+    openpyxl = pytest.importorskip("openpyxl")
+
+    def make(header, rows, name="log.xlsx", sheet="Main Data"):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = sheet
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
+        path = tmp_path / name
+        wb.save(path)
+        return path
+
+    return make
@@ -0,0 +1,62 @@
+"""A workbook served from its Parquet sidecar cleans to the same values as a cold load."""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from maintenance.cache import load_cached, parquet_safe  # noqa: E402
+from maintenance.durations import duration_minutes  # noqa: E402
+from maintenance.intervals import job_intervals  # noqa: E402
+from maintenance.pipeline import load_clean_log  # noqa: E402
+
+HEADER = ["Notification No.", "Date", "Machine No.", "Type", "Job", "Reported Problem",
+          "Start", "End", "Time Consumed", "Waiting Time"]
+# Start / End / duration cells as Excel hands them over: time, datetime, text, timedelta and numbers mixed
+ROWS = [
+    [1, dt.datetime(2026, 1, 5), "M1", "Mechanical", "B/D", "belt slipping",
+     dt.time(8, 30), dt.time(9, 45), dt.time(1, 15), 0.01],
+    [2, dt.datetime(2026, 1, 5), "M1", "Electrical", "B/D", "motor trip",
+     dt.datetime(2026, 1, 5, 9, 0), dt.datetime(2026, 1, 5, 10, 0), 1.0, "00:05"],
+    [3, dt.datetime(2026, 1, 6), "M2", "Mechanical", "PM", "greasing",
+     "22:10", "01:20", dt.timedelta(hours=3, minutes=10), None],
+    [4, dt.datetime(2026, 1, 6), "M2", "Mechanical", "B/D", "jam",
+     dt.time(23, 0), dt.datetime(1900, 1, 1, 0, 30), "1:30", pd.Timedelta(minutes=20)],
+    [None, None, None, None, None, None, None, None, None, None],
+]
+
+
+@pytest.fixture
+def workbook(make_workbook):
+    return make_workbook(HEADER, ROWS)
+
+
+def labels_as_object(df):
+    """Categorical labels as plain objects (Parquet reads text back as str, written as object)."""
+    return df.apply(lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+
+
+def test_cached_load_equals_cold_load(workbook):
+    cold, _ = load_clean_log(workbook)
+    miss, miss_info = load_cached(workbook, load_clean_log)
+    hit, hit_info = load_cached(workbook, load_clean_log)
+    assert not miss_info["cached"] and hit_info["cached"]
+    pd.testing.assert_frame_equal(labels_as_object(hit), labels_as_object(miss), check_dtype=False)
+
+    assert len(hit) == len(cold) == 4
+    for col in ["time_h", "wait_h", "hour", "reason", "Machine No.", "Job"]:
+        np.testing.assert_array_equal(hit[col].to_numpy(), cold[col].to_numpy())
+    for col in ["Start", "End", "Time Consumed", "Waiting Time"]:
+        np.testing.assert_allclose(duration_minutes(hit[col]), duration_minutes(cold[col]))
+    np.testing.assert_allclose(job_intervals(hit)[["start", "end"]].to_numpy(),
+                               job_intervals(cold)[["start", "end"]].to_numpy())
+
+
+def test_parquet_safe_keeps_durations():
+    col = pd.Series([dt.time(1, 15), pd.Timestamp("2026-01-05 09:00"), pd.Timedelta(hours=26, seconds=5),
+                     dt.timedelta(hours=3), "00:05", 0.25, np.nan, pd.NaT], dtype=object)
+    safe = parquet_safe(pd.DataFrame({"Time Consumed": col}))["Time Consumed"]
+    np.testing.assert_allclose(duration_minutes(safe), duration_minutes(col))
+    assert safe.dropna().map(type).eq(str).all()
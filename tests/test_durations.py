@@ -0,0 +1,44 @@
+"""Vectorized duration / hour parsing equals the per-cell page functions."""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_durations import get_hour, hour_with_fallback, make_column, time_to_minutes, to_hours
+from maintenance.durations import duration_hours, duration_minutes, hour_of_day
+
+
+@pytest.fixture(scope="module")
+def column():
+    return make_column(5000)
+
+
+def test_duration_hours_matches_to_hours(column):
+    pd.testing.assert_series_equal(duration_hours(column), to_hours(column).astype(float))
+
+
+@pytest.mark.parametrize("default", [np.nan, 0.0])
+def test_duration_minutes_matches_time_to_minutes(column, default):
+    expected = column.apply(lambda x: time_to_minutes(x, default=default)).astype(float)
+    pd.testing.assert_series_equal(duration_minutes(column, default=default), expected)
+
+
+def test_hour_of_day_matches_get_hour(column):
+    requested = make_column(5000, seed=1)
+    expected = hour_with_fallback(column, requested).fillna(-1).astype("int8")
+    pd.testing.assert_series_equal(hour_of_day(column, requested), expected)
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series(pd.to_timedelta([90, None, 15], unit="m")),
+    pd.Series(pd.to_datetime(["2026-01-05 08:30:00", None, "2026-01-05 23:59:30"])),
+    pd.Series([0.25, np.nan, 3.0, 120.0]),
+    pd.Series(["08:30", None, " 7:05:09 ", "n/a"], dtype="str"),
+    pd.Series([dt.time(1, 2, 3), dt.datetime(2026, 1, 5, 4, 5, 6), dt.timedelta(hours=1), "1.5"], dtype=object),
+], ids=["timedelta", "datetime", "float", "str", "other"])
+def test_typed_columns_match(series):
+    pd.testing.assert_series_equal(duration_hours(series), to_hours(series).astype(float))
+    pd.testing.assert_series_equal(duration_minutes(series), series.apply(time_to_minutes).astype(float))
+    pd.testing.assert_series_equal(hour_of_day(series),
+                                   series.astype(object).apply(get_hour).fillna(-1).astype("int8"))
@@ -0,0 +1,65 @@
+"""The streamed exports read back as the frame the old openpyxl export wrote."""
+import datetime as dt
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xlsxwriter")
+pytest.importorskip("openpyxl")
+
+from maintenance.export import EXPORT_FORMATS, export_bytes, filter_state_hash  # noqa: E402
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "Notification No.": [1001.0, np.nan, 1003.0],
+        "Date": pd.to_datetime(["2026-01-05 00:00", None, "2026-01-07 13:45"]),
+        "Machine No.": pd.Categorical(["M1", "M2", None]),
+        "Performed By": pd.Series(["Ali", None, "=SUM(A1)"], dtype="str"),
+        "Start": pd.Series([dt.time(8, 30), None, dt.time(23, 5, 9)], dtype=object),
+        "Downtime": pd.to_timedelta(["1:30:00", None, "26:00:05"]),
+        "time_h": [1.5, np.nan, 0.25],
+    })
+
+
+def openpyxl_export(df):
+    """The export before: pandas' ExcelWriter on openpyxl."""
+    buff = io.BytesIO()
+    with pd.ExcelWriter(buff, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Filtered Data")
+    return buff.getvalue()
+
+
+def read(data):
+    return pd.read_excel(io.BytesIO(data), sheet_name="Filtered Data")
+
+
+def test_xlsx_reads_back_like_the_openpyxl_export(df):
+    new, old = read(export_bytes(df, "xlsx")), read(openpyxl_export(df))
+    typed = ["Performed By", "Start", "Downtime"]
+    pd.testing.assert_frame_equal(new.drop(columns=typed), old.drop(columns=typed))
+    # text that looks like a formula stays text (openpyxl wrote it as a formula)
+    assert new["Performed By"].fillna("").tolist() == ["Ali", "", "=SUM(A1)"]
+    # clock and duration cells keep a time format (openpyxl gave text and day fractions), beyond 24 h too
+    assert new["Start"].tolist()[::2] == [dt.time(8, 30), dt.time(23, 5, 9)]
+    pd.testing.assert_series_equal(new["Downtime"], df["Downtime"], check_dtype=False)
+    np.testing.assert_allclose(pd.to_numeric(old["Downtime"]) * 24, [1.5, np.nan, 26 + 5 / 3600])
+
+
+def test_csv_and_parquet(df):
+    assert export_bytes(df, "csv") == df.to_csv(index=False).encode("utf-8")
+    back = pd.read_parquet(io.BytesIO(export_bytes(df, "parquet")))
+    assert back.columns.tolist() == df.columns.tolist()
+    pd.testing.assert_series_equal(back["Date"], df["Date"], check_dtype=False)
+    assert set(EXPORT_FORMATS) == {"xlsx", "csv", "parquet"}
+
+
+def test_filter_state_hash():
+    bits = np.packbits(np.array([1, 0, 1], dtype=bool))
+    key = filter_state_hash(("log.xlsx", 1), bits)
+    assert key == filter_state_hash(("log.xlsx", 1), bits.copy())
+    assert key != filter_state_hash(("log.xlsx", 1), np.packbits(np.array([1, 1, 1], dtype=bool)))
+    assert key != filter_state_hash(("log.xlsx", 2), bits)
@@ -0,0 +1,51 @@
+"""Rendered charts are reused while their data and styling are unchanged, and never left open."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from maintenance.figures import CHARTS, FigureCache, chart_key  # noqa: E402
+
+HOURLY = pd.Series(np.arange(24, dtype=float), index=pd.RangeIndex(24, name="hour"))
+
+
+def test_key_follows_data_style_and_format():
+    key = chart_key("bar", HOURLY, {"title": "t"}, "png")
+    assert key == chart_key("bar", HOURLY.copy(), {"title": "t"}, "png")
+    changed = HOURLY.copy()
+    changed.iloc[5] += 0.01
+    assert len({key, chart_key("bar", changed, {"title": "t"}, "png"), chart_key("bar", HOURLY, {"title": "u"}, "png"),
+                chart_key("bar", HOURLY, {"title": "t"}, "svg"), chart_key("line", HOURLY, {"title": "t"}, "png"),
+                chart_key("bar", HOURLY.rename("x"), {"title": "t"}, "png"),
+                chart_key("bar", HOURLY.set_axis(range(1, 25)), {"title": "t"}, "png")}) == 7
+    frame = pd.DataFrame({"M1": [1.0, 2.0]}, index=["2026-01-05", "2026-01-06"])
+    assert chart_key("heatmap", frame, {}, "png") != chart_key("heatmap", frame.rename(columns={"M1": "M2"}), {}, "png")
+
+
+def test_cache_hits_skip_rendering_and_close_figures():
+    cache = FigureCache(maxsize=2)
+    first = cache.chart("bar", HOURLY, title="Hourly", xticks=range(24))
+    assert first.startswith(b"\x89PNG") and not plt.get_fignums()
+    assert cache.chart("bar", HOURLY.copy(), title="Hourly", xticks=range(24)) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.chart("line", HOURLY, title="Hourly")
+    cache.chart("barh", HOURLY.head(10), fmt="svg")
+    assert len(cache) == 2 and cache.misses == 3   # least recently used "bar" dropped
+    cache.chart("bar", HOURLY, title="Hourly", xticks=range(24))
+    assert cache.misses == 4 and not plt.get_fignums()
+
+
+@pytest.mark.parametrize("kind", sorted(CHARTS))
+def test_every_chart_renders(kind):
+    data = pd.DataFrame(np.ones((3, 24)), index=pd.date_range("2026-01-05", periods=3).date) \
+        if kind == "heatmap" else HOURLY
+    assert FigureCache().chart(kind, data, fmt="svg", title=kind).lstrip().startswith(b"<?xml")
+    assert not plt.get_fignums()
@@ -0,0 +1,81 @@
+"""Bitmap filters select the same rows as the page's boolean masks."""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from maintenance.filters import DAY_COL, DateIndex, FilterIndex, sort_by_date
+
+COLUMNS = ["Machine No.", "Shift", "Type", "Performed By"]
+
+
+def make_log(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 60, n), "D"))
+    dates[rng.random(n) < 0.05] = pd.NaT
+    return pd.DataFrame({
+        "Date": dates,
+        "Machine No.": pd.Categorical(rng.choice(["M1", "M2", "M10", "Crates Area/Line"], n)),
+        "Shift": rng.choice(np.array(["A", "B", "C", None], dtype=object), n),
+        "Type": rng.choice(np.array(["B/D", "PM", 7, None], dtype=object), n),  # mixed cells, compared as text
+        "Performed By": rng.choice(["Ali", "Sameer/Ali", "Dante"], n),
+        "time_h": rng.gamma(1.5, 1.0, n),
+    })
+
+
+def mask_filter(df, start, end, selections):
+    """The page before the bitmaps: a boolean mask per filter, options re-derived after each."""
+    df_f = df[(df["Date"].dt.date >= start) & (df["Date"].dt.date <= end)]
+    options = {}
+    for col in COLUMNS:
+        options[col] = sorted(df_f[col].dropna().astype(str).unique())
+        if col in selections:
+            df_f = df_f[df_f[col].astype(str).isin(selections[col])]
+    return df_f, options
+
+
+def bitmap_filter(df, fidx, start, end, selections):
+    bits = fidx.all() & fidx.date_range(start, end)
+    options = {}
+    for col in COLUMNS:
+        options[col] = sorted(fidx.options(col, bits))
+        if col in selections:
+            bits &= fidx.values(col, selections[col])
+    return df[fidx.mask(bits)], options, fidx.count(bits)
+
+
+@pytest.mark.parametrize("sorted_log", [True, False], ids=["sorted", "unsorted"])
+@pytest.mark.parametrize("selections", [
+    {},
+    {"Machine No.": ["M1", "M10"]},
+    {"Shift": ["A"], "Type": ["7", "PM"]},
+    {"Machine No.": ["M2"], "Shift": ["B", "C"], "Performed By": ["Sameer/Ali"]},
+    {"Machine No.": ["nope"]},
+])
+def test_bitmaps_match_masks(sorted_log, selections):
+    df = make_log()
+    if sorted_log:
+        df = sort_by_date(df)
+    fidx = FilterIndex(df, COLUMNS)
+    assert (fidx.date_order is None) == sorted_log
+    for start, end in [(dt.date(2026, 1, 1), dt.date(2026, 3, 1)), (dt.date(2026, 1, 10), dt.date(2026, 1, 20)),
+                       (dt.date(2026, 2, 5), dt.date(2026, 2, 5)), (dt.date(2027, 1, 1), dt.date(2027, 1, 2))]:
+        expected, expected_options = mask_filter(df, start, end, selections)
+        got, options, count = bitmap_filter(df, fidx, start, end, selections)
+        pd.testing.assert_frame_equal(got, expected)
+        assert count == len(expected)
+        assert options == expected_options
+
+
+def test_date_slice_of_sorted_log():
+    df = sort_by_date(make_log())
+    index = DateIndex.of(df)
+    start, end = dt.date(2026, 1, 10), dt.date(2026, 1, 20)
+    inside = (df["Date"].dt.date >= start) & (df["Date"].dt.date <= end)
+    pd.testing.assert_frame_equal(df.iloc[index.slice(start, end)], df[inside])
+    by_day = df.dropna(subset=["Date"]).groupby(df["Date"].dt.date)["time_h"].sum()
+    pd.testing.assert_series_equal(index.sum_by_day(df["time_h"]), by_day, check_names=False, check_index_type=False)
+    assert DAY_COL in df.columns and df["Date"].iloc[-1] is pd.NaT
+    with pytest.raises(ValueError):
+        DateIndex(df[DAY_COL].to_numpy()[::-1])
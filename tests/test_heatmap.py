@@ -0,0 +1,54 @@
+"""DayHourTable.total against a brute-force sum over the raw day x hour grid."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from maintenance.heatmap import HOURS, DayHourTable
+
+FIRST = pd.Timestamp("2026-01-05")
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(7)
+    dates = pd.date_range(FIRST, periods=12, freq="D").delete([3, 4, 9])  # days with no jobs
+    day_hour = pd.DataFrame(rng.gamma(1.0, 2.0, (len(dates), HOURS)).round(2), index=dates, columns=range(HOURS))
+    return DayHourTable.from_day_hour(day_hour)
+
+
+def brute_total(grid, first, start, end, h0, h1):
+    """Loop over every (day, hour) cell of the window."""
+    lo = 0 if start is None else (pd.Timestamp(start) - first).days
+    hi = len(grid) - 1 if end is None else (pd.Timestamp(end) - first).days
+    total = 0.0
+    for d in range(lo, hi + 1):
+        if h0 <= h1:
+            cells = [(d, h) for h in range(h0, h1 + 1)]
+        else:  # h0..23 of day d, then 0..h1 of day d + 1
+            cells = [(d, h) for h in range(h0, HOURS)] + [(d + 1, h) for h in range(h1 + 1)]
+        total += sum(grid[r, h] for r, h in cells if 0 <= r < len(grid))
+    return total
+
+
+BOUNDS = [None, FIRST - pd.Timedelta(days=2), FIRST, FIRST + pd.Timedelta(days=3), FIRST + pd.Timedelta(days=11),
+          FIRST + pd.Timedelta(days=14)]
+HOUR_BANDS = [(0, HOURS - 1), (6, 13), (9, 9), (22, 5), (23, 0), (12, 11)]
+
+
+@pytest.mark.parametrize("h0, h1", HOUR_BANDS)
+def test_total_matches_brute_force(table, h0, h1):
+    for start in BOUNDS:
+        for end in BOUNDS:
+            expected = brute_total(table.grid, FIRST, start, end, h0, h1)
+            assert table.total(start, end, h0, h1) == pytest.approx(expected), (start, end)
+
+
+def test_wrapped_window_skips_early_hours_of_first_day(table):
+    night = table.total(h0=22, h1=5)
+    assert night == pytest.approx(table.grid[:, 22:].sum() + table.grid[1:, :6].sum())
+
+
+def test_empty_table():
+    empty = DayHourTable.from_day_hour(pd.DataFrame(columns=range(HOURS)))
+    assert empty.total() == 0.0
+    assert empty.total(h0=22, h1=5) == 0.0
@@ -0,0 +1,48 @@
+"""Delta ingestion of a re-uploaded workbook gives the same log as a full reload."""
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from maintenance.cache import invalidate, load_cached  # noqa: E402
+from maintenance.ingest import FP_COL, ingest_delta  # noqa: E402
+from maintenance.pipeline import clean_log, load_clean_log, read_log  # noqa: E402
+
+HEADER = ["Notification No.", "Date", "Shift", "Machine No.", "Type", "Job", "Reported Problem", "Performed By",
+          "Start", "End", "Time Consumed", "Waiting Time"]
+
+
+def job(i, day=None, machine=None, problem=None):
+    return [1000 + i if i % 7 else None, dt.datetime(2026, 1, day or 1 + i % 28), "ABC"[i % 3],
+            machine or f"M{1 + i % 6}", ["Mechanical", "Electrical"][i % 2], ["B/D", "Corrective", "PM"][i % 3],
+            problem or f"problem {i % 9}", ["Dante", "Sameer/Ali", "Husam"][i % 3],
+            dt.time(i % 24, 15), dt.time((i + 2) % 24, 0), f"{1 + i % 3}:45", "00:10"]
+
+
+def labels_as_object(df):
+    return df.apply(lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+
+
+def test_delta_load_equals_full_reload(make_workbook):
+    old = [job(i) for i in range(60)]
+    path = make_workbook(HEADER, old)
+    load_cached(path, load_clean_log)
+
+    new = old[:10] + old[11:]                                   # one row deleted
+    new[3] = job(3, problem="motor overheating")                # one row changed
+    new[20] = job(21, day=3, machine="Crates Area/Line")        # a new machine
+    new += [job(i) for i in range(60, 75)] + [[None] * len(HEADER)]  # appended rows and a blank template row
+    make_workbook(HEADER, new)
+
+    delta, info = ingest_delta(path, read_log, clean_log)
+    assert info["delta"]["reused"] == 57 and info["delta"]["removed"] == 3
+    invalidate(path)
+    full, full_info = load_cached(path, load_clean_log)
+
+    assert FP_COL in delta.columns
+    pd.testing.assert_frame_equal(labels_as_object(delta), labels_as_object(full), check_dtype=False)
+    assert info["memory"] == full_info["memory"]
+    for c in ["Machine No.", "Shift", "Type", "Job", "Performed By"]:
+        assert delta[c].cat.categories.tolist() == full[c].cat.categories.tolist()
@@ -0,0 +1,117 @@
+"""Machine downtime from merged job intervals."""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from maintenance.intervals import MINUTES_PER_DAY, daily_downtime, job_intervals, machine_downtime, merge_intervals
+
+
+def jobs(*rows):
+    """(date, machine, start, end) rows -> a log frame."""
+    return pd.DataFrame(rows, columns=["Date", "Machine No.", "Start", "End"]).assign(
+        Date=lambda d: pd.to_datetime(d["Date"]))
+
+
+def downtime(df, machine):
+    return machine_downtime(job_intervals(df)).loc[machine]
+
+
+def test_overlapping_jobs_are_one_stop():
+    row = downtime(jobs(("2026-01-05", "M1", "08:00", "09:00"), ("2026-01-05", "M1", "08:30", "10:00")), "M1")
+    assert (row["Jobs"], row["Episodes"]) == (2, 1)
+    assert row["Labor_Hours"] == pytest.approx(2.5)
+    assert row["Downtime_Hours"] == pytest.approx(2.0)
+    assert row["Overlap_Hours"] == pytest.approx(0.5)
+
+
+def test_contained_and_touching_jobs():
+    df = jobs(("2026-01-05", "M1", "08:00", "12:00"), ("2026-01-05", "M1", "09:00", "10:00"),  # inside
+              ("2026-01-05", "M1", "12:00", "13:00"),                                        # touches the end
+              ("2026-01-05", "M1", "14:00", "14:30"))                                        # separate stop
+    row = downtime(df, "M1")
+    assert row["Episodes"] == 2
+    assert row["Downtime_Hours"] == pytest.approx(5.5)
+    assert row["Labor_Hours"] == pytest.approx(6.5)
+
+
+def test_job_across_midnight_overlaps_next_day():
+    df = jobs(("2026-01-05", "M2", "22:00", "02:00"),   # End before Start: runs into Jan 6
+              ("2026-01-06", "M2", "01:00", "03:00"))
+    iv = job_intervals(df)
+    assert iv["length"].tolist() == [240.0, 120.0]
+    row = downtime(df, "M2")
+    assert (row["Episodes"], row["Downtime_Hours"]) == (1, pytest.approx(5.0))
+    # the merged stop is booked on the day it starts
+    daily = daily_downtime(iv)
+    assert daily.index.tolist() == [(dt.date(2026, 1, 5), "M2")]
+    assert daily["Downtime_Hours"].iloc[0] == pytest.approx(5.0)
+
+
+def test_jobs_without_start_keep_their_length():
+    df = jobs(("2026-01-05", "M3", "08:00", "09:00"), ("2026-01-05", "M3", None, None),
+              (None, "M3", None, None)).assign(minutes=[60.0, 45.0, 30.0])
+    iv = job_intervals(df, minutes=df["minutes"])
+    row = machine_downtime(iv).loc["M3"]
+    assert (row["Episodes"], row["Unplaced_Jobs"]) == (3, 2)
+    assert row["Downtime_Hours"] == pytest.approx(2.25)
+    # the undated one has no day to be booked on
+    assert daily_downtime(iv)["Downtime_Hours"].sum() == pytest.approx(1.75)
+
+
+def test_no_placed_job_is_float():
+    out = machine_downtime(job_intervals(jobs(("2026-01-05", "M4", None, None)).assign(Start=np.nan)))
+    assert out["Downtime_Hours"].dtype == float and out.loc["M4", "Downtime_Hours"] == 0.0
+
+
+def loop_union(keys, start, end):
+    """Reference: each key's intervals sorted and merged one by one."""
+    out = {}
+    for k in np.unique(keys):
+        spans = sorted(zip(start[keys == k], end[keys == k]))
+        total, episodes, (cur_s, cur_e) = 0.0, 1, spans[0]
+        for s, e in spans[1:]:
+            if s > cur_e:
+                total, episodes, (cur_s, cur_e) = total + cur_e - cur_s, episodes + 1, (s, e)
+            else:
+                cur_e = max(cur_e, e)
+        out[k] = (total + cur_e - cur_s, episodes)
+    return out
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    n = 400
+    keys = rng.integers(0, 6, n)
+    start = rng.integers(0, 10 * MINUTES_PER_DAY, n).astype(float)
+    end = start + rng.gamma(1.5, 120, n).round()
+    episode, episodes = merge_intervals(keys, start, end)
+    expected = loop_union(keys, start, end)
+    got = (episodes.assign(length=episodes["end"] - episodes["start"])
+           .groupby("key").agg(length=("length", "sum"), n=("jobs", "size"), jobs=("jobs", "sum")))
+    for k, (length, count) in expected.items():
+        assert got.loc[k, "length"] == pytest.approx(length)
+        assert got.loc[k, "n"] == count
+    assert got["jobs"].sum() == n and (episode >= 0).all()
+    # every interval lies inside its episode
+    assert (episodes["start"].to_numpy()[episode] <= start).all()
+    assert (end <= episodes["end"].to_numpy()[episode]).all()
+
+
+def test_daily_split_adds_up_to_machine_totals():
+    rng = np.random.default_rng(3)
+    n = 300
+    minutes = rng.integers(0, MINUTES_PER_DAY, n)
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 20, n), "D"),
+        "Machine No.": rng.choice(["M1", "M2", "M3"], n),
+        "Start": [f"{m // 60:02d}:{m % 60:02d}" for m in minutes],
+        "End": [f"{(m + 90) // 60 % 24:02d}:{(m + 90) % 60:02d}" for m in minutes],
+    })
+    iv = job_intervals(df)
+    daily = daily_downtime(iv).groupby(level="Machine No.").sum()
+    totals = machine_downtime(iv)
+    np.testing.assert_allclose(daily["Downtime_Hours"], totals["Downtime_Hours"].reindex(daily.index))
+    np.testing.assert_array_equal(daily["Episodes"], totals["Episodes"].reindex(daily.index))
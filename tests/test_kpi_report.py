@@ -0,0 +1,103 @@
+"""The headless KPI report: preparing the cleaned log and the CLI."""
+import datetime as dt
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from maintenance.kpi_report import CHARTS, RASTER_CHARTS, chart_formats, inline_svg, main, prepare_log
+from maintenance.normalize import normalize_categories
+from maintenance.pipeline import load_clean_log
+
+
+def normalize_job(job):
+    # the Colab script's rule
+    s = str(job).strip().upper().replace(" ", "")
+    if s in ["B/D", "BD", "BREAKDOWN"]:
+        return "Breakdown"
+    if s in ["CORRECTIVE"]:
+        return "Corrective"
+    return "Other"
+
+
+def test_job_category_matches_script():
+    jobs = ["B/D", "BD", "b/d ", "Breakdown", "Break down", "Corrective", "corrective", "CORR", "PM", None, "Breakdowns"]
+    df = pd.DataFrame({"Machine No.": "M1", "Job": pd.Series(jobs, dtype=object), "Date": pd.Timestamp("2026-01-05")})
+    normalize_categories(df)
+    out = prepare_log(df)
+    np.testing.assert_array_equal(out["Job_Category"].to_numpy(dtype=object), [normalize_job(j) for j in jobs])
+
+
+HEADER = ["Notification No.", "Date", "Shift", "Machine No.", "Type", "Job", "Reported Problem", "Performed By",
+          "Start", "End", "Time Consumed", "Waiting Time"]
+ROWS = [
+    [101, dt.datetime(2026, 1, 5), "A", "M1", "Mechanical", "B/D", "belt slipping", "Dante",
+     "08:00", "09:00", "01:00", "00:10"],
+    # overlaps the job above; the logged Time Consumed (1:00) wins over End - Start (1:30)
+    [102, dt.datetime(2026, 1, 5), "A", "M1", "Electrical", "B/D", "motor trip", "Sameer/Ali",
+     "08:30", "10:00", "01:00", None],
+    [None, dt.datetime(2026, 1, 6), "C", "M2", "Mechanical", "Corrective", "jam at infeed", "Husam",
+     "22:00", "01:00", None, None],  # no Time Consumed: End - Start across midnight
+    [104, dt.datetime(2026, 1, 6), "B", "M2", "Mechanical", "PM", "greasing", "Dante", None, None, "00:30", None],
+]
+
+
+def test_consumed_prefers_time_consumed(make_workbook):
+    df = prepare_log(load_clean_log(make_workbook(HEADER, ROWS))[0])
+    assert df["Consumed_Hours"].tolist() == [1.0, 1.0, 3.0, 0.5]
+
+
+def test_main_writes_the_report(make_workbook, tmp_path, capsys):
+    path = make_workbook(HEADER, ROWS)
+    out = tmp_path / "reports"
+    paths = main(["--workbook", str(path), "--start", "2026-01-05", "--end", "2026-01-06", "--out", str(out),
+                  "--workers", "1", "--calendar", str(tmp_path / "no_calendar.json")])
+
+    assert [p.name for p in paths] == ["Drinks_Section_KPIs_Report_2026-01-05_to_2026-01-06.html"]
+    assert "Real rows: 4" in capsys.readouterr().out
+    html = paths[0].read_text(encoding="utf-8")
+    cards = dict(re.findall(r'<div class="k">([^<]+)</div><div class="v">([^<]+)</div>', html))
+    # merged downtime: M1 08:00-09:30 (1.5 h), M2 3 h + 0.5 h unplaced; 2 machines x 2 days x 24 h planned
+    assert cards["Total Downtime (hrs)"] == "5.00"
+    assert cards["Availability %"] == f"{(96 - 5.0) / 96 * 100:,.2f}%"
+    assert cards["MTTR (hrs) — Breakdown"] == "1.50"
+    assert html.count("<svg") + html.count('<img class="chart"') >= len(CHARTS)
+    assert "belt slipping" in html and "M2" in html
+
+
+def test_main_reports_an_empty_store(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--store", str(tmp_path), "--start", "2026-01-01", "--end", "2026-01-31", "--out", str(tmp_path)])
+
+
+def test_inline_svg_keeps_only_referenced_ids():
+    svg = ('<?xml version="1.0"?>\n<!DOCTYPE svg>\n<svg id="figure_1"><g id="axes_1" clip-path="url(#p1a)">'
+           '<clipPath id="p1a"/><use xlink:href="#m2b"/><path id="m2b"/></g></svg>\n')
+    assert inline_svg(svg) == ('<svg><g clip-path="url(#p1a)"><clipPath id="p1a"/><use xlink:href="#m2b"/>'
+                               '<path id="m2b"/></g></svg>')
+
+
+def test_chart_formats():
+    compact, full = chart_formats(), chart_formats(compact=False)
+    assert {n for n, (fmt, _) in compact.items() if fmt != "svg"} == set(RASTER_CHARTS)
+    assert {compact[n][0] for n in RASTER_CHARTS} <= {"webp", "png"}
+    assert set(full.values()) == {("png", 200)} and set(full) == set(compact) == set(CHARTS)
+
+
+def test_compact_report_embeds_svg(make_workbook, tmp_path):
+    path = make_workbook(HEADER, ROWS)
+    args = ["--workbook", str(path), "--start", "2026-01-05", "--end", "2026-01-06", "--workers", "1",
+            "--calendar", str(tmp_path / "no_calendar.json")]
+    compact = main(args + ["--out", str(tmp_path / "compact")])[0].read_text(encoding="utf-8")
+    full = main(args + ["--out", str(tmp_path / "full"), "--full"])[0].read_text(encoding="utf-8")
+
+    assert compact.count("<svg") == len(CHARTS) - len(RASTER_CHARTS)
+    assert len(re.findall(r'<img class="chart" alt="[^"]+" src="data:image/(?:webp|png);base64,', compact)) \
+        == len(RASTER_CHARTS)
+    assert "<?xml" not in compact
+    # ids are salted per chart, so inlined charts never share one
+    ids = re.findall(r' id="([^"]+)"', compact)
+    assert len(ids) == len(set(ids))
+    assert full.count("<svg") == 0 and full.count('src="data:image/png;base64,') == len(CHARTS)
+    assert len(compact) < len(full)
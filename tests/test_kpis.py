@@ -0,0 +1,30 @@
+"""The single-pass KPI engine returns the tables the per-chart groupbys built."""
+import pytest
+
+from bench_kpis import check, legacy_daily, legacy_kpi, make_log
+from maintenance.kpis import DAILY_REPORT_COLUMNS, KPI_REPORT_COLUMNS, compute_kpis
+
+
+@pytest.fixture(scope="module")
+def log():
+    return make_log(3000)
+
+
+def test_engine_matches_per_chart_groupbys(log):
+    check(log, legacy_daily(log), legacy_kpi(log),
+          compute_kpis(log, DAILY_REPORT_COLUMNS, tech_credit="equal"),
+          compute_kpis(log, KPI_REPORT_COLUMNS, tech_credit="full"))
+
+
+def test_engine_matches_on_a_filtered_slice(log):
+    part = log[log["Machine No."].isin(["M1", "M2", "M3"]).to_numpy() & (log["Shift"] != "B").to_numpy()]
+    check(part, legacy_daily(part), legacy_kpi(part),
+          compute_kpis(part, DAILY_REPORT_COLUMNS, tech_credit="equal"),
+          compute_kpis(part, KPI_REPORT_COLUMNS, tech_credit="full"))
+
+
+def test_totals(log):
+    k = compute_kpis(log, DAILY_REPORT_COLUMNS)
+    assert k.total_jobs == len(log)
+    assert k.total_hours == pytest.approx(log["time_h"].sum())
+    assert k.distinct_days == log["Date"].dt.date.nunique()
@@ -0,0 +1,34 @@
+"""Label Categoricals hold exactly the logged values."""
+import numpy as np
+import pandas as pd
+
+from maintenance.normalize import merge_spellings, normalize_categories, to_category
+
+LABELS = pd.Series(["M10", "M 1", "m1", "M2", None, "M1 ", np.nan, "M2", "Crates Area /Line", "B/D", "BD"],
+                   dtype=object)
+
+
+def test_to_category_keeps_values():
+    cat = to_category(LABELS)
+    pd.testing.assert_series_equal(cat.astype(object), LABELS.where(LABELS.notna(), np.nan))
+    assert cat.cat.categories.tolist() == ["B/D", "M2", "M10", "BD", "Crates Area /Line", "M 1", "m1", "M1 "]
+
+
+def test_groupby_matches_plain_labels():
+    df = pd.DataFrame({"Machine No.": LABELS, "h": np.arange(len(LABELS), dtype=float)})
+    plain = df.groupby("Machine No.")["h"].sum()
+    normalize_categories(df, ["Machine No."])
+    coded = df.groupby("Machine No.", observed=True)["h"].sum()
+    pd.testing.assert_series_equal(coded.rename(index=str).sort_index(), plain.sort_index(), check_index_type=False)
+
+
+def test_merge_spellings():
+    df = pd.DataFrame({"Machine No.": LABELS, "Type": LABELS, "Area": LABELS, "h": 1.0})
+    normalize_categories(df, ["Machine No.", "Type", "Area"])
+    merged = merge_spellings(df)
+    assert merged["Machine No."].cat.categories.tolist() == ["B/D", "M1", "M2", "M10", "BD", "Crates Area/Line"]
+    assert merged.groupby("Machine No.", observed=True)["h"].sum().to_dict() == {
+        "B/D": 1, "M1": 3, "M2": 2, "M10": 1, "BD": 1, "Crates Area/Line": 1}
+    assert merged["Type"].cat.categories.tolist() == ["B/D", "M1", "M2", "M10", "Crates Area/Line", "M 1", "m1"]
+    assert merged["Area"].cat.categories.tolist() == ["B/D", "M1", "M2", "M10", "BD", "Crates Area/Line", "M 1", "m1"]
+    assert df["Machine No."].cat.categories.tolist()[-1] == "M1 "  # the loaded log is left as it is
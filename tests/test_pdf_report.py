@@ -0,0 +1,72 @@
+"""PDF report: cache key, chart rasterizing and native tables."""
+import base64
+import os
+import re
+import zlib
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("reportlab")
+
+from maintenance.pdf_report import build_pdf, rasterize, report_key, table_flowables  # noqa: E402
+
+KPIS = {"Total Downtime (hrs)": "12.50", "Availability (%)": "96.10"}
+TABLE = pd.DataFrame({"Machine No.": ["M1", "M2"], "Hours": [3.5, 2.0]})
+FIG = '{"data": [{"type": "bar", "x": ["M1", "M2"], "y": [3.5, 2.0]}], "layout": {}}'
+
+
+def test_report_key_follows_every_input(tmp_path):
+    logo = tmp_path / "logo.png"
+    logo.write_bytes(b"logo")
+    parts = [("plotly", FIG), ("table", TABLE)]
+    key = report_key(KPIS, parts, str(logo))
+    assert key == report_key(dict(reversed(list(KPIS.items()))), [("plotly", FIG), ("table", TABLE.copy())], str(logo))
+
+    other_table = TABLE.assign(Hours=[3.5, 2.5])
+    keys = {key, report_key(dict(KPIS, **{"Availability (%)": "96.2"}), parts, str(logo)),
+            report_key(KPIS, [("plotly", FIG.replace("3.5", "3.6")), ("table", TABLE)], str(logo)),
+            report_key(KPIS, [("plotly", FIG), ("table", other_table)], str(logo)),
+            report_key(KPIS, parts[::-1], str(logo)),
+            report_key(KPIS, parts)}
+    assert len(keys) == 6
+    os.utime(logo, ns=(1, 1))   # a replaced logo file
+    assert report_key(KPIS, parts, str(logo)) != key
+
+
+def page_streams(pdf):
+    """Decoded content stream of each page (reportlab writes them ASCII85 + Flate encoded)."""
+    encoded = re.findall(rb"/Filter \[ /ASCII85Decode /FlateDecode \] /Length \d+\n>>\nstream\n(.*?)endstream", pdf, re.S)
+    return [zlib.decompress(base64.a85decode(s.strip()[:-2])) for s in encoded]
+
+
+def shown_text(stream):
+    return [re.sub(rb"\\(.)", rb"\1", t).decode("latin-1") for t in re.findall(rb"\((.*?)\) Tj", stream)]
+
+
+def test_long_table_splits_and_repeats_its_header():
+    df = pd.DataFrame({"Machine No.": [f"M{i}" for i in range(120)], "Hours": [i + 0.5 for i in range(120)],
+                       "Incidents": [float(i) for i in range(119)] + [None]})
+    pdf = build_pdf("Maintenance KPIs", KPIS, [("table", df, "Top machines")])
+    title, *pages = [shown_text(s) for s in page_streams(pdf)]
+    assert "Total Downtime (hrs): 12.50" in title
+    assert len(pages) > 1 and all(p[:3] == ["Machine No.", "Hours", "Incidents"] for p in pages[1:])
+    # every cell once, as text: whole floats without ".0", blanks empty
+    cells = [t for p in pages for t in p if t not in ("Machine No.", "Hours", "Incidents", "Top machines")]
+    assert cells == [c for i in range(120) for c in (f"M{i}", f"{i}.5", str(i) if i < 119 else None) if c]
+
+
+def test_table_flowables():
+    caption, table = table_flowables(TABLE, "Top machines")
+    assert caption.text == "Top machines" and table.repeatRows == 1
+    assert table._cellvalues == [["Machine No.", "Hours"], ["M1", "3.5"], ["M2", "2"]]
+    assert len(table_flowables(TABLE)) == 1
+
+
+def test_rasterize_keeps_job_order():
+    pytest.importorskip("plotly")
+    pytest.importorskip("kaleido")
+    figs = [FIG.replace("3.5", str(v)) for v in (1, 2, 3)]
+    pngs = rasterize([("plotly", f) for f in figs])
+    assert all(p.startswith(b"\x89PNG") for p in pngs)
+    assert pngs == [rasterize([("plotly", f)])[0] for f in figs]
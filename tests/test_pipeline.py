@@ -0,0 +1,25 @@
+"""Reading and cleaning a workbook: which columns reach the cleaned log."""
+import datetime as dt
+
+from maintenance.pipeline import load_clean_log
+from maintenance.reader import DASHBOARD_COLUMNS
+
+HEADER = ["Notification No.", "Date", "Machine No.", "Type", "Job", "Reported Problem", "Start", "End",
+          "Time Consumed", "Spare Part Used", "Remarks"]
+ROWS = [
+    [1, dt.datetime(2026, 1, 5), "M1", "Mechanical", "B/D", "belt", "08:30", "09:45", "01:15", "V-belt", "ok"],
+    [2, dt.datetime(2026, 1, 6), "M2", "Electrical", "PM", "motor", "10:00", "10:30", "00:30", None, "checked"],
+]
+
+
+def test_full_sheet_by_default(make_workbook):
+    df, info = load_clean_log(make_workbook(HEADER, ROWS))
+    assert {"Spare Part Used", "Remarks"} <= set(df.columns)
+    assert df["Remarks"].tolist() == ["ok", "checked"]
+    assert info["cols"] == len(HEADER)
+
+
+def test_kpi_columns_only(make_workbook):
+    df, _ = load_clean_log(make_workbook(HEADER, ROWS), usecols=DASHBOARD_COLUMNS)
+    assert not {"Spare Part Used", "Remarks"} & set(df.columns)
+    assert df["time_h"].tolist() == [1.25, 0.5]
@@ -0,0 +1,99 @@
+"""Rolling reliability from running totals equals recomputing every window."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from maintenance.filters import day_number_dates
+from maintenance.rolling import MEASURES, METRICS, WINDOWS, RollingReliability, machine_areas
+
+MACHINES = ["M1", "M2", "M3", "M4", "Crates Area/Line"]
+AREAS = pd.Series(["Filling", "Filling", "Packing", "Packing", "Crates"], index=MACHINES)
+
+
+def make_daily(days, seed=0, first=20000):
+    rng = np.random.default_rng(seed)
+    index = pd.Index(day_number_dates(np.arange(first, first + days)), name="Date")
+    shape = (days, len(MACHINES))
+    planned = np.where(rng.random(shape) < 0.2, 0.0, 24.0)
+    events = np.where(rng.random(shape) < 0.5, 0.0, rng.poisson(1.0, shape)).astype(float)
+    repair = events * rng.gamma(2.0, 1.0, shape)
+    downtime = np.minimum(repair + rng.gamma(1.0, 0.5, shape), planned)
+    return {m: pd.DataFrame(v, index=index, columns=MACHINES)
+            for m, v in zip(MEASURES, (planned, downtime, repair, events))}
+
+
+def brute_force(daily, window, day):
+    """Metrics of the ``window`` days ending on row ``day``, summed from the daily rows."""
+    s = {m: f.iloc[max(day + 1 - window, 0):day + 1].sum() for m, f in daily.items()}
+    run = (s["planned"] - s["downtime"]).clip(lower=0)
+    events = s["events"].where(s["events"] > 0)
+    return pd.DataFrame({
+        "MTBF_Hrs": run / events,
+        "MTTR_Hrs": s["repair"] / events,
+        "Availability_%": run / s["planned"].where(s["planned"] > 0) * 100,
+    })
+
+
+def assert_series_match(roll, daily):
+    for window in WINDOWS + (1,):
+        got = {metric: roll.series(metric, window) for metric in METRICS}
+        for day in range(len(daily["planned"])):
+            expected = brute_force(daily, window, day)
+            for metric in METRICS:
+                np.testing.assert_allclose(got[metric].iloc[day].to_numpy(), expected[metric].to_numpy(),
+                                           equal_nan=True, err_msg=f"{metric} {window}d day {day}")
+
+
+@pytest.fixture
+def daily():
+    return make_daily(120)
+
+
+def test_machine_series_match_recompute(daily):
+    roll = RollingReliability.from_daily(*(daily[m] for m in MEASURES))
+    assert len(roll) == 120 and roll.dates.equals(daily["planned"].index)
+    assert_series_match(roll, daily)
+
+
+def test_area_series_match_recompute(daily):
+    roll = RollingReliability.from_daily(*(daily[m] for m in MEASURES)).group(AREAS)
+    by_area = {m: f.T.groupby(AREAS).sum().T for m, f in daily.items()}
+    assert roll.columns.tolist() == ["Crates", "Filling", "Packing"]
+    assert_series_match(roll, by_area)
+
+
+def test_append_day_matches_rebuild():
+    daily = make_daily(100, seed=1)
+    roll = RollingReliability.from_daily(*(daily[m].iloc[:40] for m in MEASURES))
+    for day in range(40, 100):
+        roll.append_day(*(daily[m].iloc[day] for m in MEASURES))
+    np.testing.assert_allclose(roll.cum, RollingReliability.from_daily(*(daily[m] for m in MEASURES)).cum)
+    assert_series_match(roll, daily)
+
+
+def test_latest_is_the_window_ending_on_end(daily):
+    roll = RollingReliability.from_daily(*(daily[m] for m in MEASURES))
+    end = daily["planned"].index[57]
+    for window in WINDOWS:
+        got = roll.latest(window, end)
+        expected = brute_force(daily, window, 57)
+        for metric in METRICS:
+            np.testing.assert_allclose(got[metric].to_numpy(), expected[metric].to_numpy(), equal_nan=True)
+        np.testing.assert_allclose(got["Events"].to_numpy(), daily["events"].iloc[max(58 - window, 0):58].sum())
+    last = roll.latest(30)
+    np.testing.assert_allclose(last["MTTR_Hrs"].to_numpy(), brute_force(daily, 30, 119)["MTTR_Hrs"].to_numpy(),
+                               equal_nan=True)
+
+
+def test_missing_frames_count_as_zero():
+    planned = make_daily(10)["planned"]
+    events = planned.iloc[::3, :2].where(lambda f: f > 0, 0).clip(upper=1)
+    roll = RollingReliability.from_daily(planned, events=events)
+    np.testing.assert_allclose(roll.latest(7)["Events"].to_numpy(),
+                               events.reindex(planned.index).fillna(0).iloc[-7:].sum().reindex(MACHINES).fillna(0))
+
+
+def test_machine_areas_takes_the_most_frequent():
+    log = pd.DataFrame({"Machine No.": ["M1", "M1", "M1", "M2"], "Area": ["Filling", "Packing", "Filling", "Crates"]})
+    assert machine_areas(log).to_dict() == {"M1": "Filling", "M2": "Crates"}
+    assert machine_areas(log.drop(columns="Area")).empty
@@ -0,0 +1,93 @@
+"""Edits saved back into a workbook read back as the edited frame; macros survive."""
+import datetime as dt
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("openpyxl")
+
+from maintenance.reader import read_excel_smart  # noqa: E402
+from maintenance import saveback  # noqa: E402
+from maintenance.saveback import save_back  # noqa: E402
+
+HEADER = ["Notification No.", "Date", "Machine No.", "Performed By", "Time Consumed"]
+VBA = b"\xd0\xcf\x11\xe0 not really a VBA project"
+
+
+def rows(n):
+    return [[1000 + i, dt.datetime(2026, 1, 1 + i % 28), f"M{i % 5}", "Ali", 0.5 + i] for i in range(n)]
+
+
+@pytest.fixture
+def workbook(make_workbook):
+    """A macro-enabled log with blank rows in the middle of the data."""
+    body = rows(40)
+    body[10] = body[25] = [None] * len(HEADER)
+    path = make_workbook(HEADER, body, name="log.xlsm")
+    with zipfile.ZipFile(path, "a") as z:
+        z.writestr("xl/vbaProject.bin", VBA)
+    return path
+
+
+def load(path):
+    return read_excel_smart(path, engine="openpyxl")[0]
+
+
+def vba(path):
+    with zipfile.ZipFile(path) as z:
+        return z.read("xl/vbaProject.bin")
+
+
+def assert_saved(path, edited):
+    pd.testing.assert_frame_equal(load(path), edited.reset_index(drop=True), check_dtype=False)
+    assert vba(path) == VBA
+
+
+def test_blank_rows_are_kept_as_rows(workbook):
+    before = load(workbook)
+    assert len(before) == 40 and before.iloc[[10, 25]].isna().all(axis=None)
+
+
+def test_round_trip_of_a_diff(workbook):
+    before = load(workbook)
+    after = before.copy()
+    after.loc[3, "Performed By"] = "Sameer"
+    after.loc[30, "Time Consumed"] = 9.25
+    after.loc[11, "Machine No."] = "M9"       # right after a blank row
+    after = after.drop(index=[5, 6, 7, 26])   # two runs, one next to a blank row
+    new = pd.DataFrame([[2000, pd.Timestamp("2026-02-01"), "M1", "Dante", 1.5]], columns=HEADER, index=[40])
+    after = pd.concat([after, new])
+
+    report = save_back(workbook, before, after)
+    assert report["mode"] == "diff"
+    assert (report["changed"], report["deleted"], report["inserted"]) == (3, 4, 1)
+    assert report["cells"] == 3 + len(HEADER)
+    assert_saved(workbook, after)
+
+
+def test_blank_row_edited_and_added(workbook):
+    before = load(workbook)
+    after = before.copy()
+    after.loc[10] = [3000, pd.Timestamp("2026-01-15"), "M2", "Lito", 2.0]   # fill a blank row in
+    after = pd.concat([after, pd.DataFrame([[np.nan] * len(HEADER)], columns=HEADER, index=[40])])
+    after = pd.concat([after, pd.DataFrame([rows(1)[0]], columns=HEADER, index=[41])]).astype(before.dtypes)
+    save_back(workbook, before, after)
+    assert_saved(workbook, after)
+
+
+def test_scattered_deletes_rewrite_the_sheet(workbook, monkeypatch):
+    monkeypatch.setattr(saveback, "MAX_DELETE_RUNS", 5)
+    before = load(workbook)
+    after = before.drop(index=before.index[::3])
+    report = save_back(workbook, before, after)
+    assert report["mode"] == "full"
+    assert_saved(workbook, after)
+
+
+def test_changed_columns_rewrite_the_sheet(workbook):
+    before = load(workbook)
+    after = before.drop(columns="Performed By")
+    assert save_back(workbook, before, after)["mode"] == "full"
+    assert_saved(workbook, after)
@@ -0,0 +1,62 @@
+"""The SQL console's connection can only read the log's own Parquet files."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from maintenance.sql import SqlEngine  # noqa: E402
+
+OUTSIDE = ["SELECT * FROM read_text({path})", "SELECT * FROM read_csv({path}, header = false, sep = ':')"]
+
+
+@pytest.fixture
+def log_frame():
+    return pd.DataFrame({"Machine No.": ["M1", "M2", "M1"], "time_h": [1.0, 2.5, 0.5], "day_no": [1, 1, 2]})
+
+
+@pytest.fixture
+def parquet_engine(tmp_path, log_frame):
+    data = tmp_path / "app_files" / ".store"
+    data.mkdir(parents=True)
+    log_frame.to_parquet(data / "month=2025-01.parquet")
+    (data / "notes.csv").write_text("a:b\n1:2\n")
+    (tmp_path / "secret.csv").write_text("user:x\nroot:0\n")
+    return SqlEngine([data / "month=2025-01.parquet"]), tmp_path
+
+
+def test_parquet_view_still_queries(parquet_engine):
+    engine, _ = parquet_engine
+    df, _ = engine.user_query("SELECT sum(time_h) AS h FROM log")
+    assert df["h"].iloc[0] == 4.0
+
+
+@pytest.mark.parametrize("query", OUTSIDE)
+@pytest.mark.parametrize("target", ["/etc/passwd", "secret.csv", "app_files/.store/notes.csv"])
+def test_files_outside_the_log_are_rejected(parquet_engine, query, target):
+    engine, root = parquet_engine
+    path = target if target.startswith("/") else str(root / target)
+    with pytest.raises(Exception, match="Permission"):
+        engine.user_query(query.format(path="'" + path + "'"))
+
+
+@pytest.mark.parametrize("query", OUTSIDE)
+def test_frame_source_has_no_file_access(log_frame, query):
+    engine = SqlEngine(log_frame)
+    assert engine.user_query("SELECT count(*) AS n FROM log")[0]["n"].iloc[0] == 3
+    with pytest.raises(Exception, match="Permission"):
+        engine.user_query(query.format(path="'/etc/passwd'"))
+
+
+def test_configuration_is_locked(parquet_engine):
+    engine, _ = parquet_engine
+    with pytest.raises(Exception):
+        engine.con.execute("SET enable_external_access = true")
+
+
+def test_row_fingerprint_is_not_in_the_view(tmp_path, log_frame):
+    framed = log_frame.assign(row_fp=np.array([1, 2, 14301068550070749184], dtype=np.uint64))
+    framed.to_parquet(tmp_path / "log.parquet")
+    for source in ([tmp_path / "log.parquet"], framed):
+        assert SqlEngine(source).columns() == log_frame.columns.tolist()
+    assert SqlEngine([tmp_path / "log.parquet"]).user_query("SELECT * FROM log")[0].shape == (3, 3)
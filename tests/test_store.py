@@ -0,0 +1,86 @@
+"""The month-partitioned store of all saved files: partitions, cross-file dedup, span reads."""
+import datetime as dt
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from maintenance.filters import DAY_COL  # noqa: E402
+from maintenance.pipeline import load_clean_log  # noqa: E402
+from maintenance.store import (  # noqa: E402
+    SOURCE_COL, notification_keys, read_store, store_date_range, store_dir, sync_store,
+)
+
+HEADER = ["Notification No.", "Date", "Machine No.", "Type", "Start", "End", "Time Consumed"]
+
+
+def job(notif, day, machine="M1", hours="1:00"):
+    return [notif, day, machine, "B/D", dt.time(8, 0), dt.time(9, 0), hours]
+
+
+JAN = [job(1001, dt.datetime(2026, 1, 5)), job(1002, dt.datetime(2026, 1, 20)),
+       job(1003, dt.datetime(2026, 1, 31), "M2"), job(1003, dt.datetime(2026, 1, 31), "M3"),
+       job(None, dt.datetime(2026, 1, 7)), job(1009, None)]
+# re-exports 1003 (edited: one row, M4) and 1002 as text; it is saved later, so its copies win
+FEB = [job(1003.0, dt.datetime(2026, 1, 31), "M4", "2:30"), job(" 1002", dt.datetime(2026, 1, 20), "M5"),
+       job(2001, dt.datetime(2026, 2, 2)), job(2002, dt.datetime(2026, 3, 1)), job(None, dt.datetime(2026, 2, 7))]
+
+
+@pytest.fixture
+def data_dir(make_workbook, tmp_path):
+    jan = make_workbook(HEADER, JAN, name="jan.xlsx")
+    feb = make_workbook(HEADER, FEB, name="feb.xlsx")
+    os.utime(jan, ns=(1_700_000_000_000_000_000,) * 2)
+    os.utime(feb, ns=(1_700_000_100_000_000_000,) * 2)
+    return tmp_path
+
+
+FILES = ["jan.xlsx", "feb.xlsx"]
+
+
+def test_notification_keys():
+    keys = notification_keys(pd.Series([1001, 1001.0, " 1001", "A-7", None, "", "nan", 12.5], dtype=object))
+    assert keys.where(keys.notna(), "-").tolist() == ["1001", "1001", "1001", "A-7", "-", "-", "-", "12.5"]
+
+
+def test_newest_file_wins_and_months_are_split(data_dir):
+    manifest = sync_store(data_dir, FILES, load_clean_log)
+    assert manifest["rebuilt"] and manifest["duplicates_dropped"] == 3
+    assert {m: v["rows"] for m, v in manifest["months"].items()} == {"2026-01": 4, "2026-02": 2, "2026-03": 1,
+                                                                      "none": 1}
+    assert sorted(p.name for p in store_dir(data_dir).glob("*.parquet")) == [
+        "month=2026-01.parquet", "month=2026-02.parquet", "month=2026-03.parquet", "month=none.parquet"]
+
+    df, _ = read_store(data_dir)
+    assert len(df) == manifest["rows"] == 8
+    assert df[DAY_COL].is_monotonic_increasing and df["Date"].isna().iloc[-1]
+    keys = notification_keys(df["Notification No."]).fillna("-")
+    sources = df[SOURCE_COL].astype(object).groupby(keys)
+    assert sources.agg(lambda s: sorted(set(s))).to_dict() == {
+        "1001": ["jan.xlsx"], "1002": ["feb.xlsx"], "1003": ["feb.xlsx"], "1009": ["jan.xlsx"],
+        "2001": ["feb.xlsx"], "2002": ["feb.xlsx"], "-": ["feb.xlsx", "jan.xlsx"]}
+    # all of 1003 comes from the newer file: its one edited row replaces both old ones
+    assert df.loc[keys == "1003", "Machine No."].astype(str).tolist() == ["M4"]
+    assert store_date_range(manifest) == (dt.date(2026, 1, 5), dt.date(2026, 3, 1))
+
+
+def test_span_reads_only_overlapping_months(data_dir):
+    manifest = sync_store(data_dir, FILES, load_clean_log)
+    full, _ = read_store(data_dir, manifest=manifest)
+    part, info = read_store(data_dir, dt.date(2026, 1, 25), dt.date(2026, 2, 5), manifest=manifest)
+    assert info["partitions"] == ["2026-01", "2026-02"]
+    inside = (full["Date"] >= "2026-01-25") & (full["Date"] <= "2026-02-05")
+    pd.testing.assert_frame_equal(part.drop(columns=SOURCE_COL), full[inside].reset_index(drop=True)
+                                  .drop(columns=SOURCE_COL), check_categorical=False)
+    assert read_store(data_dir, dt.date(2027, 1, 1), dt.date(2027, 2, 1), manifest=manifest)[1]["partitions"] == []
+
+
+def test_sync_rebuilds_only_on_change(data_dir, make_workbook):
+    sync_store(data_dir, FILES, load_clean_log)
+    assert not sync_store(data_dir, FILES, load_clean_log)["rebuilt"]
+    make_workbook(HEADER, JAN[:2], name="jan.xlsx")
+    manifest = sync_store(data_dir, FILES, load_clean_log)
+    assert manifest["rebuilt"] and manifest["rows"] == 6
+    assert sync_store(data_dir, FILES[1:], load_clean_log)["rows"] == 5
@@ -0,0 +1,42 @@
+"""The column-wise technician log equals splitting crews row by row."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_kpis import _close, legacy_tech_loops, make_log, split_techs, tech_explode
+from maintenance.kpis import KPI_REPORT_COLUMNS, UNKNOWN_TECH, select_rows, technician_hours, technician_log
+
+
+@pytest.fixture(scope="module")
+def log():
+    return make_log(3000)
+
+
+def test_rows_match_split_loop(log):
+    tech = technician_log(log, KPI_REPORT_COLUMNS)
+    expected = [(i, name, 1.0 / len(names)) for i, who in enumerate(log["Performed By"])
+                for names in [split_techs(who)] for name in names]
+    got = list(zip(tech["row"], tech["Technician"].astype(object), tech["share"]))
+    assert got == expected
+
+
+def test_crew_rules_match_row_loops(log):
+    (equal0, full0), (equal1, full1) = legacy_tech_loops(log), tech_explode(log)
+    _close(equal0.sort_index(), equal1.sort_index())
+    _close(full0.sort_index(), full1.sort_index())
+
+
+def test_select_rows_matches_subset_log(log):
+    tech = technician_log(log, KPI_REPORT_COLUMNS)
+    mask = (log["Shift"] == "A").to_numpy()
+    for rows, part in [(slice(100, 900), log.iloc[100:900]), (slice(None), log), (mask, log[mask])]:
+        pd.testing.assert_frame_equal(technician_hours(select_rows(tech, rows), KPI_REPORT_COLUMNS, "full"),
+                                      technician_hours(technician_log(part, KPI_REPORT_COLUMNS), KPI_REPORT_COLUMNS,
+                                                       "full"))
+
+
+def test_blank_crews_are_unknown():
+    df = pd.DataFrame({"Performed By": [None, "", " / ", "nan", "Ali and Sameer; Dante"], "time_h": np.ones(5)})
+    tech = technician_log(df)
+    assert tech["Technician"].astype(object).tolist() == [UNKNOWN_TECH] * 4 + ["Ali", "Sameer", "Dante"]
+    np.testing.assert_allclose(tech["share"], [1, 1, 1, 1, 1 / 3, 1 / 3, 1 / 3])
@@ -0,0 +1,63 @@
+"""Background ingestion fills the same sidecar a foreground load would and records its progress."""
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from maintenance import worker  # noqa: E402
+from maintenance.cache import invalidate, load_cached  # noqa: E402
+from maintenance.ingest import FP_COL  # noqa: E402
+from maintenance.pipeline import load_clean_log  # noqa: E402
+
+HEADER = ["Notification No.", "Date", "Machine No.", "Type", "Start", "End", "Time Consumed"]
+ROWS = [[1000 + i, dt.datetime(2026, 1, 1 + i % 28), f"M{i % 4}", "B/D", dt.time(8, 0), dt.time(9, 30), "1:30"]
+        for i in range(30)]
+
+
+def labels_as_object(df):
+    return df.apply(lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+
+
+@pytest.fixture
+def workbook(make_workbook):
+    return make_workbook(HEADER, ROWS)
+
+
+@pytest.mark.parametrize("delta", [False, True])
+def test_job_fills_the_sidecar(workbook, delta):
+    assert worker.ingest_job(workbook, delta=delta) == 30
+    status = worker.read_status(workbook)
+    assert status["state"] == worker.DONE and status["rows"] == 30
+    background, info = load_cached(workbook, load_clean_log)
+    assert info["cached"]
+    invalidate(workbook)
+    foreground, _ = load_cached(workbook, load_clean_log)
+    # a delta ingest also stores the row fingerprints
+    pd.testing.assert_frame_equal(labels_as_object(background.drop(columns=FP_COL, errors="ignore")),
+                                  labels_as_object(foreground.drop(columns=FP_COL, errors="ignore")),
+                                  check_dtype=False)
+
+
+def test_failed_job_is_recorded(tmp_path):
+    path = tmp_path / "broken.xlsx"
+    path.write_bytes(b"not a workbook")
+    with pytest.raises(Exception):
+        worker.ingest_job(path)
+    status = worker.job_state(path)
+    assert status["state"] == worker.FAILED and status["error"]
+
+
+def test_stale_running_status_is_interrupted(workbook):
+    worker.write_status(workbook, worker.CLEANING)
+    assert worker.job_state(workbook)["state"] == "interrupted"
+    assert not worker.is_processing(workbook)
+
+
+def test_submit_runs_in_a_worker_process(workbook):
+    job = worker.submit(workbook)
+    assert job.result(timeout=120) == 30
+    assert worker.job_state(workbook)["state"] == worker.DONE
+    assert str(workbook) in worker.recent_jobs() and not worker.active_jobs()
+    assert load_cached(workbook, load_clean_log)[1]["cached"]